@@ -8,6 +8,7 @@ import logging
 from pydantic_settings import BaseSettings
 from databricks.sdk import WorkspaceClient
 from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.output import Output
 from ai_cookbook.logging.logger import log
 
 # Suppress watchfiles debug logs
@@ -20,6 +21,15 @@ class DatabricksSettings(BaseSettings):
 
 bundler_output_dir = pathlib.Path(__file__).parent / "static"
 
+# Lifecycle event -> node status shown in the widget
+STATUS_EVENTS = {
+    "edge_queued": "queued",
+    "edge_started": "running",
+    "edge_completed": "completed",
+    "edge_cached": "cached",
+    "edge_failed": "failed",
+}
+
 
 class Edge(TypedDict):
     source: str
@@ -49,6 +59,8 @@ class ConfigWidget(anywidget.AnyWidget):
     edges = traitlets.List(traitlets.Dict().tag(sync=True), default_value=[]).tag(
         sync=True
     )
+    # Node id -> latest status of a followed run
+    node_statuses = traitlets.Dict({}).tag(sync=True)
 
     def _repr_mimebundle_(self, **kwargs):
         """Ensure proper widget representation in notebooks"""
@@ -129,29 +141,21 @@ class ConfigWidget(anywidget.AnyWidget):
             for output in self.pipeline.outputs
         ]
 
-        # Create edges list with unique IDs
-        edges = []
-        # Add edges from data sources to processing steps
-        for step in self.pipeline.processing_steps:
-            for input_step in step.inputs:
-                edges.append(
-                    {
-                        "id": f"edge-{input_step.name}-{step.name}",
-                        "source": input_step.name,
-                        "target": step.name,
-                    }
-                )
+        # Create edges list with unique IDs from the pipeline's compiled DAG,
+        # prefixing output node ids so they cannot clash with step names
+        def node_id(node):
+            return f"output_{node.name}" if isinstance(node, Output) else node.name
 
-        # Add edges from processing steps to outputs
-        for output in self.pipeline.outputs:
-            for input_step in output.inputs:
-                edges.append(
-                    {
-                        "id": f"edge-{input_step.name}-output_{output.name}",
-                        "source": input_step.name,
-                        "target": f"output_{output.name}",
-                    }
-                )
+        edges = []
+        for edge in self.pipeline.dag.edges:
+            source, target = node_id(edge.source), node_id(edge.destination)
+            edges.append(
+                {
+                    "id": f"edge-{source}-{target}",
+                    "source": source,
+                    "target": target,
+                }
+            )
 
         self.edges = edges
 
@@ -176,6 +180,29 @@ class ConfigWidget(anywidget.AnyWidget):
         self.schemas = sorted(list(schemas))
         self.tables = sorted(list(tables))
 
+    def follow_runs(self):
+        """
+        Show the status of each node as runs of the pipeline progress. Events
+        arrive on the event bus's delivery thread, never blocking the run.
+        """
+
+        def on_event(event):
+            if event.node is None or event.type not in STATUS_EVENTS:
+                return
+            node = self.pipeline.nodes.get(event.node)
+            node_id = (
+                f"output_{event.node}" if isinstance(node, Output) else event.node
+            )
+            # Assign a new dict to trigger sync
+            self.node_statuses = {
+                **self.node_statuses,
+                node_id: STATUS_EVENTS[event.type],
+            }
+
+        return self.pipeline.events.subscribe(
+            on_event, event_types=list(STATUS_EVENTS), name="widget"
+        )
+
     def _handle_schema_request(self, _, content, buffers):
         log.debug(f"Received custom message: {content}")
         if content.get("type") == "catalog_selected":
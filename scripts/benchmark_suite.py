@@ -0,0 +1,376 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List
+
+# Run as a script, so sibling scripts are importable
+from benchmark_dag_validation import SyntheticNode
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baselines.json")
+
+WORDS = (
+    "the pipeline reads documents from a volume parses every page and splits "
+    "the text into overlapping chunks before embedding them into a vector "
+    "index so that retrieval can find passages about tables models and data"
+).split()
+
+
+@dataclass
+class Result:
+    name: str
+    value: float
+    unit: str
+    # Throughputs improve upwards, timings downwards
+    higher_is_better: bool = False
+
+
+def best_of(function: Callable, repeat: int) -> float:
+    """
+    Fastest of `repeat` calls in seconds, with the garbage collector paused
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def synthetic_corpus(documents: int, words_per_document: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(documents):
+        words = rng.choices(WORDS, k=words_per_document)
+        # Paragraph breaks every ~80 words, like parsed PDF pages
+        for i in range(80, len(words), 80):
+            words[i] += "\n\n"
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def synthetic_steps(size: int, fan_in: int = 1, seed: int = 0) -> List[dict]:
+    """
+    Step configs for a DAG of `size` steps over one source, each reading from
+    up to `fan_in` earlier nodes (1 gives a chain)
+    """
+    rng = random.Random(seed)
+    names = ["source0"]
+    steps = []
+    for i in range(size):
+        if fan_in == 1:
+            inputs = [names[-1]]
+        else:
+            inputs = sorted({rng.choice(names[-fan_in * 4 :]) for _ in range(fan_in)})
+        name = f"step{i}"
+        steps.append(
+            {
+                "name": name,
+                "function": "ai_cookbook.functions.chunking.chunk_text",
+                "inputs": inputs,
+                "output_table": f"table{i}",
+            }
+        )
+        names.append(name)
+    return steps
+
+
+def synthetic_config(size: int, fan_in: int = 1) -> dict:
+    steps = synthetic_steps(size, fan_in)
+    return {
+        "data_sources": [
+            {
+                "name": "source0",
+                "catalog": "bench",
+                "schema": "bench",
+                "type": "volume",
+                "path": "/Volumes/bench/bench/docs",
+                "format": "pdf",
+            }
+        ],
+        "processing_steps": steps,
+        "outputs": [
+            {
+                "name": "output0",
+                "inputs": [steps[-1]["name"]],
+                "type": "vector_index",
+                "embedding_model": "bench-embedding-model",
+                "output_table": "bench_index",
+            }
+        ],
+    }
+
+
+def synthetic_pipeline(size: int, fan_in: int = 1):
+    from ai_cookbook.pipeline.data_source import DataSource
+    from ai_cookbook.pipeline.output import Output
+    from ai_cookbook.pipeline.pipeline import Pipeline
+    from ai_cookbook.pipeline.processing_step import ProcessingStep
+
+    config = synthetic_config(size, fan_in)
+    nodes = {}
+    sources = [DataSource(**source) for source in config["data_sources"]]
+    nodes.update((source.name, source) for source in sources)
+    steps = []
+    for step_config in config["processing_steps"]:
+        inputs = [nodes[name] for name in step_config["inputs"]]
+        step = ProcessingStep(**{**step_config, "inputs": inputs})
+        nodes[step.name] = step
+        steps.append(step)
+    outputs = [
+        Output(**{**output, "inputs": [nodes[name] for name in output["inputs"]]})
+        for output in config["outputs"]
+    ]
+    return Pipeline(data_sources=sources, processing_steps=steps, outputs=outputs)
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def bench_chunking(quick: bool, repeat: int) -> List[Result]:
+    from ai_cookbook.functions.chunking import chunk_text, chunk_texts
+
+    corpus = synthetic_corpus(50 if quick else 200, 5_000)
+    megabytes = sum(len(text) for text in corpus) / 1e6
+    single = best_of(lambda: [chunk_text(text) for text in corpus], repeat)
+    batch = best_of(lambda: chunk_texts(corpus), repeat)
+    return [
+        Result("chunking.chunk_text", megabytes / single, "MB/s", True),
+        Result("chunking.chunk_texts", megabytes / batch, "MB/s", True),
+    ]
+
+
+def bench_dag(quick: bool, repeat: int) -> List[Result]:
+    from ai_cookbook.pipeline.validation import validate_dag
+
+    results = []
+    sizes = [1_000, 10_000] if quick else [1_000, 10_000, 100_000]
+    for size in sizes:
+        config = synthetic_config(size, fan_in=4)
+        nodes = {}
+        for source in config["data_sources"]:
+            nodes[source["name"]] = SyntheticNode(source["name"])
+        for step in config["processing_steps"]:
+            nodes[step["name"]] = SyntheticNode(
+                step["name"], [nodes[name] for name in step["inputs"]]
+            )
+        groups = {"node": list(nodes.values())}
+
+        def build_and_sort():
+            validate_dag(groups).dag.topological_order
+
+        seconds = best_of(build_and_sort, repeat)
+        results.append(Result(f"dag.build_sort.{size}", seconds / size * 1e6, "us/node"))
+    return results
+
+
+def bench_from_yaml(quick: bool, repeat: int) -> List[Result]:
+    import yaml
+
+    from ai_cookbook.pipeline.pipeline import Pipeline
+
+    size = 100 if quick else 500
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pipeline.yaml")
+        with open(path, "w") as f:
+            yaml.safe_dump(synthetic_config(size, fan_in=2), f)
+        seconds = best_of(lambda: Pipeline.from_yaml(path), repeat)
+    return [Result(f"pipeline.from_yaml.{size}", seconds * 1e3, "ms")]
+
+
+def bench_run_overhead(quick: bool, repeat: int) -> List[Result]:
+    """
+    Scheduling cost per edge with edge functions that do nothing, so the
+    timing is all engine: metadata, profiling, caching and dispatch
+    """
+    import logging
+
+    results = []
+    size = 100 if quick else 500
+    logging.disable(logging.INFO)
+    try:
+        for scheduler in ("serial", "thread"):
+            pipeline = synthetic_pipeline(size, fan_in=2)
+            for edge in pipeline.edges:
+                edge.function = _noop
+            seconds = best_of(
+                lambda: pipeline.run(scheduler=scheduler, use_cache=False), repeat
+            )
+            per_edge = seconds / len(pipeline.edges) * 1e6
+            results.append(Result(f"pipeline.run.{scheduler}", per_edge, "us/edge"))
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def bench_metadata(quick: bool, repeat: int) -> List[Result]:
+    from ai_cookbook.metadata.manager import MetadataManager
+
+    events = 20_000 if quick else 100_000
+
+    steps = [SyntheticNode(f"step{i}") for i in range(1_000)]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": MetadataManager,
+            "sqlite": lambda: MetadataManager.from_sqlite(
+                os.path.join(directory, f"{time.perf_counter_ns()}.db")
+            ),
+        }
+        for name, factory in backends.items():
+
+            def write():
+                manager = factory()
+                run = manager.start_run()
+                for i in range(events):
+                    manager.update_step_metadata(
+                        steps[i % len(steps)], run, "completed", edge="e", rows=i
+                    )
+                manager.finish_run(run, "completed")
+
+            seconds = best_of(write, repeat)
+            results.append(
+                Result(f"metadata.write.{name}", events / seconds, "events/s", True)
+            )
+    return results
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "chunking": bench_chunking,
+    "dag": bench_dag,
+    "from_yaml": bench_from_yaml,
+    "run": bench_run_overhead,
+    "metadata": bench_metadata,
+}
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: List[Result], baseline: dict, tolerance: float) -> List[dict]:
+    """
+    Compare results against baseline values. A change is a regression or an
+    improvement when it moves more than `tolerance` (a fraction) in the bad
+    or good direction.
+    """
+    rows = []
+    for result in results:
+        stored = baseline.get("results", {}).get(result.name)
+        row = {"name": result.name, "unit": result.unit, "value": result.value}
+        if stored is None:
+            row.update(baseline_value=None, change=None, status="new")
+        else:
+            change = result.value / stored["value"] - 1
+            better = change if result.higher_is_better else -change
+            if better < -tolerance:
+                status = "regressed"
+            elif better > tolerance:
+                status = "improved"
+            else:
+                status = "ok"
+            row.update(baseline_value=stored["value"], change=change, status=status)
+        rows.append(row)
+    return rows
+
+
+def report(rows: List[dict]) -> str:
+    lines = [
+        f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'unit':<9} "
+        f"{'change':>8}  status"
+    ]
+    for row in rows:
+        stored = "-" if row["baseline_value"] is None else f"{row['baseline_value']:.3f}"
+        change = "-" if row["change"] is None else f"{row['change']:+.1%}"
+        lines.append(
+            f"{row['name']:<28} {stored:>12} {row['value']:>12.3f} {row['unit']:<9} "
+            f"{change:>8}  {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+def main(args) -> int:
+    selected = args.only or list(BENCHMARKS)
+    results = []
+    for name in selected:
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results.extend(BENCHMARKS[name](args.quick, args.repeat))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline.get("machine") and baseline["machine"] != machine():
+        print(
+            "Warning: the baseline was recorded on a different machine, "
+            "compare with care",
+            file=sys.stderr,
+        )
+
+    rows = compare(results, baseline, args.tolerance)
+    print(report(rows))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"machine": machine(), "rows": rows}, f, indent=2)
+
+    if args.save_baseline:
+        stored = baseline.get("results", {}) if args.only else {}
+        stored.update((result.name, asdict(result)) for result in results)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine(), "results": stored}, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressed = [row["name"] for row in rows if row["status"] == "regressed"]
+    if regressed and args.fail_on_regression:
+        print(f"Regressions: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunking, DAG building, pipeline loading and "
+        "scheduling, and metadata writes on synthetic inputs, and compare the "
+        "results with a stored baseline."
+    )
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative change treated as noise (default 0.2, i.e. 20%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 when any benchmark regressed",
+    )
+    parser.add_argument("--json", help="Also write the comparison to this file")
+    sys.exit(main(parser.parse_args()))
@@ -6,7 +6,7 @@ from ai_cookbook.pipeline.pipeline import Pipeline
 import yaml
 
 
-def main(config_path):
+def main(config_path, validate_only=False):
     # Load configuration
     # with open(config_path, "r") as f:
     #     config_data = yaml.safe_load(f)
@@ -18,6 +18,12 @@ def main(config_path):
         log.exception("💔 Pipeline initialization failed:")
         return  # Exit or raise an exception
 
+    if validate_only:
+        # Check that every step's module exists without importing it
+        pipeline.validate_functions(validate_only=True)
+        log.info("✅ Pipeline configuration is valid")
+        return
+
     log.info("🔨 Pipeline initialized successfully. Executing pipeline...")
     pipeline.run()
 
@@ -31,12 +37,17 @@ if __name__ == "__main__":
         required=True,
         help="Path to the pipeline configuration file.",
     )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Validate the configuration without running the pipeline.",
+    )
     args = parser.parse_args()
 
     sys.excepthook = handle_exception
 
     try:
-        main(args.config)
+        main(args.config, validate_only=args.validate_only)
     except Exception as e:
         log.error(e)
         # raise
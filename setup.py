@@ -16,8 +16,11 @@ setup(
     install_requires=[
         "databricks-sdk",
         "mlflow",
+        "numpy",
+        "pyarrow",
         "pydantic-settings",
         "pydantic",
+        "pypdf",
         "pyyaml",
         "requests",
         "rich",
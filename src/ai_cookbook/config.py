@@ -1,11 +1,11 @@
 import os
-import pkg_resources
+from importlib.resources import files
 
 
 # Get paths to config files
 def get_config_path(filename):
     try:
-        return pkg_resources.resource_filename("ai_cookbook", os.path.join(filename))
+        return str(files("ai_cookbook") / filename)
     except Exception as e:
         # Fallback for development
         project_root = os.path.dirname(
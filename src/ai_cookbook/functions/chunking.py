@@ -1,25 +1,268 @@
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100):
-    if len(text) <= chunk_size:
-        return [text]
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Sequence, Union
 
-    chunks = []
-    start = 0
+import numpy as np
 
-    while start < len(text):
-        end = start + chunk_size
 
-        if end < len(text):
-            while end > start and text[end] != " ":
-                end -= 1
-            if end == start:
-                end = start + chunk_size
+class TextChunks(Sequence):
+    """
+    Chunks of a single document, stored as (start, end) character offsets
+    into the original text. A chunk string is only sliced out of the text
+    when it is accessed.
+    """
+
+    def __init__(self, text: str, offsets: np.ndarray):
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TextChunks(self.text, self.offsets[index])
+        start, end = self.offsets[index]
+        return self.text[start:end]
+
+    def __iter__(self) -> Iterator[str]:
+        text = self.text
+        for start, end in self.offsets.tolist():
+            yield text[start:end]
+
+    def __repr__(self):
+        return f"TextChunks(chunks={len(self)}, chars={len(self.text)})"
+
+
+class ChunkBatch(Sequence):
+    """
+    Chunks of many documents. `offsets[i]` holds the (start, end) offsets of
+    chunk `i` within `texts[doc_ids[i]]`.
+    """
+
+    def __init__(self, texts: List[str], offsets: np.ndarray, doc_ids: np.ndarray):
+        self.texts = texts
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index) -> str:
+        start, end = self.offsets[index]
+        return self.texts[self.doc_ids[index]][start:end]
+
+    def __iter__(self) -> Iterator[str]:
+        texts = self.texts
+        doc_ids = self.doc_ids.tolist()
+        for doc_id, (start, end) in zip(doc_ids, self.offsets.tolist()):
+            yield texts[doc_id][start:end]
+
+    def document(self, doc_id: int) -> TextChunks:
+        """
+        Return the chunks of a single document in the batch
+        """
+        lo, hi = np.searchsorted(self.doc_ids, [doc_id, doc_id + 1])
+        return TextChunks(self.texts[doc_id], self.offsets[lo:hi])
+
+    def __repr__(self):
+        return f"ChunkBatch(documents={len(self.texts)}, chunks={len(self)})"
+
+
+def space_positions(text: str) -> np.ndarray:
+    """
+    Sorted character positions of every space in `text`
+    """
+    if text.isascii():
+        codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    else:
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return np.flatnonzero(codes == 32)
+
+
+def _chunk_bounds(
+    length: int, spaces: np.ndarray, chunk_size: int, overlap: int
+) -> np.ndarray:
+    if length <= chunk_size:
+        return np.array([[0, length]], dtype=np.int64)
+
+    # Binary search the precomputed spaces instead of scanning back char by char
+    bounds = []
+    start = 0
+    while start < length:
+        end = start + chunk_size
+        if end < length:
+            index = np.searchsorted(spaces, end, side="right") - 1
+            if index >= 0 and spaces[index] > start:
+                end = int(spaces[index])
         else:
-            end = len(text)
+            end = length
+
+        bounds.append((start, end))
+        if end == length:
+            break
+
+        next_start = max(end - overlap, 0)
+        # Always move forward, even when the overlap reaches back past `start`
+        start = next_start if next_start > start else end
+
+    return np.array(bounds, dtype=np.int64)
+
+
+def chunk_offsets(
+    text: str, chunk_size: int = 1000, overlap: int = 100
+) -> TextChunks:
+    """
+    Split `text` into chunks of at most `chunk_size` characters that break on
+    spaces and overlap by `overlap` characters, without copying the text
+    """
+    return TextChunks(
+        text, _chunk_bounds(len(text), space_positions(text), chunk_size, overlap)
+    )
+
+
+def chunk_texts(
+    texts: Sequence[str], chunk_size: int = 1000, overlap: int = 100
+) -> ChunkBatch:
+    """
+    Chunk many documents in one call, as offsets into the original texts.
+    Each document is searched for spaces on its own, and only when it is
+    longer than `chunk_size`, so the batch is never joined or re-encoded.
+    """
+    texts = list(texts)
+    empty = np.empty(0, dtype=np.int64)
+    offsets = []
+    doc_ids = []
+    for doc_id, text in enumerate(texts):
+        length = len(text)
+        spaces = space_positions(text) if length > chunk_size else empty
+        bounds = _chunk_bounds(length, spaces, chunk_size, overlap)
+        offsets.append(bounds)
+        doc_ids.append(np.full(len(bounds), doc_id, dtype=np.int64))
+
+    if not offsets:
+        return ChunkBatch(texts, np.empty((0, 2), dtype=np.int64), empty)
+    return ChunkBatch(texts, np.concatenate(offsets), np.concatenate(doc_ids))
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100):
+    return list(chunk_offsets(text, chunk_size, overlap))
+
+
+def chunk_records(
+    records: Iterable[dict], chunk_size: int = 1000, overlap: int = 100
+) -> Iterator[dict]:
+    """
+    Chunk a stream of text records, e.g. the pages yielded by
+    `extract_text_from_pdf`, into one {"path", "page", "chunk_index", "text"}
+    record per chunk. `chunk_index` numbers the chunks of each page, since
+    pages of different files may arrive interleaved. Blank pages yield no
+    chunks.
+    """
+    for record in records:
+        text = record.get("text") or ""
+        if not text.strip():
+            continue
+        for index, chunk in enumerate(chunk_offsets(text, chunk_size, overlap)):
+            yield {
+                "path": record.get("path"),
+                "page": record.get("page"),
+                "chunk_index": index,
+                "text": chunk,
+            }
+
+
+class RegexTokenizer:
+    """
+    Splits text into words and punctuation marks. Used when no model
+    tokenizer is requested; it tends to count slightly more tokens than
+    subword tokenizers, so budgets stay on the safe side.
+    """
+
+    pattern = re.compile(r"\w+|[^\w\s]")
+
+    def token_offsets(self, text: str) -> np.ndarray:
+        offsets = [match.span() for match in self.pattern.finditer(text)]
+        return np.array(offsets, dtype=np.int64).reshape(-1, 2)
+
+
+class TiktokenTokenizer:
+    def __init__(self, encoding_name: str):
+        import tiktoken
+
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def token_offsets(self, text: str) -> np.ndarray:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, starts = self.encoding.decode_with_offsets(tokens)
+        starts = np.array(starts, dtype=np.int64)
+        ends = np.append(starts[1:], len(text))
+        return np.stack([starts, ends], axis=1)
+
+
+class HuggingFaceTokenizer:
+    def __init__(self, model_name: str):
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_pretrained(model_name)
+
+    def token_offsets(self, text: str) -> np.ndarray:
+        encoding = self.tokenizer.encode(text, add_special_tokens=False)
+        return np.array(encoding.offsets, dtype=np.int64).reshape(-1, 2)
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name: str = "regex"):
+    """
+    Load a tokenizer once per process. `name` is "regex", "tiktoken:<encoding>"
+    (e.g. "tiktoken:cl100k_base") or "hf:<model>" for a Hugging Face tokenizer.
+    """
+    if name == "regex":
+        return RegexTokenizer()
+    kind, _, model = name.partition(":")
+    if kind == "tiktoken" and model:
+        return TiktokenTokenizer(model)
+    if kind == "hf" and model:
+        return HuggingFaceTokenizer(model)
+    raise ValueError(f"Unknown tokenizer: {name}")
+
+
+def _token_windows(
+    token_offsets: np.ndarray, length: int, max_tokens: int, overlap_tokens: int
+) -> np.ndarray:
+    count = len(token_offsets)
+    if count == 0:
+        return np.array([[0, length]], dtype=np.int64)
+
+    step = max(max_tokens - overlap_tokens, 1)
+    first = np.arange(0, count, step)
+    last = np.minimum(first + max_tokens, count) - 1
+    # Drop the windows that only repeat the tail of the one reaching the end
+    keep = np.searchsorted(last, count - 1) + 1
+    first, last = first[:keep], last[:keep]
+    return np.stack([token_offsets[first, 0], token_offsets[last, 1]], axis=1)
 
-        chunks.append(text[start:end])
-        start = end - overlap
 
-        if start < 0:
-            start = 0
+def chunk_tokens(
+    text: str,
+    max_tokens: int = 512,
+    overlap_tokens: int = 50,
+    tokenizer: Union[str, object] = "regex",
+) -> TextChunks:
+    """
+    Split `text` into chunks of at most `max_tokens` tokens overlapping by
+    `overlap_tokens`. The text is tokenized once and each token window is
+    mapped back to character offsets, so chunks can be packed right up to an
+    embedding model's token limit.
 
-    return chunks
+    `tokenizer` is a name understood by `get_tokenizer` or any object with a
+    `token_offsets(text)` method returning (start, end) character offsets.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    if isinstance(tokenizer, str):
+        tokenizer = get_tokenizer(tokenizer)
+    offsets = tokenizer.token_offsets(text)
+    return TextChunks(
+        text, _token_windows(offsets, len(text), max_tokens, overlap_tokens)
+    )
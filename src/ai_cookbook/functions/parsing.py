@@ -1,19 +1,158 @@
-# from pyspark.sql.functions import udf
-# from pyspark.sql.types import StringType
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
 
+from ai_cookbook.logging.logger import log
+from ai_cookbook.utils.file_manifest import ManifestDiff, VolumeManifest
 
-def extract_text_from_pdf(input_table, output_table):
-    pass
-    # TODO: use spark global in Databricks context
-    # spark = get_spark_session()
-    # df = spark.read.format("delta").table(input_table)
 
-    # # UDF to extract text
-    # def pdf_to_text(binary_content):
-    #     # Implement text extraction logic
-    #     pass
+def read_pdf_pages(path: str) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF
+    """
+    from pypdf import PdfReader
 
-    # pdf_to_text_udf = udf(pdf_to_text, StringType())
-    # result_df = df.withColumn("text", pdf_to_text_udf(df["content"]))
+    reader = PdfReader(path)
+    for page in reader.pages:
+        yield page.extract_text() or ""
 
-    # result_df.write.format("delta").mode("overwrite").saveAsTable(output_table)
+
+def iter_pdf_paths(source) -> Iterator[str]:
+    """
+    Resolve a step input to PDF paths. `source` may be a file, a directory
+    (searched recursively), or an iterable of paths, path-like objects (such
+    as `SourceFile`) or records with a "path"
+    """
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        yield os.path.join(root, name)
+        else:
+            yield source
+        return
+
+    for item in source:
+        if isinstance(item, dict):
+            item = item["path"]
+        yield from iter_pdf_paths(item)
+
+
+# Set in each worker process by `_init_worker`
+_pages = None
+_page_reader = None
+
+
+class _FileDone:
+    def __init__(self, path: str, pages: int, error: Optional[str] = None):
+        self.path = path
+        self.pages = pages
+        self.error = error
+
+
+def _init_worker(pages, page_reader):
+    global _pages, _page_reader
+    _pages = pages
+    _page_reader = page_reader
+
+
+def _extract_file(path: str):
+    page_number = 0
+    try:
+        for page_number, text in enumerate(_page_reader(path), start=1):
+            _pages.put({"path": path, "page": page_number, "text": text})
+    except Exception as e:
+        _pages.put(_FileDone(path, page_number, error=str(e)))
+    else:
+        _pages.put(_FileDone(path, page_number))
+
+
+def extract_text_from_pdf(
+    source,
+    output_table: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    manifest_path: Optional[str] = None,
+    page_reader: Callable[[str], Iterable[str]] = read_pdf_pages,
+    queue_size: int = 256,
+) -> Iterator[dict]:
+    """
+    Extract text from PDFs across a process pool, yielding one
+    {"path", "page", "text"} record per page as soon as it is parsed.
+
+    Files whose size and mtime (or, if only the mtime moved, content hash)
+    are unchanged in the manifest at `manifest_path` are skipped, see
+    `VolumeManifest`. Files that fail to parse are logged and left out of
+    the manifest so they are retried on the next run. The manifest is only
+    updated once all pages have been consumed.
+    `page_reader` must be picklable, i.e. a module-level function.
+    """
+    manifest = VolumeManifest(manifest_path)
+    listing = {}
+    for path in iter_pdf_paths(source):
+        stat = os.stat(path)
+        listing[path] = (stat.st_size, stat.st_mtime_ns)
+    diff = manifest.diff("", listing, hash_files=manifest_path is not None)
+    todo = {entry.path: entry for entry in diff.added + diff.changed}
+    log.info(f"Extracting {len(todo)} PDFs ({diff.unchanged} unchanged)")
+    # `source` may be any subset of the files seen before, so files missing
+    # from it are not tombstoned
+    extracted = ManifestDiff(touched=diff.touched)
+    if not todo:
+        manifest.apply(extracted)
+        manifest.close()
+        return
+
+    context = multiprocessing.get_context()
+    pages = context.Queue(maxsize=queue_size)
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(pages, page_reader),
+    )
+    futures = [executor.submit(_extract_file, path) for path in todo]
+    remaining = len(futures)
+    try:
+        while remaining:
+            try:
+                item = pages.get(timeout=1)
+            except queue.Empty:
+                # A worker that died never reports back, surface its error instead
+                for future in futures:
+                    if (
+                        future.done()
+                        and not future.cancelled()
+                        and future.exception() is not None
+                    ):
+                        raise future.exception()
+                continue
+
+            if not isinstance(item, _FileDone):
+                yield item
+                continue
+
+            remaining -= 1
+            if item.error is not None:
+                log.error(f"Failed to extract {item.path}: {item.error}")
+            else:
+                extracted.added.append(todo[item.path])
+        # Only a fully consumed run counts, files yielded to a consumer that
+        # stopped early or failed are extracted again next time
+        manifest.apply(extracted)
+    finally:
+        if remaining:
+            # The consumer stopped early: unblock workers stuck on a full queue
+            for future in futures:
+                future.cancel()
+            while not all(future.done() for future in futures):
+                try:
+                    pages.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        executor.shutdown()
+        manifest.close()
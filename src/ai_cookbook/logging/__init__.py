@@ -1,3 +1,18 @@
-from rich.console import Console
+from functools import lru_cache
 
-console = Console()
+
+@lru_cache(maxsize=None)
+def get_console():
+    """
+    Shared rich console, created on first use so importing the package does
+    not import rich
+    """
+    from rich.console import Console
+
+    return Console()
+
+
+def __getattr__(name):
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
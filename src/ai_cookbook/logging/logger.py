@@ -1,13 +1,89 @@
 from ..config import LOGGING_CONFIG
 import logging
-import logging.config
 import sys
+import atexit
 import os
+import threading
+from typing import Optional
 
 
-logging.config.fileConfig(LOGGING_CONFIG)
+# "dev" applies logging.conf (rich console output at DEBUG), "production"
+# writes JSON lines through a non-blocking queue at INFO
+LOG_PROFILE_ENV = "AI_COOKBOOK_LOG_PROFILE"
+LOG_LEVEL_ENV = "AI_COOKBOOK_LOG_LEVEL"
+LOG_PROFILES = ("dev", "production")
+
+_configure_lock = threading.RLock()
+_configured = False
+_handlers = []
+_listener = None
+
+
+def configure_logging(profile: Optional[str] = None, level: Optional[str] = None):
+    """
+    Configure logging for a profile, by default the one named by the
+    AI_COOKBOOK_LOG_PROFILE env var ("dev" if unset). Runs automatically on
+    the first record logged through `log`, since importing logging.config
+    and the rich handler is slow; call it again to switch profiles.
+    """
+    global _configured, _listener
+    profile = profile or os.environ.get(LOG_PROFILE_ENV, "dev")
+    level = level or os.environ.get(LOG_LEVEL_ENV)
+    if profile not in LOG_PROFILES:
+        raise ValueError(
+            f"Unknown logging profile '{profile}', expected one of {LOG_PROFILES}"
+        )
+
+    with _configure_lock:
+        root = logging.getLogger()
+        # Replace only what a previous call installed; handlers added by the
+        # host application or test harness stay
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in _handlers:
+            root.removeHandler(handler)
+        existing = list(root.handlers)
+
+        if profile == "production":
+            from ai_cookbook.logging.structured import start_structured_logging
+
+            _listener = start_structured_logging(level=level or logging.INFO)
+        else:
+            from logging.config import fileConfig
+
+            fileConfig(LOGGING_CONFIG, disable_existing_loggers=False)
+            for handler in existing:
+                if handler not in root.handlers:
+                    root.addHandler(handler)
+            if level:
+                root.setLevel(level)
+
+        _handlers[:] = [h for h in root.handlers if h not in existing]
+        if not _configured:
+            atexit.register(_stop_listener)
+        _configured = True
+
+
+def _stop_listener():
+    # Flush queued records on interpreter exit
+    if _listener is not None:
+        _listener.stop()
+
+
+class _ConfigureOnFirstRecord(logging.Filter):
+    def filter(self, record):
+        if not _configured:
+            with _configure_lock:
+                if not _configured:
+                    configure_logging()
+        return True
+
 
 log = logging.getLogger("root")
+# Until logging.conf is applied, let every record reach the filter below
+log.setLevel(logging.NOTSET)
+log.addFilter(_ConfigureOnFirstRecord())
 
 
 def handle_exception(exc_type, exc_value, exc_traceback):
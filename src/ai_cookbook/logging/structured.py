@@ -0,0 +1,98 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import IO, Optional
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record. The message is only interpolated here, so
+    with `%`-style arguments the cost is paid by the listener thread.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the logging thread: records are queued
+    as they are, without being formatted, and dropped (and counted) when the
+    queue is full
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue stays in process, so the record needs no pickling
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Summary:
+    """
+    Truncated repr of a value, computed only when the record is formatted
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = repr(self.value)
+        if len(text) <= self.limit:
+            return text
+        size = f", len={len(self.value)}" if hasattr(self.value, "__len__") else ""
+        return f"{text[: self.limit]}... ({type(self.value).__name__}{size})"
+
+
+def summarize(value, limit: int = 200) -> _Summary:
+    """
+    Log argument for potentially large values such as edge results, e.g.
+    `log.info("Edge completed: %s", summarize(result))`
+    """
+    return _Summary(value, limit)
+
+
+def start_structured_logging(
+    level: int = logging.INFO,
+    stream: Optional[IO] = None,
+    max_queue_size: int = 10_000,
+) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a non-blocking queue to a listener thread
+    that writes JSON lines to `stream` (stderr by default). Returns the
+    started listener; stop it to flush the queue.
+    """
+    log_queue = queue.Queue(maxsize=max_queue_size)
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonLinesFormatter())
+    listener = logging.handlers.QueueListener(
+        log_queue, output, respect_handler_level=True
+    )
+
+    root = logging.getLogger()
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    root.setLevel(level)
+    listener.start()
+    return listener
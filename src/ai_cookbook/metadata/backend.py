@@ -0,0 +1,234 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+
+class MetadataBackend(ABC):
+    """
+    Interface for persisting run metadata. Writes may be buffered; `flush`
+    must make everything recorded so far durable. Step results are recorded
+    and returned already pickled.
+    """
+
+    @abstractmethod
+    def record_run(self, run_id: str, started_at: float):
+        ...
+
+    @abstractmethod
+    def finish_run(self, run_id: str, status: str, finished_at: float):
+        ...
+
+    @abstractmethod
+    def record_event(
+        self,
+        run_id: str,
+        node: str,
+        status: str,
+        timestamp: float,
+        edge: Optional[str] = None,
+        rows: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        result_key: Optional[str] = None,
+    ):
+        ...
+
+    @abstractmethod
+    def record_result(self, key: str, payload: bytes, fingerprint: Optional[str]):
+        ...
+
+    @abstractmethod
+    def get_result(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        ...
+
+    @abstractmethod
+    def get_events(self, run_id: str) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def list_runs(self, limit: int = 20) -> List[dict]:
+        ...
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class SQLiteMetadataBackend(MetadataBackend):
+    """
+    SQLite metadata store. Events and results are buffered and written with
+    `executemany` in a single transaction once `batch_size` rows are pending,
+    so large DAGs pay for one commit per batch instead of one per transition.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        status TEXT
+    );
+    CREATE TABLE IF NOT EXISTS node_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL,
+        node TEXT NOT NULL,
+        edge TEXT,
+        status TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        rows INTEGER,
+        fingerprint TEXT,
+        result_key TEXT
+    );
+    CREATE INDEX IF NOT EXISTS node_events_run ON node_events (run_id, node);
+    CREATE TABLE IF NOT EXISTS step_results (
+        key TEXT PRIMARY KEY,
+        fingerprint TEXT,
+        result BLOB,
+        created_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._events: List[tuple] = []
+        self._results: List[tuple] = []
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+        columns = {
+            row[1]
+            for row in self._connection.execute("PRAGMA table_info(node_events)")
+        }
+        if "result_key" not in columns:
+            # Databases created before results were linked to their events
+            self._connection.execute("ALTER TABLE node_events ADD COLUMN result_key TEXT")
+
+    def record_run(self, run_id: str, started_at: float):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at) VALUES (?, ?)",
+                (run_id, started_at),
+            )
+
+    def finish_run(self, run_id: str, status: str, finished_at: float):
+        self.flush()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?",
+                (finished_at, status, run_id),
+            )
+
+    def record_event(
+        self,
+        run_id: str,
+        node: str,
+        status: str,
+        timestamp: float,
+        edge: Optional[str] = None,
+        rows: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        result_key: Optional[str] = None,
+    ):
+        with self._lock:
+            self._events.append(
+                (run_id, node, edge, status, timestamp, rows, fingerprint, result_key)
+            )
+            if len(self._events) >= self.batch_size:
+                self._flush_locked()
+
+    def record_result(self, key: str, payload: bytes, fingerprint: Optional[str]):
+        with self._lock:
+            self._results.append((key, fingerprint, payload, time.time()))
+            if len(self._results) >= self.batch_size:
+                self._flush_locked()
+
+    def get_result(self, key: str):
+        self.flush()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result, fingerprint FROM step_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def get_events(self, run_id: str) -> List[dict]:
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT node, edge, status, timestamp, rows, fingerprint, result_key "
+                "FROM node_events WHERE run_id = ? ORDER BY id",
+                (run_id,),
+            ).fetchall()
+        columns = (
+            "node",
+            "edge",
+            "status",
+            "timestamp",
+            "rows",
+            "fingerprint",
+            "result_key",
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    def list_runs(self, limit: int = 20) -> List[dict]:
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_id, started_at, finished_at, status FROM runs "
+                "ORDER BY started_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        columns = ("run_id", "started_at", "finished_at", "status")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._events and not self._results:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO node_events "
+                "(run_id, node, edge, status, timestamp, rows, fingerprint, result_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._events,
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO step_results "
+                "(key, fingerprint, result, created_at) VALUES (?, ?, ?, ?)",
+                self._results,
+            )
+        self._events = []
+        self._results = []
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+
+def node_timings(events: List[dict]) -> Dict[str, float]:
+    """
+    Seconds between the first "running" and the last terminal event per node
+    """
+    started: Dict[str, float] = {}
+    timings: Dict[str, float] = {}
+    for event in events:
+        node = event["node"]
+        if event["status"] == "running":
+            started.setdefault(node, event["timestamp"])
+        elif node in started:
+            timings[node] = event["timestamp"] - started[node]
+    return timings
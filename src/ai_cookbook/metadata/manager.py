@@ -1,16 +1,31 @@
+import pickle
+import threading
+import time
 import uuid
 from datetime import datetime
-from collections import defaultdict
-from rich.table import Table
-from rich.text import Text
+from collections import OrderedDict
+from typing import Optional
 
 
 class Run:
     def __init__(self, run_id: str):
         self.run_id = run_id
         self.start_time = datetime.now()
+        # Node name -> "hit" or "miss" for nodes looked up in the step cache
+        self.cache_report = {}
+        # Node name -> records emitted, filled in by streaming runs
+        self.record_counts = {}
+        # Id of the failed run this run resumed, if any
+        self.resumed_from = None
+        # RunProfile with per-edge timings and sizes, see pipeline.profiling
+        self.profile = None
+        # ProgressReporter notified of edge transitions, see pipeline.progress
+        self.progress = None
 
     def __rich__(self):
+        from rich.table import Table
+        from rich.text import Text
+
         table = Table(show_header=False, box=None)
         table.add_row(
             Text("Run ID: ", style="bold blue"), Text(self.run_id, style="cyan")
@@ -24,24 +39,105 @@ class Run:
 
 class MetadataManager:
     """
-    In-memory metadata manager
+    In-memory metadata manager, optionally persisting everything it records
+    to a `MetadataBackend` (e.g. `SQLiteMetadataBackend`)
+
+    Step results are kept pickled, and only the `max_results` most recently
+    used in memory; older ones are read back from the backend (without one,
+    they are no longer reusable).
     """
 
-    def __init__(self):
+    def __init__(self, backend=None, max_results: int = 64):
         self.step_metadata = {}
+        # Cache key -> (pickled result, result fingerprint), least recently
+        # used first
+        self.step_results = OrderedDict()
+        self.max_results = max_results
+        # Run id -> edge name -> (result key, fingerprint) of every edge whose
+        # result was produced or reused, used to resume failed runs
+        self.edge_results = {}
+        self.backend = backend
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_sqlite(cls, path: str, batch_size: int = 500) -> "MetadataManager":
+        from ai_cookbook.metadata.backend import SQLiteMetadataBackend
 
-    def update_step_metadata(self, step, run: Run, status: str):
+        return cls(backend=SQLiteMetadataBackend(path, batch_size=batch_size))
+
+    def update_step_metadata(
+        self,
+        step,
+        run: Run,
+        status: str,
+        edge: Optional[str] = None,
+        rows: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        result_key: Optional[str] = None,
+    ):
         """
         Adds a new entry to the step metadata dictionary
         """
-        if run.run_id not in self.step_metadata:
-            self.step_metadata[run.run_id] = {}
-        if step.name not in self.step_metadata[run.run_id]:
-            self.step_metadata[run.run_id][step.name] = []
-        self.step_metadata[run.run_id][step.name].append(status)
+        with self._lock:
+            if run.run_id not in self.step_metadata:
+                self.step_metadata[run.run_id] = {}
+            if step.name not in self.step_metadata[run.run_id]:
+                self.step_metadata[run.run_id][step.name] = []
+            self.step_metadata[run.run_id][step.name].append(status)
+            if edge is not None and result_key is not None:
+                self.edge_results.setdefault(run.run_id, {})[edge] = (
+                    result_key,
+                    fingerprint,
+                )
+        if self.backend is not None:
+            self.backend.record_event(
+                run.run_id,
+                step.name,
+                status,
+                time.time(),
+                edge=edge,
+                rows=rows,
+                fingerprint=fingerprint,
+                result_key=result_key,
+            )
 
-    def write_step_result(self, result):
-        pass
+    def write_step_result(self, result, key=None, fingerprint=None, payload=None):
+        """
+        Stores a step result under its cache key so later runs can reuse it.
+        Pass the result already pickled as `payload` to avoid pickling twice.
+        """
+        if key is None:
+            return
+        if payload is None:
+            payload = pickle.dumps(result)
+        self._remember(key, (payload, fingerprint))
+        if self.backend is not None:
+            self.backend.record_result(key, payload, fingerprint)
+
+    def get_step_result(self, key):
+        """
+        Returns the (result, fingerprint) stored under a cache key, or None.
+        Every call unpickles a fresh copy of the result.
+        """
+        with self._lock:
+            entry = self.step_results.get(key)
+            if entry is not None:
+                self.step_results.move_to_end(key)
+        if entry is None and self.backend is not None:
+            entry = self.backend.get_result(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            return None
+        payload, fingerprint = entry
+        return pickle.loads(payload), fingerprint
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self.step_results[key] = entry
+            self.step_results.move_to_end(key)
+            while len(self.step_results) > self.max_results:
+                self.step_results.popitem(last=False)
 
     def get_metadata(self, run: Run):
         """
@@ -51,8 +147,49 @@ class MetadataManager:
             self.step_metadata[run.run_id] = {}
         return self.step_metadata[run.run_id]
 
+    def get_node_statuses(self, run_id: str):
+        """
+        Latest status of every node in a run, read from the backend for runs
+        from earlier processes
+        """
+        if run_id in self.step_metadata:
+            return {
+                node: statuses[-1]
+                for node, statuses in self.step_metadata[run_id].items()
+            }
+        if self.backend is None:
+            return {}
+        return {
+            event["node"]: event["status"] for event in self.backend.get_events(run_id)
+        }
+
+    def get_edge_results(self, run_id: str):
+        """
+        Edge name -> (result key, fingerprint) for every edge of a run that
+        produced or reused a result
+        """
+        if run_id in self.edge_results:
+            return dict(self.edge_results[run_id])
+        if self.backend is None:
+            return {}
+        return {
+            event["edge"]: (event["result_key"], event["fingerprint"])
+            for event in self.backend.get_events(run_id)
+            if event["edge"] is not None and event["result_key"] is not None
+        }
+
     def start_run(self):
         """
         Logs the start of a run with a unique ID and the current timestamp.
         """
-        return Run(str(uuid.uuid4()))
+        run = Run(str(uuid.uuid4()))
+        if self.backend is not None:
+            self.backend.record_run(run.run_id, run.start_time.timestamp())
+        return run
+
+    def finish_run(self, run: Run, status: str):
+        """
+        Records the final status of a run and flushes pending metadata
+        """
+        if self.backend is not None:
+            self.backend.finish_run(run.run_id, status, time.time())
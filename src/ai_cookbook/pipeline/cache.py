@@ -0,0 +1,190 @@
+import hashlib
+import json
+import pickle
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .dag import Edge
+from .function_ref import FunctionRef, resolve_function
+
+
+def _digest(*parts) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _code_digest(code) -> str:
+    # Nested code objects repr with their memory address, so hash them recursively
+    consts = [
+        _code_digest(const) if hasattr(const, "co_code") else repr(const)
+        for const in code.co_consts
+    ]
+    return _digest(code.co_code.hex(), consts, list(code.co_names))
+
+
+def function_identity(function) -> str:
+    """
+    Identify a step or edge function by its import path and bytecode, so that
+    editing the function body invalidates cached results
+    """
+    if function is None:
+        return "None"
+    if isinstance(function, partial):
+        return _digest(function_identity(function.func), function.keywords)
+    if isinstance(function, (str, FunctionRef)):
+        function = resolve_function(str(function))
+
+    name = f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}"
+    code = getattr(function, "__code__", None)
+    if code is None:
+        return name
+    return f"{name}:{_code_digest(code)}"
+
+
+def node_identity(node) -> str:
+    """
+    Fingerprint of a node's own configuration, excluding its inputs
+    """
+    config = node.model_dump(exclude={"inputs", "function"})
+    function = getattr(node, "function", None)
+    return _digest(type(node).__name__, config, function_identity(function))
+
+
+def source_fingerprint(source) -> Optional[str]:
+    """
+    Fingerprint of the files of a local volume source (path, size and mtime
+    of each), so adding, editing or removing a file changes the cache key of
+    its edges. None for other nodes.
+    """
+    from .ingestion import volume_root
+    from ai_cookbook.utils.file_manifest import list_files
+
+    if getattr(source, "type", None) != "volume":
+        return None
+    root = volume_root(source)
+    if root is None:
+        return None
+    suffix = f".{source.format}" if source.format else None
+    return _digest(sorted(list_files(root, suffix=suffix).items()))
+
+
+def _reusable(result) -> Optional[bytes]:
+    # Iterators are exhausted by their first consumer and must not be handed
+    # to a later run; neither can results that cannot be pickled
+    output = getattr(result, "output", result)
+    if isinstance(result, Iterator) or isinstance(output, Iterator):
+        return None
+    try:
+        return pickle.dumps(result)
+    except Exception:
+        return None
+
+
+class StepCache:
+    """
+    Content-addressed cache of edge results for a single run.
+
+    An edge is keyed on its edge function, the configuration of both of its
+    nodes (including the destination's function and parameters), and the
+    result fingerprint of its source node. Source fingerprints chain through
+    the DAG, so a change anywhere upstream invalidates every downstream edge.
+    Results live in the metadata manager, which lets later runs (and
+    pipelines sharing the manager) reuse them.
+    """
+
+    def __init__(
+        self,
+        metadata_manager,
+        get_incoming_edges: Callable[[str], List[Edge]],
+        enabled: bool = True,
+        resume=None,
+    ):
+        self.metadata_manager = metadata_manager
+        self.get_incoming_edges = get_incoming_edges
+        self.enabled = enabled
+        # ResumeState of the run being resumed, consulted before the cache
+        self.resume = resume
+        self.report: Dict[str, str] = {}
+        self._keys: Dict[Edge, str] = {}
+        self._edge_fingerprints: Dict[Edge, str] = {}
+
+    def node_fingerprint(self, node) -> str:
+        incoming = self.get_incoming_edges(node.name)
+        if not incoming:
+            return node_identity(node)
+        return _digest([self._edge_fingerprints[edge] for edge in incoming])
+
+    def key(self, edge: Edge) -> str:
+        if edge not in self._keys:
+            self._keys[edge] = _digest(
+                function_identity(edge.function),
+                node_identity(edge.source),
+                node_identity(edge.destination),
+                self.node_fingerprint(edge.source),
+                source_fingerprint(edge.source),
+            )
+        return self._keys[edge]
+
+    def lookup(self, edge: Edge) -> Tuple[bool, Optional[object]]:
+        """
+        Return (True, result) if the edge has a cached result, else (False, None)
+        """
+        # Incremental sources track what changed in their own manifest, and
+        # table contents are not part of the key; a configuration-keyed
+        # result would hide newly added files or rows
+        incremental = (
+            getattr(edge.source, "manifest_path", None) is not None
+            or getattr(edge.source, "type", None) == "delta"
+        )
+        entry = (
+            self.metadata_manager.get_step_result(self.key(edge))
+            if self.enabled and not incremental
+            else None
+        )
+        if entry is None:
+            self.report[edge.destination.name] = "miss"
+            return False, None
+
+        result, fingerprint = entry
+        self._edge_fingerprints[edge] = fingerprint
+        self.report.setdefault(edge.destination.name, "hit")
+        return True, result
+
+    def fingerprint(self, edge: Edge) -> Optional[str]:
+        return self._edge_fingerprints.get(edge)
+
+    def restore(self, edge: Edge, fingerprint: str):
+        """
+        Record the fingerprint of a result reused from an earlier run, so
+        downstream keys chain through it as if it had just been computed
+        """
+        self._edge_fingerprints[edge] = fingerprint
+        self.report.setdefault(edge.destination.name, "resumed")
+
+    def store(self, edge: Edge, result) -> Optional[str]:
+        """
+        Persist a freshly computed result under its key and return its
+        fingerprint. Iterators and unpicklable results only get a fingerprint,
+        and nothing is hashed or persisted while the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        payload = _reusable(result)
+        fingerprint = hashlib.sha256(
+            payload if payload is not None else repr(result).encode()
+        ).hexdigest()
+        self._edge_fingerprints[edge] = fingerprint
+        if payload is not None:
+            # The pickle the fingerprint was taken of is what gets stored
+            self.metadata_manager.write_step_result(
+                result, key=self.key(edge), fingerprint=fingerprint, payload=payload
+            )
+        return fingerprint
+
+    @property
+    def hits(self) -> List[str]:
+        return [node for node, status in self.report.items() if status == "hit"]
+
+    @property
+    def misses(self) -> List[str]:
+        return [node for node, status in self.report.items() if status == "miss"]
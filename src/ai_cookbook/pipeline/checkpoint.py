@@ -0,0 +1,41 @@
+from typing import Dict, Optional, Set, Tuple
+
+from .dag import Edge
+
+
+class ResumeState:
+    """
+    Decides which edges of a resumed run can reuse the result persisted by
+    the earlier run `run_id`.
+
+    An edge is reused if it produced a result in that run and its source node
+    is not being re-executed. Edges are asked in dependency order (every
+    scheduler only dispatches an edge once its source has completed), so a
+    node becomes dirty as soon as one of its incoming edges has to run again,
+    and everything downstream of it is re-executed too.
+    """
+
+    def __init__(self, metadata_manager, run_id: str):
+        if not metadata_manager.get_node_statuses(run_id):
+            raise ValueError(f"Run {run_id} not found, cannot resume from it")
+        self.metadata_manager = metadata_manager
+        self.run_id = run_id
+        self.edge_results: Dict[str, Tuple[str, Optional[str]]] = (
+            metadata_manager.get_edge_results(run_id)
+        )
+        self.rerun: Set[str] = set()
+
+    def lookup(self, edge: Edge, edge_name: str):
+        """
+        Return (True, result, result key, fingerprint) if the edge can reuse
+        its earlier result, else (False, None, None, None)
+        """
+        entry = None
+        if edge.source.name not in self.rerun and edge_name in self.edge_results:
+            key, fingerprint = self.edge_results[edge_name]
+            entry = self.metadata_manager.get_step_result(key)
+        if entry is None:
+            self.rerun.add(edge.destination.name)
+            return False, None, None, None
+        result, _ = entry
+        return True, result, key, fingerprint
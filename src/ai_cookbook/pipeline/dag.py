@@ -1,4 +1,5 @@
-from typing import Any, Optional, Callable
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 class Edge:
@@ -8,64 +9,176 @@ class Edge:
         destination: Any,
         function: Optional[Callable] = None,
         parameters: Optional[dict] = None,
+        resource: Optional[str] = None,
     ):
         self.source = source
         self.destination = destination
         self.function = function
         self.parameters = parameters or {}
+        # Name of the external resource the edge waits on, used to bound concurrency
+        self.resource = resource
 
     def __repr__(self):
         return f"Edge(source={self.source.name}, destination={self.destination.name})"
 
 
-def detect_cycles(nodes, edges):
-    from collections import defaultdict
-
-    graph = defaultdict(list)
-    for edge in edges:
-        graph[edge.source.name].append(edge.destination.name)
-
-    visited = set()
-    rec_stack = set()
-
-    def dfs(node):
-        visited.add(node)
-        rec_stack.add(node)
-
-        for neighbor in graph.get(node, []):
-            if neighbor not in visited:
-                if dfs(neighbor):
-                    return True
-            elif neighbor in rec_stack:
+def _csr(size: int, keys: List[int]) -> Tuple[List[int], List[int]]:
+    """
+    Group item indices by key: items of key k are
+    `items[offsets[k]:offsets[k + 1]]`, in their original order
+    """
+    offsets = [0] * (size + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    positions = offsets[:-1]
+    items = [0] * len(keys)
+    for item, key in enumerate(keys):
+        items[positions[key]] = item
+        positions[key] += 1
+    return offsets, items
+
+
+class CompiledDag:
+    """
+    Indexed, immutable view of a DAG.
+
+    Node names map to dense indices, and incoming and outgoing edges are
+    stored CSR-style (an offsets array into a flat array of edge indices), so
+    looking up a node's edges is a slice rather than a scan of every edge.
+    The topological order is computed once and memoized.
+    """
+
+    def __init__(self, nodes: Iterable[str], edges: Iterable[Edge]):
+        self.names: List[str] = list(nodes)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.edges: List[Edge] = list(edges)
+
+        try:
+            self.sources = [self.index[edge.source.name] for edge in self.edges]
+            self.destinations = [
+                self.index[edge.destination.name] for edge in self.edges
+            ]
+        except KeyError as e:
+            raise ValueError(f"Edge references unknown node {e}")
+
+        self.out_offsets, self.out_edges = _csr(len(self.names), self.sources)
+        self.in_offsets, self.in_edges = _csr(len(self.names), self.destinations)
+        self._order: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.index
+
+    def outgoing(self, name: str) -> List[Edge]:
+        i = self.index[name]
+        return [
+            self.edges[e]
+            for e in self.out_edges[self.out_offsets[i] : self.out_offsets[i + 1]]
+        ]
+
+    def incoming(self, name: str) -> List[Edge]:
+        i = self.index[name]
+        return [
+            self.edges[e]
+            for e in self.in_edges[self.in_offsets[i] : self.in_offsets[i + 1]]
+        ]
+
+    def in_degrees(self) -> List[int]:
+        offsets = self.in_offsets
+        return [offsets[i + 1] - offsets[i] for i in range(len(self.names))]
+
+    def _sort(self) -> List[int]:
+        """
+        Kahn's algorithm over the CSR arrays; returns fewer indices than there
+        are nodes if the graph has a cycle
+        """
+        in_degree = self.in_degrees()
+        queue = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for e in self.out_edges[self.out_offsets[i] : self.out_offsets[i + 1]]:
+                j = self.destinations[e]
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    queue.append(j)
+        return order
+
+    def find_cycles(self) -> List[List[str]]:
+        """
+        Iterative depth-first search returning one cycle path per back edge,
+        e.g. ["a", "b", "a"]. Runs in O(V + E) (plus the length of the
+        reported paths) without recursion, so long chains are fine.
+        """
+        white, grey, black = 0, 1, 2
+        color = bytearray(len(self.names))
+        # Position of each grey node on the current path
+        depth = [-1] * len(self.names)
+        # Next outgoing edge to visit per node
+        cursor = self.out_offsets[:-1]
+        cycles = []
+
+        for root in range(len(self.names)):
+            if color[root] != white:
+                continue
+            color[root] = grey
+            depth[root] = 0
+            path = [root]
+            while path:
+                i = path[-1]
+                if cursor[i] == self.out_offsets[i + 1]:
+                    color[i] = black
+                    depth[i] = -1
+                    path.pop()
+                    continue
+                j = self.destinations[self.out_edges[cursor[i]]]
+                cursor[i] += 1
+                if color[j] == white:
+                    color[j] = grey
+                    depth[j] = len(path)
+                    path.append(j)
+                elif color[j] == grey:
+                    cycles.append([self.names[k] for k in path[depth[j] :]])
+                    cycles[-1].append(self.names[j])
+        return cycles
+
+    def has_cycle(self) -> bool:
+        if self._order is None:
+            order = self._sort()
+            if len(order) != len(self.names):
                 return True
-
-        rec_stack.remove(node)
+            self._order = [self.names[i] for i in order]
         return False
 
+    @property
+    def topological_order(self) -> List[str]:
+        if self.has_cycle():
+            raise ValueError("Cycle detected in the pipeline DAG")
+        return self._order
 
-def topological_sort(nodes, edges):
-    from collections import defaultdict, deque
-
-    graph = defaultdict(list)
-    in_degree = {node: 0 for node in nodes}
 
-    for edge in edges:
-        graph[edge.source.name].append(edge.destination.name)
-        in_degree[edge.destination.name] += 1
+def build_adjacency(nodes, edges):
+    """
+    Build the outgoing edge lists and in-degree counts for every node
+    """
+    dag = nodes if isinstance(nodes, CompiledDag) else CompiledDag(nodes, edges)
+    outgoing = {name: dag.outgoing(name) for name in dag.names}
+    in_degree = dict(zip(dag.names, dag.in_degrees()))
+    return outgoing, in_degree
 
-    queue = deque([node for node in nodes if in_degree[node] == 0])
-    sorted_list = []
 
-    while queue:
-        node = queue.popleft()
-        sorted_list.append(node)
+def detect_cycles(nodes, edges) -> bool:
+    return CompiledDag(nodes, edges).has_cycle()
 
-        for neighbor in graph[node]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
 
-    if len(sorted_list) != len(nodes):
-        raise ValueError("Cycle detected in the pipeline DAG")
-
-    return sorted_list
+def topological_sort(nodes, edges):
+    return list(CompiledDag(nodes, edges).topological_order)
@@ -1,9 +1,13 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 import re
 import urllib.parse
 
-from databricks.sdk import WorkspaceClient
+if TYPE_CHECKING:
+    # The SDK is slow to import, and only the widget needs it at runtime
+    from databricks.sdk import WorkspaceClient
+
+FILTER_OPERATORS = ("=", "==", "!=", "<", "<=", ">", ">=", "in", "not in")
 
 
 class DataSource(BaseModel):
@@ -19,8 +23,17 @@ class DataSource(BaseModel):
     permissions: Optional[dict] = Field(default=None)
     details: Optional[dict] = Field(default=None)
     workspace_link: Optional[str] = Field(default=None)
+    # SQLite manifest of ingested files, enables incremental volume ingestion
+    manifest_path: Optional[str] = None
+    # Keyword arguments of the source reader, see pipeline.readers (for delta
+    # sources, of DeltaSourceReader)
+    reader_options: Optional[dict] = None
+    # Delta sources only read these columns and the rows matching every
+    # [column, operator, value] filter, see pipeline.delta_reader
+    columns: Optional[List[str]] = None
+    filters: Optional[List[list]] = None
 
-    def generate_workspace_link(self, db_client: WorkspaceClient):
+    def generate_workspace_link(self, db_client: "WorkspaceClient"):
         host = db_client.config.host
         volume_path = (
             f"/Volumes/{self.catalog}/{self.schema}/{self.volume_name}/{self.path}"
@@ -29,7 +42,7 @@ class DataSource(BaseModel):
         workspace_id = db_client.get_workspace_id()
         return f"{host}/explore/data/volumes/{self.catalog}/{self.schema}/{self.volume_name}?o={workspace_id}&volumePath={encoded_volume_path}"
 
-    def fetch_details(self, db_client: WorkspaceClient):
+    def fetch_details(self, db_client: "WorkspaceClient"):
         try:
             self.details = db_client.volumes.read(
                 f"{self.catalog}.{self.schema}.{self.volume_name}"
@@ -45,6 +58,20 @@ class DataSource(BaseModel):
             raise ValueError(f"Invalid data source type: {v}")
         return v
 
+    @field_validator("filters")
+    def validate_filters(cls, v):
+        for condition in v or []:
+            if len(condition) != 3 or condition[1] not in FILTER_OPERATORS:
+                raise ValueError(
+                    f"Invalid filter: {condition}. Expected [column, operator, value]"
+                    f" with an operator in {FILTER_OPERATORS}"
+                )
+            if condition[1] in ("in", "not in") and not isinstance(
+                condition[2], list
+            ):
+                raise ValueError(f"Filter {condition} needs a list of values")
+        return v
+
     @field_validator("table")
     def validate_table_name(cls, v, info):
         # Skip validation if type is 'volume'
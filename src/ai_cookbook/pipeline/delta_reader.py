@@ -0,0 +1,135 @@
+import operator
+import os
+from typing import Dict, Iterator, List, Optional
+
+from ai_cookbook.logging.logger import log
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.table_writer import LOG_DIR, LocalTable
+
+_OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda field, values: field.isin(values),
+    "not in": lambda field, values: ~field.isin(values),
+}
+
+
+def filter_expression(filters: Optional[List[list]]):
+    """
+    Arrow expression for `[column, operator, value]` filters, all of which
+    must hold, e.g. [["lang", "=", "en"], ["pages", ">", 2]]
+    """
+    if not filters:
+        return None
+    import pyarrow.dataset as ds
+
+    expression = None
+    for column, op, value in filters:
+        condition = _OPERATORS[op](ds.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _partition_matches(partition: Dict[str, str], filters: List[list]) -> bool:
+    # Partition values are stored as strings, so only equality is decided here;
+    # range filters are left to the Parquet row group statistics
+    for column, op, value in filters:
+        if column not in partition:
+            continue
+        stored = partition[column]
+        if op in ("=", "==") and stored != str(value):
+            return False
+        if op == "!=" and stored == str(value):
+            return False
+        if op == "in" and stored not in {str(v) for v in value}:
+            return False
+        if op == "not in" and stored in {str(v) for v in value}:
+            return False
+    return True
+
+
+class DeltaSourceReader:
+    """
+    Streams a table stored in a local directory as Arrow record batches: a
+    table written by `TableWriter` (its `_delta_log/` names the current data
+    files and schema), or any directory of Parquet files.
+
+    Only the `columns` asked for are decoded. `filters` prune whole partitions
+    using the log, skip row groups whose statistics cannot match, and drop
+    the remaining non-matching rows. Files are scanned `max_workers` at a
+    time, with batches yielded as they are decoded rather than after the
+    whole table has been read.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[list]] = None,
+        batch_size: int = 64 * 1024,
+        max_workers: int = 8,
+    ):
+        self.path = path
+        self.columns = columns
+        self.filters = filters or []
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_source(cls, source: DataSource) -> "DeltaSourceReader":
+        return cls(
+            source.path,
+            columns=source.columns,
+            filters=source.filters,
+            **(source.reader_options or {}),
+        )
+
+    def dataset(self):
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(os.path.join(self.path, LOG_DIR)):
+            return ds.dataset(self.path, format="parquet", partitioning="hive")
+        snapshot = LocalTable(self.path).snapshot()
+        files = [
+            os.path.join(self.path, path)
+            for path, add in sorted(snapshot.files.items())
+            if _partition_matches(add["partitionValues"], self.filters)
+        ]
+        log.debug(
+            "Reading %d of %d files of %s", len(files), len(snapshot.files), self.path
+        )
+        # The table schema fills in columns missing from older files
+        return ds.dataset(files, schema=snapshot.schema, format="parquet")
+
+    def iter_batches(self) -> Iterator:
+        scanner = self.dataset().scanner(
+            columns=self.columns,
+            filter=filter_expression(self.filters),
+            batch_size=self.batch_size,
+            fragment_readahead=self.max_workers,
+        )
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch
+
+    def iter_records(self) -> Iterator[dict]:
+        for batch in self.iter_batches():
+            yield from batch.to_pylist()
+
+
+def read_delta_source(source: DataSource, destination: ProcessingStep):
+    """
+    Hand the rows of a delta source to the destination step as a lazy
+    iterator of records, see `DeltaSourceReader`. Sources whose path is not a
+    local directory are not read, and the step is called without inputs.
+    """
+    if not os.path.isdir(source.path):
+        log.debug("No local table for %s, calling step without rows", source.name)
+        return destination.function()
+    return destination.function(DeltaSourceReader.from_source(source).iter_records())
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode()).digest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache for one embedding model, keyed on the hash of
+    the chunk text.
+
+    Vectors, keys and last-access stamps live in memory-mapped .npy files
+    under `directory/<model>/`, so opening a large cache only reads the keys.
+    Storage grows by doubling up to `max_entries`; once full, the least
+    recently used tenth of the entries is evicted to make room.
+    """
+
+    def __init__(self, directory: str, model: str, max_entries: int = 1_000_000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.model = model
+        self.max_entries = max_entries
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]", "_", model))
+        self._lock = threading.Lock()
+        self._slots: Dict[bytes, int] = {}
+        self._free: List[int] = []
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.clock = 0
+        self.vectors = None
+        self.keys = None
+        self.access = None
+
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.clock = meta["clock"]
+            self._open("r+")
+            for slot, key in enumerate(self.keys[: self.count]):
+                key = key.tobytes()
+                if any(key):
+                    self._slots[key] = slot
+                else:
+                    self._free.append(slot)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _open(self, mode: str, capacity: Optional[int] = None):
+        if mode == "r+":
+            self.vectors = np.load(self._file("vectors"), mmap_mode="r+")
+            self.keys = np.load(self._file("keys"), mmap_mode="r+")
+            self.access = np.load(self._file("access"), mmap_mode="r+")
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        old = (self.vectors, self.keys, self.access)
+        arrays = []
+        for name, shape, dtype in (
+            ("vectors", (capacity, self.dim), np.float32),
+            ("keys", (capacity, 32), np.uint8),
+            ("access", (capacity,), np.int64),
+        ):
+            tmp_path = self._file(f"{name}.tmp")
+            array = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=dtype, shape=shape
+            )
+            arrays.append((name, tmp_path, array))
+
+        # Copy the existing entries over when growing
+        for (_, _, array), previous in zip(arrays, old):
+            if previous is not None:
+                array[: len(previous)] = previous
+            array.flush()
+        for name, tmp_path, _ in arrays:
+            os.replace(tmp_path, self._file(name))
+        self._open("r+")
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def get_many(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Return the cached vector for every text that has one
+        """
+        hits = {}
+        with self._lock:
+            for text in texts:
+                slot = self._slots.get(text_key(text))
+                if slot is None:
+                    continue
+                self.clock += 1
+                self.access[slot] = self.clock
+                hits[text] = np.array(self.vectors[slot])
+        return hits
+
+    def put_many(self, texts: Sequence[str], vectors):
+        """
+        Store vectors for `texts`, evicting the least recently used entries
+        when the cache is full
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"cache dimension {self.dim}"
+                )
+            for text, vector in zip(texts, vectors):
+                key = text_key(text)
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = self._allocate()
+                    self._slots[key] = slot
+                    self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self.clock += 1
+                self.vectors[slot] = vector
+                self.access[slot] = self.clock
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self.count < self.capacity:
+            self.count += 1
+            return self.count - 1
+        if self.capacity < self.max_entries:
+            self._open("w+", min(max(self.capacity * 2, 1024), self.max_entries))
+            return self._allocate()
+        self._evict(max(self.max_entries // 10, 1))
+        return self._free.pop()
+
+    def _evict(self, n: int):
+        for slot in np.argsort(self.access[: self.count])[:n].tolist():
+            del self._slots[self.keys[slot].tobytes()]
+            self.keys[slot] = 0
+            self.access[slot] = 0
+            self._free.append(slot)
+
+    def flush(self):
+        """
+        Persist the arrays and counters to disk
+        """
+        with self._lock:
+            if self.vectors is None:
+                return
+            for array in (self.vectors, self.keys, self.access):
+                array.flush()
+            with open(os.path.join(self.path, "meta.json"), "w") as f:
+                json.dump(
+                    {
+                        "model": self.model,
+                        "dim": self.dim,
+                        "count": self.count,
+                        "clock": self.clock,
+                    },
+                    f,
+                )
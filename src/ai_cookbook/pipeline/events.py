@@ -0,0 +1,207 @@
+import asyncio
+import inspect
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Collection, Dict, List, Optional
+
+from ai_cookbook.logging.logger import log
+
+EVENT_TYPES = (
+    "run_started",
+    "run_finished",
+    "edge_queued",
+    "edge_started",
+    "edge_completed",
+    "edge_cached",
+    "edge_failed",
+    "records_emitted",
+    "bytes_written",
+)
+
+
+@dataclass
+class PipelineEvent:
+    type: str
+    run_id: str
+    timestamp: float = field(default_factory=time.time)
+    node: Optional[str] = None
+    edge: Optional[str] = None
+    status: Optional[str] = None
+    records: Optional[int] = None
+    bytes: Optional[int] = None
+    error: Optional[str] = None
+
+
+_STOP = object()
+
+
+class Subscription:
+    """
+    One subscriber with its own bounded queue and delivery thread. Events that
+    arrive while the queue is full are dropped and counted, so a slow
+    subscriber only ever falls behind itself.
+    """
+
+    def __init__(
+        self,
+        callback: Callable,
+        name: Optional[str] = None,
+        event_types: Optional[Collection[str]] = None,
+        max_queue_size: int = 10_000,
+    ):
+        self.callback = callback
+        self.name = name or getattr(callback, "__name__", repr(callback))
+        self.event_types = frozenset(event_types) if event_types else None
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(
+            target=self._deliver, name=f"events-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def offer(self, event: PipelineEvent):
+        if self.event_types is not None and event.type not in self.event_types:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _deliver(self):
+        # Coroutine subscribers are awaited on a loop owned by this thread
+        loop = (
+            asyncio.new_event_loop()
+            if inspect.iscoroutinefunction(self.callback)
+            else None
+        )
+        try:
+            while True:
+                event = self.queue.get()
+                try:
+                    if event is _STOP:
+                        return
+                    if loop is not None:
+                        loop.run_until_complete(self.callback(event))
+                    else:
+                        self.callback(event)
+                except Exception:
+                    self.failed += 1
+                    log.exception("Event subscriber %s failed", self.name)
+                finally:
+                    self.queue.task_done()
+        finally:
+            if loop is not None:
+                loop.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been delivered
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        # The stop marker must get in even when the queue is full
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+class EventBus:
+    """
+    Fans pipeline lifecycle events out to subscribers. `publish` never
+    blocks: it hands the event to each subscriber's queue and returns, and
+    with no subscribers it does not even build the event.
+    """
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        callback: Callable,
+        event_types: Optional[Collection[str]] = None,
+        name: Optional[str] = None,
+        max_queue_size: int = 10_000,
+    ) -> Subscription:
+        """
+        Deliver events (optionally only those in `event_types`) to `callback`,
+        a plain function or a coroutine function, on a dedicated thread
+        """
+        unknown = set(event_types or ()) - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown event types: {sorted(unknown)}")
+        subscription = Subscription(callback, name, event_types, max_queue_size)
+        with self._lock:
+            # Copy on write, so publishers iterate without taking the lock
+            self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, timeout: Optional[float] = None):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+        subscription.close(timeout)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscriptions)
+
+    def publish(self, type: str, run_id: str, **fields):
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        event = PipelineEvent(type, run_id, **fields)
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every subscriber has caught up, e.g. before reading the
+        state a subscriber builds
+        """
+        return all(s.flush(timeout) for s in self._subscriptions)
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close(timeout)
+
+
+class EventMetrics:
+    """
+    Subscriber aggregating events into counters, e.g. for a metrics exporter
+    to scrape: `pipeline.events.subscribe(metrics)`
+    """
+
+    def __init__(self):
+        self.events = Counter()
+        self.records: Dict[str, int] = Counter()
+        self.bytes_written: Dict[str, int] = Counter()
+        self.edge_seconds: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+
+    def __call__(self, event: PipelineEvent):
+        self.events[event.type] += 1
+        # Streaming runs report per node, without an edge
+        key = event.edge or event.node
+        if event.type == "edge_started":
+            self._started[key] = event.timestamp
+        elif event.type in ("edge_completed", "edge_failed"):
+            started = self._started.pop(key, None)
+            if started is not None:
+                self.edge_seconds[key] = event.timestamp - started
+        if event.type == "records_emitted" and event.records:
+            self.records[event.node] += event.records
+        elif event.type == "bytes_written" and event.bytes:
+            self.bytes_written[event.node] += event.bytes
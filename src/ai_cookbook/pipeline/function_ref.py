@@ -0,0 +1,92 @@
+import importlib
+import importlib.util
+from functools import lru_cache
+from typing import Callable, Tuple
+
+
+def split_function_path(path: str) -> Tuple[str, str]:
+    try:
+        module_path, function_name = path.rsplit(".", 1)
+    except ValueError:
+        raise ValueError(f"Invalid function path: '{path}'")
+    return module_path, function_name
+
+
+def check_function_path(path: str):
+    """
+    Check that the module of a dotted function path can be found without
+    executing it. Only its parent packages are imported, by `find_spec`.
+    """
+    module_path, _ = split_function_path(path)
+    try:
+        spec = importlib.util.find_spec(module_path)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        raise ValueError(f"Could not import module '{module_path}'")
+
+
+@lru_cache(maxsize=None)
+def resolve_function(path: str) -> Callable:
+    """
+    Import and return the function at a dotted path, once per process
+    """
+    module_path, function_name = split_function_path(path)
+    try:
+        module = importlib.import_module(module_path)
+    except ImportError:
+        raise ValueError(f"Could not import module '{module_path}'")
+
+    if not hasattr(module, function_name):
+        raise ValueError(
+            f"Function '{function_name}' not found in module '{module_path}'"
+        )
+    function = getattr(module, function_name)
+    if not callable(function):
+        raise ValueError(f"'{function_name}' in module '{module_path}' is not callable")
+    return function
+
+
+class FunctionRef:
+    """
+    Lazy reference to a function by dotted path. The module is only imported
+    the first time the reference is called or resolved, and the resolved
+    function is shared by every reference to the same path in the process.
+    Compares equal to its path string and pickles as just the path.
+    """
+
+    def __init__(self, path: str):
+        split_function_path(path)
+        self.path = path
+
+    def resolve(self) -> Callable:
+        return resolve_function(self.path)
+
+    def validate(self, validate_only: bool = True):
+        """
+        Check the reference without running the module (`validate_only`), or
+        by importing it and looking the function up
+        """
+        if validate_only:
+            check_function_path(self.path)
+        else:
+            self.resolve()
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, FunctionRef):
+            return self.path == other.path
+        if isinstance(other, str):
+            return self.path == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __str__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"FunctionRef({self.path!r})"
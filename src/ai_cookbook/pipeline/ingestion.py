@@ -4,8 +4,13 @@ from ai_cookbook.logging.logger import log
 from ai_cookbook.pipeline.result import Result
 from ai_cookbook.pipeline.data_source import DataSource
 from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.readers import SourceFile, SourceReader, get_source_reader
+from ai_cookbook.utils.file_manifest import FileEntry, VolumeManifest, list_files
 
-from typing import TypeAlias
+import inspect
+import os
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, TypeAlias
 
 
 class IngestionError(BaseModel):
@@ -21,33 +26,146 @@ class IngestionData(BaseModel):
 IngestionResult: TypeAlias = Result[IngestionData, IngestionError]
 
 
-def ingest_volume(source: DataSource, destination: ProcessingStep):
-    try:
-        records_processed = 100
+@dataclass
+class VolumeIngestion:
+    """
+    Outcome of an incremental volume ingestion: the added and changed files
+    handed to the step, the deleted files (tombstones), and the step's output
+    """
 
-        destination.function()
+    files: List[dict] = field(default_factory=list)
+    tombstones: List[dict] = field(default_factory=list)
+    unchanged: int = 0
+    output: Any = None
 
-        return True
+    @property
+    def records(self) -> int:
+        return len(self.files)
 
-        # TODO: this is funky, I'll fix it later
 
-        return IngestionResult(
-            data=IngestionData(processed_records=records_processed),
-            source_volume=source.volume_name,
-            destination_table=destination.output_table,
-            success_rows=records_processed,
-            error_rows=0,
+def volume_root(source: DataSource) -> Optional[str]:
+    """
+    Local directory holding the source's files: `path` itself, or the path
+    inside the mounted Unity Catalog volume. None when neither exists.
+    """
+    candidates = [source.path]
+    if source.volume_name:
+        candidates.append(
+            os.path.join(
+                "/Volumes",
+                source.catalog,
+                source.schema,
+                source.volume_name,
+                source.path.lstrip("/"),
+            )
         )
-    except Exception as e:
-        error_rows = 1
+    return next((path for path in candidates if os.path.isdir(path)), None)
 
-        return IngestionResult(
-            error=IngestionError(message=str(e), code=500),
-            source_volume=source,
-            destination_table=destination,
-            success_rows=0,
-            error_rows=error_rows,
-        )
+
+def _file_record(
+    root: str, entry: FileEntry, change: str, reader: Optional[SourceReader] = None
+) -> dict:
+    path = os.path.join(root, entry.path)
+    return {
+        "path": path,
+        "file": None if reader is None else SourceFile(path, entry.size, reader),
+        "relative_path": entry.path,
+        "size": entry.size,
+        "mtime_ns": entry.mtime_ns,
+        "hash": entry.hash,
+        "change": change,
+    }
+
+
+def _commit_when_exhausted(iterator: Iterator, commit: Callable[[], None]):
+    # Lazy step outputs only count as processed once fully consumed
+    yield from iterator
+    commit()
+
+
+async def _commit_when_awaited(awaitable: Awaitable, commit: Callable[[], None]):
+    result = await awaitable
+    commit()
+    return result
+
+
+def ingest_volume(
+    source: DataSource, destination: ProcessingStep, max_workers: int = 8
+):
+    """
+    Hand the files of `source` that were added or changed since the last run
+    to the destination step, as records with a "path", a "file" `SourceFile`
+    handle reading it through the source's reader (see `get_source_reader`),
+    and size, mtime and hash (only computed with a manifest). The volume is
+    listed concurrently and compared with the manifest at
+    `source.manifest_path`; files missing since the last run become
+    tombstones. The manifest is only updated, and the reader closed, once
+    the step has processed the files (for generators, once they are
+    exhausted), so a failed run sees the same files again.
+
+    Sources whose path is not a local directory are not listed, and the step
+    is called without inputs.
+    """
+    root = volume_root(source)
+    if root is None:
+        log.debug("No local directory for %s, calling step without files", source.name)
+        result = destination.function()
+        if inspect.isawaitable(result):
+            # Coroutine steps are awaited by the caller's execution engine
+            return result
+        return True
+
+    manifest = VolumeManifest(source.manifest_path)
+    exclude = [source.manifest_path] if source.manifest_path else []
+    suffix = f".{source.format}" if source.format else None
+    listing = list_files(root, suffix=suffix, max_workers=max_workers, exclude=exclude)
+    # An in-memory manifest starts empty, so every file is new and there is
+    # no earlier content to compare hashes with
+    diff = manifest.diff(
+        root,
+        listing,
+        max_workers=max_workers,
+        hash_files=source.manifest_path is not None,
+    )
+    reader = get_source_reader(source)
+    ingestion = VolumeIngestion(
+        files=[_file_record(root, entry, "added", reader) for entry in diff.added]
+        + [_file_record(root, entry, "changed", reader) for entry in diff.changed],
+        tombstones=[_file_record(root, entry, "deleted") for entry in diff.deleted],
+        unchanged=diff.unchanged,
+    )
+    log.info(
+        "Ingesting %s: %d added, %d changed, %d deleted, %d unchanged",
+        source.name,
+        len(diff.added),
+        len(diff.changed),
+        len(diff.deleted),
+        diff.unchanged,
+    )
+
+    def commit():
+        manifest.apply(diff)
+        manifest.close()
+        reader.close()
+
+    if not ingestion.files:
+        commit()
+        return ingestion
+
+    try:
+        output = destination.function(ingestion.files)
+    except Exception:
+        reader.close()
+        raise
+    if inspect.isawaitable(output):
+        # Coroutine steps are awaited by the caller's execution engine
+        return _commit_when_awaited(output, commit)
+    if isinstance(output, Iterator):
+        ingestion.output = _commit_when_exhausted(output, commit)
+    else:
+        ingestion.output = output
+        commit()
+    return ingestion
 
 
 def ingest_data(source: str, destination: str) -> IngestionResult:
@@ -1,2 +1,213 @@
-def write_intermediate_result(source, destination):
-    return True
+import os
+from typing import Dict, Iterator, Optional, Set
+
+from ai_cookbook.logging.logger import log
+
+
+def _pyarrow():
+    # Imported on first use, it is slow to import; without it (e.g. a
+    # minimal install) nothing is spilled and outputs stay in memory
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _is_tabular(result) -> bool:
+    if type(result).__module__.startswith("pyarrow"):
+        return True
+    if isinstance(result, (list, tuple)) and result:
+        return all(isinstance(item, dict) for item in result) or all(
+            type(item).__module__.startswith("pyarrow") for item in result
+        )
+    return False
+
+
+def dictionary_encode(table, max_ratio: float = 0.5):
+    """
+    Dictionary-encode the string columns of an Arrow table with at most
+    `max_ratio` distinct values per row, e.g. file paths or labels repeated
+    across chunks
+    """
+    pa = _pyarrow()
+    columns = list(table.columns)
+    for i, column in enumerate(columns):
+        if not (
+            pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+        ):
+            continue
+        distinct = pa.compute.count_distinct(column).as_py()
+        if len(column) and distinct <= len(column) * max_ratio:
+            columns[i] = column.dictionary_encode()
+    return pa.table(columns, names=table.column_names)
+
+
+def to_arrow(result, dictionary: bool = True):
+    """
+    Arrow table for a step output: an Arrow table or record batch, or a list
+    of records (dicts) or record batches. None for other outputs (and when
+    pyarrow is not installed), which are handed on as they are. Generators
+    are not consumed, so lazy outputs stay lazy.
+    """
+    if not _is_tabular(result):
+        return None
+    pa = _pyarrow()
+    if pa is None:
+        return None
+    try:
+        if isinstance(result, pa.Table):
+            table = result
+        elif isinstance(result, pa.RecordBatch):
+            table = pa.Table.from_batches([result])
+        elif all(isinstance(item, pa.RecordBatch) for item in result):
+            table = pa.Table.from_batches(list(result))
+        elif all(isinstance(item, dict) for item in result):
+            table = pa.Table.from_pylist(list(result))
+        else:
+            return None
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        # e.g. a field with mixed types across records
+        log.debug("Step output is not columnar: %s", e)
+        return None
+    return dictionary_encode(table) if dictionary else table
+
+
+# Schema metadata of spilled outputs that were lists of records, which are
+# read back as lists of dicts
+RESULT_TYPE_KEY = b"ai_cookbook.result_type"
+RECORDS = b"records"
+
+
+class IntermediateResultStore:
+    """
+    Step outputs, handed to the next step as the Python objects the step
+    returned. With a `directory`, columnar outputs (see `to_arrow`) are also
+    spilled to `<directory>/<output_table>.parquet`, dictionary encoded and
+    compressed, which other processes, and later runs, read back
+    memory-mapped: lists of records as lists of dicts again, Arrow tables and
+    record batches as a table.
+
+    Pickling a store with a directory (e.g. into a process pool worker) only
+    carries the directory and the outputs that were not spilled; the worker
+    reads the Parquet files instead.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        compression: str = "zstd",
+        row_group_size: int = 64 * 1024,
+    ):
+        self.directory = directory
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._objects: Dict[str, object] = {}
+        self._spilled: Set[str] = set()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, step) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, f"{step.output_table}.parquet")
+
+    def put(self, step, result, overwrite: bool = True):
+        """
+        Keep the output of `step`, and with a directory spill it to Parquet if
+        it is columnar. Returns the spilled Arrow table, or None when nothing
+        was written. Without `overwrite` an existing Parquet file is kept,
+        e.g. for results reused from the step cache.
+        """
+        path = self.path(step)
+        table = to_arrow(result) if path is not None else None
+        # Downstream steps must not pick up an earlier run's Parquet file
+        self.discard(step, remove_file=table is None)
+        self._objects[step.name] = result
+        if table is None:
+            return None
+        self._spilled.add(step.name)
+        if not overwrite and os.path.exists(path):
+            return None
+        if isinstance(result, (list, tuple)) and isinstance(result[0], dict):
+            table = table.replace_schema_metadata({RESULT_TYPE_KEY: RECORDS})
+        self._write(table, path)
+        return table
+
+    def _write(self, table, path: str):
+        pa = _pyarrow()
+        # Readers never see a partially written file
+        tmp_path = f"{path}.tmp"
+        pa.parquet.write_table(
+            table,
+            tmp_path,
+            compression=self.compression,
+            use_dictionary=True,
+            row_group_size=self.row_group_size,
+        )
+        os.replace(tmp_path, path)
+        log.debug("Wrote %d rows to %s", table.num_rows, path)
+
+    def discard(self, step, remove_file: bool = False):
+        """
+        Forget the output of `step`, and with `remove_file` its Parquet file
+        """
+        self._objects.pop(step.name, None)
+        self._spilled.discard(step.name)
+        path = self.path(step)
+        if remove_file and path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def has(self, step) -> bool:
+        if step.name in self._objects:
+            return True
+        path = self.path(step)
+        return path is not None and os.path.exists(path)
+
+    def get(self, step):
+        """
+        A step's output: the object itself when this process produced it,
+        otherwise the output read back memory-mapped from its Parquet file
+        """
+        if step.name in self._objects:
+            return self._objects[step.name]
+        path = self.path(step)
+        if path is None or not os.path.exists(path):
+            raise KeyError(f"No intermediate result for step '{step.name}'")
+        pa = _pyarrow()
+        table = pa.parquet.read_table(path, memory_map=True)
+        if (table.schema.metadata or {}).get(RESULT_TYPE_KEY) == RECORDS:
+            return table.to_pylist()
+        return table
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Spilled outputs are read back from their Parquet files, and
+        # iterators can only be consumed in the process that produced them
+        state["_objects"] = {
+            name: result
+            for name, result in self._objects.items()
+            if name not in self._spilled and not isinstance(result, Iterator)
+        }
+        state["_spilled"] = set()
+        return state
+
+    def __repr__(self):
+        # Part of the cache key of step-to-step edges, so kept stable
+        return f"IntermediateResultStore({self.directory!r})"
+
+
+def write_intermediate_result(
+    source, destination, store: Optional[IntermediateResultStore] = None
+):
+    """
+    Hand the output of one step to the next, as the object the step returned
+    (or as read back from its Parquet spill, see `IntermediateResultStore`).
+    Without a stored result for `source` there is nothing to hand over and
+    the edge is a no-op.
+    """
+    if store is None or not store.has(source):
+        return True
+    return destination.function(store.get(source))
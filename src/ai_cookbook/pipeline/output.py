@@ -1,5 +1,5 @@
-from pydantic import ValidationError, BaseModel, field_validator
-from typing import List
+from pydantic import ValidationError, BaseModel, Field, field_validator
+from typing import List, Optional
 
 from ai_cookbook.logging.logger import log
 from ai_cookbook.pipeline.processing_step import ProcessingStep
@@ -11,6 +11,7 @@ class Output(BaseModel):
     inputs: List[ProcessingStep]
     embedding_model: str
     output_table: str
+    parameters: Optional[dict] = Field(default_factory=dict)
 
     @field_validator("type")
     def validate_type(cls, v):
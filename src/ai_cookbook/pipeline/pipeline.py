@@ -1,23 +1,53 @@
-from typing import List, Dict, Any, Union
-import yaml  # Add this import
-from pydantic import ValidationError, BaseModel, InstanceOf, model_validator
-import importlib
+from typing import Callable, Iterator, List, Dict, Any, Optional, Union
+from pydantic import ValidationError, BaseModel, Field, InstanceOf, model_validator
+from collections import deque
 from functools import partial
+from itertools import chain
+import os
 import time
 
 from ai_cookbook.pipeline.data_source import DataSource
 from ai_cookbook.pipeline.processing_step import ProcessingStep
 from ai_cookbook.pipeline.output import Output
-from ai_cookbook.logging import console
-from ai_cookbook.logging.logger import log
+from ai_cookbook.logging import get_console
+from ai_cookbook.logging.logger import configure_logging, log
+from ai_cookbook.logging.structured import summarize
 
 from ai_cookbook.metadata.manager import MetadataManager, Run
-from ai_cookbook.pipeline.vectorsearch import get_or_create_vector_index
-from ai_cookbook.pipeline.ingestion import ingest_volume
-from ai_cookbook.pipeline.intermediate_result import write_intermediate_result
-from .validation import check_permissions
-from .dag import Edge, topological_sort, detect_cycles
-from rich.progress import Progress, SpinnerColumn, TimeElapsedColumn
+from ai_cookbook.pipeline.vectorsearch import (
+    VectorIndexWriter,
+    get_or_create_vector_index,
+)
+from ai_cookbook.pipeline.ingestion import VolumeIngestion, ingest_volume, volume_root
+from ai_cookbook.utils.file_manifest import list_files
+from ai_cookbook.pipeline.intermediate_result import (
+    IntermediateResultStore,
+    write_intermediate_result,
+)
+from ai_cookbook.pipeline.table_writer import TableWriter
+from ai_cookbook.pipeline.delta_reader import DeltaSourceReader, read_delta_source
+from .validation import check_permissions, validate_dag
+from .dag import CompiledDag, Edge
+from .function_ref import FunctionRef, resolve_function
+from .cache import StepCache
+from .checkpoint import ResumeState
+from .scheduler import AsyncDagScheduler, DagScheduler
+from .profiling import (
+    Measurement,
+    NodeProfile,
+    RunProfile,
+    count_records,
+    estimate_size,
+    measure_call,
+    profiler_options,
+)
+from .events import EventBus
+from .progress import ProgressReporter, get_progress_reporter
+from .readers import SourceFile, SourceReader, get_source_reader
+from .streaming import StreamingExecutor, iter_batches
+
+# Records of a generator step output buffered for its table at a time
+WRITE_BATCH_SIZE = 1000
 
 
 class Pipeline(BaseModel):
@@ -25,10 +55,22 @@ class Pipeline(BaseModel):
     processing_steps: List[ProcessingStep]
     outputs: List[Output]
     nodes: Dict[str, Union[DataSource, ProcessingStep, Output]] = {}
-    edges: List[InstanceOf[Edge]] = []
+    # Runtime state below is left out of model dumps
+    edges: List[InstanceOf[Edge]] = Field(default=[], exclude=True)
     execution_order: List[str] = []
-    metadata_manager: InstanceOf[MetadataManager] = None
-    data_store: Dict[str, Any] = {}
+    dag: Optional[InstanceOf[CompiledDag]] = Field(default=None, exclude=True)
+    metadata_manager: InstanceOf[MetadataManager] = Field(default=None, exclude=True)
+    # Lifecycle events of every run, see pipeline.events
+    events: InstanceOf[EventBus] = Field(default=None, exclude=True)
+    # Step outputs handed from step to step, spilled to Parquet with a directory
+    intermediate_store: InstanceOf[IntermediateResultStore] = Field(
+        default=None, exclude=True
+    )
+    # Writes step output tables, without one outputs are not persisted
+    table_writer: Optional[InstanceOf[TableWriter]] = Field(
+        default=None, exclude=True
+    )
+    data_store: Dict[str, Any] = Field(default={}, exclude=True)
 
     # @model_validator(mode="before")
     # def generate_ingestion_steps(cls, values):
@@ -90,105 +132,91 @@ class Pipeline(BaseModel):
     #     return ingestion_step
 
     def model_post_init(self, __context):
+        if self.intermediate_store is None:
+            self.intermediate_store = IntermediateResultStore()
         try:
-            self.nodes, self.edges = self._build_dag()
-            self.execution_order = topological_sort(self.nodes, self.edges)
+            self.nodes, self.edges, self.dag = self._build_dag()
+            self.execution_order = self.dag.topological_order
             for edge in self.edges:
                 edge.function = self._determine_edge_function(
                     edge.source, edge.destination
                 )
+                edge.resource = self._determine_edge_resource(
+                    edge.source, edge.destination
+                )
         except ValueError as e:
             log.error(e)
             raise
 
-        self.metadata_manager = MetadataManager()
+        if self.metadata_manager is None:
+            self.metadata_manager = MetadataManager()
+        if self.events is None:
+            self.events = EventBus()
+        if self.table_writer is not None:
+            for step in self.processing_steps:
+                self.table_writer.configure(
+                    step.output_table,
+                    mode=step.write_mode,
+                    merge_keys=step.merge_keys,
+                    partition_by=step.partition_by,
+                )
 
     def _determine_edge_function(self, source, destination):
         if isinstance(source, DataSource) and source.type == "volume":
             return partial(ingest_volume, source, destination)
+        elif isinstance(source, DataSource) and source.type == "delta":
+            return partial(read_delta_source, source, destination)
         elif isinstance(destination, Output) and destination.type == "vector_index":
-            return partial(get_or_create_vector_index, source, destination)
+            return partial(
+                get_or_create_vector_index,
+                source,
+                destination,
+                store=self.intermediate_store,
+            )
         elif isinstance(source, ProcessingStep) and isinstance(
             destination, ProcessingStep
         ):
-            return partial(write_intermediate_result, source, destination)
+            return partial(
+                write_intermediate_result,
+                source,
+                destination,
+                store=self.intermediate_store,
+            )
+        else:
+            return None
+
+    def _determine_edge_resource(self, source, destination):
+        if isinstance(source, DataSource) and source.type == "volume":
+            return "volume"
+        elif isinstance(source, DataSource) and source.type == "delta":
+            return "table"
+        elif isinstance(destination, Output) and destination.type == "vector_index":
+            return "vector_index"
+        elif isinstance(source, ProcessingStep) and isinstance(
+            destination, ProcessingStep
+        ):
+            return "intermediate"
         else:
             return None
 
     def _get_incoming_edges(self, node):
-        incoming_edges = []
-        for edge in self.edges:
-            if edge.destination.name == node:
-                incoming_edges.append(edge)
-        return incoming_edges
+        return self.dag.incoming(node)
 
     def _build_dag(self):
-        nodes = {}
-        edges = []
-        errors = []
-
-        try:
-            # First, build all nodes
-            # Add data sources to nodes
-            for ds in self.data_sources:
-                if ds.name in nodes:
-                    errors.append(f"Duplicate data source name: {ds.name}")
-                else:
-                    nodes[ds.name] = ds
-
-            # Add processing steps to nodes
-            for step in self.processing_steps:
-                if step.name in nodes:
-                    errors.append(f"Duplicate processing step name: {step.name}")
-                else:
-                    nodes[step.name] = step
-
-            # Add output nodes
-            for output in self.outputs:
-                nodes[output.name] = output
-
-            # Then, validate all edges
-            # Add processing step edges
-            for step in self.processing_steps:
-                for input_step in step.inputs:
-                    input_name = (
-                        input_step.name
-                        if isinstance(input_step, ProcessingStep)
-                        else input_step.name
-                    )
-                    if input_name not in nodes:
-                        errors.append(
-                            f"Input {input_name} not found in data sources or processing steps"
-                        )
-                    else:
-                        edges.append(Edge(source=input_step, destination=step))
-
-            # Add output edges
-            for output in self.outputs:
-                for input_step in output.inputs:
-                    input_name = input_step.name
-                    if input_name not in nodes:
-                        errors.append(
-                            f"Output input {input_name} not found in processing steps"
-                        )
-                    edges.append(Edge(source=input_step, destination=output))
-
-        except Exception as e:
-            errors.append(f"Error validating DAG: {e}")
-
-        try:
-            if detect_cycles(nodes, edges):
-                errors.append("Cycle detected in the pipeline DAG")
-        except ValueError as e:
-            errors.append(str(e))
-
-        if errors:
+        result = validate_dag(
+            {
+                "data source": self.data_sources,
+                "processing step": self.processing_steps,
+                "output": self.outputs,
+            }
+        )
+        if not result.is_valid:
             error_message = (
-                "DAG validation failed with the following errors:\n" + "\n".join(errors)
+                "DAG validation failed with the following errors:\n"
+                + "\n".join(result.errors)
             )
             raise ValueError(error_message)
-        else:
-            return nodes, edges
+        return result.nodes, result.edges, result.dag
 
     def _additional_validations(self):
         errors = []
@@ -205,112 +233,562 @@ class Pipeline(BaseModel):
         if errors:
             raise Exception("Validation errors:\n" + "\n".join(errors))
 
-    def read_data_source(self, data_source: DataSource):
-        # Mock implementation of reading data from a data source
+    def read_data_source(
+        self, data_source: DataSource, reader: Optional[SourceReader] = None
+    ):
+        """
+        Stream the files of a local or mounted volume source as `SourceFile`
+        handles, read block by block through `reader` (by default the
+        source's own, see `get_source_reader`) only when a step asks for
+        their contents. A default reader is closed once every handle has
+        been yielded; pass one to keep it open for as long as the handles are
+        read. Delta sources stream their rows as records, see
+        `DeltaSourceReader`.
+        """
         log.info(f"Reading data from data source '{data_source.name}'")
-        # Return a mock data object (e.g., a string or a simple data structure)
-        return f"data_from_{data_source.name}"
+        if self._reads_rows(data_source):
+            return DeltaSourceReader.from_source(data_source).iter_records()
+        root = volume_root(data_source)
+        if root is None:
+            # Return a mock data object (e.g., a string or a simple data structure)
+            return f"data_from_{data_source.name}"
+        suffix = f".{data_source.format}" if data_source.format else None
+        listing = list_files(root, suffix=suffix)
+        return self._source_files(
+            root,
+            listing,
+            reader or get_source_reader(data_source),
+            close=reader is None,
+        )
+
+    @staticmethod
+    def _reads_rows(data_source: DataSource) -> bool:
+        return data_source.type == "delta" and os.path.isdir(data_source.path)
+
+    def _open_reader(
+        self, data_source: DataSource, readers: List[SourceReader]
+    ) -> Optional[SourceReader]:
+        """
+        Reader for the files of `data_source`, added to `readers` for the
+        caller to close. None for Delta sources, whose rows are read by a
+        `DeltaSourceReader` taking their `reader_options` instead.
+        """
+        if self._reads_rows(data_source):
+            return None
+        reader = get_source_reader(data_source)
+        readers.append(reader)
+        return reader
+
+    @staticmethod
+    def _source_files(root: str, listing: dict, reader: SourceReader, close: bool):
+        try:
+            for path, (size, _) in sorted(listing.items()):
+                yield SourceFile(os.path.join(root, path), size, reader)
+        finally:
+            if close:
+                reader.close()
 
     def write_output(self, table_name, result):
-        log.info(f"Writing output to table '{table_name}'")
-        # TODO: Implement output writing logic
-        # Questions:
-        # - What should write mode be?
-        # - Does this handle schema changes?
-        # - How do we handle errors?
+        """
+        Buffer a step output for its output table. Outputs are committed in
+        large batches when the run finishes (or a table buffers enough rows),
+        see `TableWriter`.
+        """
+        if self.table_writer is None:
+            log.debug("No table writer configured, not writing %s", table_name)
+            return False
+        return self.table_writer.write(table_name, result)
 
-        # TODO: should probably return write metadata, can get this with DESCRIBE HISTORY
+    def _drain_results(self):
+        # Generator outputs no other step consumed, e.g. of leaf steps, have
+        # to be exhausted for their files to count as processed
+        for result in self.data_store.values():
+            output = result.output if isinstance(result, VolumeIngestion) else result
+            if isinstance(output, Iterator):
+                deque(output, maxlen=0)
+
+    def _begin_writes(self):
+        if self.table_writer is not None:
+            self.table_writer.begin()
+
+    def _finish_writes(self, status: str):
+        if self.table_writer is None:
+            return
+        if status != "completed":
+            # Resuming the run writes the results it reuses again
+            self.table_writer.abort()
+            log.warning("Not committing output tables of %s run", status)
+            return
+        versions = self.table_writer.flush()
+        log.info("Committed output tables after %s run: %s", status, versions)
+
+    def _emit(self, run: Run, step: ProcessingStep, output, fresh: bool = True):
+        # Batch runs report each step output as streaming runs report batches
+        if fresh:
+            self.events.publish(
+                "records_emitted",
+                run.run_id,
+                node=step.name,
+                records=count_records(output),
+            )
+        if self.write_output(step.output_table, output):
+            self.events.publish(
+                "bytes_written", run.run_id, node=step.name, bytes=estimate_size(output)
+            )
+
+    def _emit_as_consumed(self, run: Run, step: ProcessingStep, output: Iterator):
+        # Generator outputs are reported and buffered for their table batch by
+        # batch, as the downstream step (or `_drain_results`) consumes them
+        for batch in iter_batches(output, WRITE_BATCH_SIZE):
+            self._emit(run, step, batch)
+            yield from batch
+
+    def write_vector_index(
+        self, output: Output, chunks, writer: Optional[VectorIndexWriter] = None
+    ):
+        """
+        Embed and upsert a batch of chunks into a vector index output
+        """
+        return get_or_create_vector_index(None, output, chunks, writer=writer)
 
     def get_step_by_name(self, step_name):
-        for step in self.processing_steps:
-            if step.name == step_name:
-                return step
+        step = self.nodes.get(step_name)
+        if isinstance(step, ProcessingStep):
+            return step
         raise ValueError(f"Step {step_name} not found in pipeline")
 
-    def run(self) -> Run:
+    def run(
+        self,
+        scheduler: str = "serial",
+        max_workers: Optional[int] = None,
+        use_cache: bool = True,
+        resume_from: Optional[str] = None,
+        profile_nodes: Optional[List[str]] = None,
+        profiler: str = "cprofile",
+        profile_dir: Optional[str] = None,
+        progress: Union[str, ProgressReporter, Callable, None] = "auto",
+    ) -> Run:
         """
         Run the pipeline and return the run id
+
+        `scheduler` is either "serial" (walk `execution_order` one edge at a
+        time) or a parallel backend, "thread" or "process", which dispatches
+        every edge as soon as its upstream node has completed.
+
+        With `use_cache`, edges whose code, parameters and upstream results are
+        unchanged since a previous run reuse that run's result. The hits and
+        misses are reported in `run.cache_report`.
+
+        `resume_from` takes the id of an earlier (failed) run: edges that
+        completed in that run reuse their persisted results, and only the
+        failed and never-run nodes and everything downstream of them execute.
+        Results are only persisted while the cache is on, so the earlier run
+        must not have used `use_cache=False`.
+
+        Wall and CPU time, peak RSS growth and record and byte counts of every
+        edge are collected in `run.profile`. Edges into the nodes named in
+        `profile_nodes` also run under `profiler` ("cprofile" or "sampling"),
+        which writes one file per edge into `profile_dir`.
+
+        `progress` selects how progress is reported: "auto" (a Rich progress
+        bar on a terminal or in a notebook, periodic log lines otherwise),
+        "rich", "log", "none", a callback receiving a `ProgressSnapshot`, or a
+        `ProgressReporter`.
         """
+        options = profiler_options(profile_nodes, profiler, profile_dir)
+        reporter = get_progress_reporter(progress)
+        resume = (
+            ResumeState(self.metadata_manager, resume_from) if resume_from else None
+        )
         run = self.metadata_manager.start_run()
-        log.info("🏃 Starting run")
-        console.log(run)
-
-        with Progress(
-            SpinnerColumn(),
-            *Progress.get_default_columns(),
-            auto_refresh=True,
-            # console=console,
-        ) as progress:
-            # Create a task for overall pipeline progress
-            pipeline_task = progress.add_task(
-                description="[cyan]Running pipeline...", total=len(self.execution_order)
-            )
+        run.resumed_from = resume_from
+        run.profile = RunProfile(run.run_id, options=options)
+        run.progress = reporter
+        log.info(
+            f"🏃 Resuming run {resume_from}" if resume_from else "🏃 Starting run"
+        )
+        get_console().log(run)
+        cache = StepCache(
+            self.metadata_manager,
+            self._get_incoming_edges,
+            enabled=use_cache,
+            resume=resume,
+        )
 
-            for node_name in self.execution_order:
-                # Update description for current node
-                progress.update(
-                    pipeline_task,
-                    refresh=True,  # required for Jupyter notebook
+        reporter.start(len(self.edges))
+        self.events.publish("run_started", run.run_id)
+        self._begin_writes()
+        status = "failed"
+        try:
+            if scheduler == "serial":
+                self._run_serial(run, cache)
+            else:
+                self._run_parallel(run, cache, scheduler, max_workers)
+            self._drain_results()
+            status = "completed"
+        finally:
+            reporter.finish()
+            self._report_cache(run, cache)
+            self._finish_writes(status)
+            self.metadata_manager.finish_run(run, status)
+            self.events.publish("run_finished", run.run_id, status=status)
+            if status == "failed":
+                log.error(
+                    f"Run {run.run_id} failed, resume it with "
+                    f"run(resume_from='{run.run_id}')"
                 )
-                edges = self._get_incoming_edges(node_name)
 
-                for edge in edges:
-                    # Create a subtask for each edge execution
-                    edge_task = progress.add_task(
-                        f"[green]Executing {edge.source.name} → {edge.destination.name}",
-                        total=100,
-                        refresh=True,
-                    )
-                    self._execute_edge(edge, run)
+        return run
 
-                    progress.update(edge_task, completed=100)
+    def _run_serial(self, run: Run, cache: StepCache):
+        for node_name in self.execution_order:
+            for edge in self._get_incoming_edges(node_name):
+                self._execute_edge(edge, run, cache)
 
-                    # Remove the completed edge task
-                    progress.remove_task(edge_task)
+    def _run_parallel(
+        self,
+        run: Run,
+        cache: StepCache,
+        backend: str,
+        max_workers: Optional[int],
+    ):
+        def on_edge_start(edge: Edge):
+            self._start_edge(edge, run)
+            # Pools give no signal when a worker picks an edge up, so it
+            # counts as started once submitted
+            self._publish_edge_started(edge, run)
 
-                progress.update(pipeline_task, advance=1)
+        def on_edge_complete(edge: Edge, measured):
+            result, profile = measured
+            self._record_profile(edge, run, profile)
+            self._complete_edge(edge, run, result, cache)
 
-        return run
+        DagScheduler(
+            self.dag, self.edges, backend=backend, max_workers=max_workers
+        ).run(
+            on_edge_start,
+            on_edge_complete,
+            lambda edge, error: self._fail_edge(edge, run, error),
+            try_cached=lambda edge: self._try_cached_edge(edge, run, cache),
+            prepare=lambda edge: self._prepare_edge(edge, run),
+        )
 
-    def _execute_edge(self, edge: Edge, run: Run):
-        """Execute a single edge with progress tracking"""
-        log.info(
-            f"Starting edge execution: {edge.source.name} → {edge.destination.name}"
+    async def arun(
+        self,
+        max_concurrency: int = 32,
+        resource_limits: Optional[Dict[str, int]] = None,
+        use_cache: bool = True,
+        progress: Union[str, ProgressReporter, Callable, None] = "auto",
+    ) -> Run:
+        """
+        Run the pipeline on the current event loop and return the run
+
+        Coroutine edge functions are awaited directly and sync ones run in a
+        thread pool of `max_concurrency` workers. `resource_limits` overrides
+        the per-resource caps ("volume", "table", "vector_index",
+        "intermediate").
+        `progress` is as for `run`.
+        """
+        reporter = get_progress_reporter(progress)
+        run = self.metadata_manager.start_run()
+        run.profile = RunProfile(run.run_id)
+        run.progress = reporter
+        log.info("🏃 Starting async run")
+        get_console().log(run)
+        cache = StepCache(
+            self.metadata_manager, self._get_incoming_edges, enabled=use_cache
         )
-        self.metadata_manager.update_step_metadata(edge.destination, run, "running")
+        measurements: Dict[Edge, Measurement] = {}
+
+        def on_edge_call(edge: Edge):
+            # Time spent waiting for a resource slot is not part of the edge
+            measurements[edge] = Measurement()
+            self._publish_edge_started(edge, run)
+
+        def on_edge_complete(edge: Edge, result):
+            profile = measurements.pop(edge).stop(
+                NodeProfile(name=self._edge_name(edge), node=edge.destination.name)
+            )
+            # Edges interleave on the event loop thread, so its CPU time
+            # cannot be attributed to one of them
+            profile.cpu = None
+            profile.records_out = count_records(result)
+            profile.bytes_out = estimate_size(result)
+            self._record_profile(edge, run, profile)
+            self._complete_edge(edge, run, result, cache)
+
+        reporter.start(len(self.edges))
+        self.events.publish("run_started", run.run_id)
+        self._begin_writes()
+        status = "failed"
         try:
-            log.info(f"Executing edge function: {edge.function}")
-            result = edge.function()
-            log.info(f"Edge function completed: {result}")
+            await AsyncDagScheduler(
+                self.dag,
+                self.edges,
+                max_concurrency=max_concurrency,
+                resource_limits=resource_limits,
+            ).run(
+                lambda edge: self._start_edge(edge, run),
+                on_edge_complete,
+                lambda edge, error: self._fail_edge(edge, run, error),
+                try_cached=lambda edge: self._try_cached_edge(edge, run, cache),
+                on_edge_call=on_edge_call,
+            )
+            self._drain_results()
+            status = "completed"
+        finally:
+            reporter.finish()
+            self._report_cache(run, cache)
+            self._finish_writes(status)
+            self.metadata_manager.finish_run(run, status)
+            self.events.publish("run_finished", run.run_id, status=status)
+
+        return run
+
+    def _execute_edge(self, edge: Edge, run: Run, cache: Optional[StepCache] = None):
+        """Execute a single edge"""
+        if cache is not None and self._try_cached_edge(edge, run, cache):
+            return
+        self._start_edge(edge, run)
+        self._publish_edge_started(edge, run)
+        try:
+            log.debug("Executing edge function: %s", edge.function)
+            result, profile = self._prepare_edge(edge, run)()
         except Exception as e:
-            log.error(f"Edge failed: {str(e)}")
-            self.metadata_manager.update_step_metadata(edge.destination, run, "failed")
-            log.info(f"Updated metadata for failed edge: {edge.destination.name}")
+            self._fail_edge(edge, run, e)
             raise
-        self.metadata_manager.update_step_metadata(edge.destination, run, "completed")
-        self.metadata_manager.write_step_result(result)
+        self._record_profile(edge, run, profile)
+        self._complete_edge(edge, run, result, cache)
+
+    def _prepare_edge(self, edge: Edge, run: Run):
+        """
+        Wrap an edge function so it returns (result, NodeProfile)
+        """
+        profiler, profile_dir = run.profile.options.get(
+            edge.destination.name, (None, None)
+        )
+        return partial(
+            measure_call,
+            edge.function,
+            self._edge_name(edge),
+            edge.destination.name,
+            profiler,
+            profile_dir,
+        )
+
+    def _record_profile(self, edge: Edge, run: Run, profile: NodeProfile):
+        upstream = self.data_store.get(edge.source.name)
+        if upstream is not None:
+            profile.records_in = count_records(upstream)
+            profile.bytes_in = estimate_size(upstream)
+        run.profile.add(profile)
+
+    def _publish_edge_started(self, edge: Edge, run: Run):
+        self.events.publish(
+            "edge_started",
+            run.run_id,
+            node=edge.destination.name,
+            edge=self._edge_name(edge),
+        )
+
+    def _try_cached_edge(self, edge: Edge, run: Run, cache: StepCache) -> bool:
+        if cache.resume is not None and self._try_resumed_edge(edge, run, cache):
+            return True
+        hit, result = cache.lookup(edge)
+        if not hit:
+            return False
+        log.info(
+            "♻️ Reusing cached result: %s → %s", edge.source.name, edge.destination.name
+        )
+        self.metadata_manager.update_step_metadata(
+            edge.destination,
+            run,
+            "cached",
+            edge=self._edge_name(edge),
+            fingerprint=cache.fingerprint(edge),
+            result_key=cache.key(edge),
+        )
+        self._keep_result(edge, run, result, fresh=False)
+        if run.progress is not None:
+            run.progress.edge_cached(self._edge_name(edge))
+        self.events.publish(
+            "edge_cached",
+            run.run_id,
+            node=edge.destination.name,
+            edge=self._edge_name(edge),
+            status="cached",
+        )
+        return True
+
+    def _try_resumed_edge(self, edge: Edge, run: Run, cache: StepCache) -> bool:
+        edge_name = self._edge_name(edge)
+        hit, result, key, fingerprint = cache.resume.lookup(edge, edge_name)
+        if not hit:
+            return False
+        log.info(
+            "⏩ Reusing result from run %s: %s → %s",
+            cache.resume.run_id,
+            edge.source.name,
+            edge.destination.name,
+        )
+        cache.restore(edge, fingerprint)
+        self.metadata_manager.update_step_metadata(
+            edge.destination,
+            run,
+            "resumed",
+            edge=edge_name,
+            fingerprint=fingerprint,
+            result_key=key,
+        )
+        self._keep_result(edge, run, result, fresh=False, resumed=True)
+        if run.progress is not None:
+            run.progress.edge_cached(edge_name)
+        self.events.publish(
+            "edge_cached",
+            run.run_id,
+            node=edge.destination.name,
+            edge=edge_name,
+            status="resumed",
+        )
+        return True
+
+    def _start_edge(self, edge: Edge, run: Run):
+        log.info(
+            "Starting edge execution: %s → %s", edge.source.name, edge.destination.name
+        )
+        edge_name = self._edge_name(edge)
+        self.metadata_manager.update_step_metadata(
+            edge.destination, run, "running", edge=edge_name
+        )
+        if run.progress is not None:
+            run.progress.edge_started(edge_name)
+        self.events.publish(
+            "edge_queued", run.run_id, node=edge.destination.name, edge=edge_name
+        )
 
-    def execute_step(self, step: ProcessingStep, run_id: str):
+    def _complete_edge(
+        self, edge: Edge, run: Run, result, cache: Optional[StepCache] = None
+    ):
+        # Results can be large, only a truncated repr is logged
+        log.info("Edge function completed: %s", summarize(result))
+        self._keep_result(edge, run, result)
+        fingerprint = key = None
+        if cache is not None:
+            fingerprint = cache.store(edge, result)
+        if fingerprint is not None:
+            key = cache.key(edge)
+        edge_name = self._edge_name(edge)
+        rows = self._row_count(result)
+        self.metadata_manager.update_step_metadata(
+            edge.destination,
+            run,
+            "completed",
+            edge=edge_name,
+            rows=rows,
+            fingerprint=fingerprint,
+            result_key=key,
+        )
+        if run.progress is not None:
+            run.progress.edge_completed(edge_name)
+        self.events.publish(
+            "edge_completed",
+            run.run_id,
+            node=edge.destination.name,
+            edge=edge_name,
+            status="completed",
+            records=rows,
+        )
+
+    def _keep_result(
+        self, edge: Edge, run: Run, result, fresh: bool = True, resumed: bool = False
+    ):
+        self.data_store[edge.destination.name] = result
+        step = edge.destination
+        if not isinstance(step, ProcessingStep):
+            return
+        output = result.output if isinstance(result, VolumeIngestion) else result
+        if output is None or output is True:
+            # Edges that did not call the step have nothing to hand on
+            self.intermediate_store.discard(step, remove_file=fresh)
+            return
+        if isinstance(output, Iterator):
+            output = self._emit_as_consumed(run, step, output)
+            if isinstance(result, VolumeIngestion):
+                result.output = output
+            else:
+                self.data_store[step.name] = output
+        self.intermediate_store.put(step, output, overwrite=fresh)
+        if isinstance(output, Iterator):
+            return
+        # Results reused from the cache were committed by the run that
+        # produced them. Failed runs commit nothing, and overwrite tables
+        # need every result of this run again.
+        if fresh or resumed or (
+            self.table_writer is not None
+            and self.table_writer.mode(step.output_table) == "overwrite"
+        ):
+            self._emit(run, step, output, fresh=fresh)
+
+    def _fail_edge(self, edge: Edge, run: Run, error: Exception):
+        log.error("Edge failed: %s", error)
+        if run.profile is not None:
+            run.profile.add(
+                NodeProfile(
+                    name=self._edge_name(edge),
+                    node=edge.destination.name,
+                    status="failed",
+                    start=time.time(),
+                )
+            )
+        self.metadata_manager.update_step_metadata(
+            edge.destination, run, "failed", edge=self._edge_name(edge)
+        )
+        if run.progress is not None:
+            run.progress.edge_failed(self._edge_name(edge))
+        self.events.publish(
+            "edge_failed",
+            run.run_id,
+            node=edge.destination.name,
+            edge=self._edge_name(edge),
+            status="failed",
+            error=repr(error),
+        )
+        log.info("Updated metadata for failed edge: %s", edge.destination.name)
+
+    @staticmethod
+    def _edge_name(edge: Edge) -> str:
+        return f"{edge.source.name}->{edge.destination.name}"
+
+    @staticmethod
+    def _row_count(result) -> Optional[int]:
+        if isinstance(result, (list, tuple)):
+            return len(result)
+        if hasattr(result, "num_rows"):
+            # Arrow tables and record batches
+            return result.num_rows
+        return getattr(result, "records", None)
+
+    def _report_cache(self, run: Run, cache: StepCache):
+        run.cache_report = dict(cache.report)
+        log.info(
+            f"♻️ Step cache: {len(cache.hits)} hits, {len(cache.misses)} misses"
+        )
+
+    def execute_step(self, step: ProcessingStep, run: Run):
         # Update metadata to 'running'
-        self.metadata_manager.update_step_metadata(step.name, run_id, "running")
+        self.metadata_manager.update_step_metadata(step, run, "running")
 
-        try:
-            # get the function if it's a string
-            if isinstance(step.function, str):
-                module_name, function_name = step.function.rsplit(".", 1)
-                module = importlib.import_module(module_name)
-                step.function = getattr(module, function_name)
-        except Exception:
-            log.error(f"Error importing function {step.function}")
-            raise
+        function = self._resolve_step_function(step)
 
+        readers = []
         try:
             # Resolve inputs
             input_data = []
             for input_item in step.inputs:
                 if isinstance(input_item, DataSource):
                     # Read data from the data source
-                    data = self.read_data_source(input_item)
+                    reader = self._open_reader(input_item, readers)
+                    data = self.read_data_source(input_item, reader)
                 elif isinstance(input_item, ProcessingStep):
                     # Get output from previous step
                     data = self.data_store.get(input_item.name)
@@ -323,7 +801,7 @@ class Pipeline(BaseModel):
                 input_data.append(data)
 
             # Execute the processing function with inputs
-            result = step.function(*input_data)
+            result = function(*input_data)
 
             self.write_output(step.output_table, result)
 
@@ -331,16 +809,179 @@ class Pipeline(BaseModel):
             self.data_store[step.name] = result
 
             # Update metadata to 'completed'
-            self.metadata_manager.update_step_metadata(step.name, run_id, "completed")
+            self.metadata_manager.update_step_metadata(step, run, "completed")
         except Exception as e:
             # Update metadata to 'failed'
-            self.metadata_manager.update_step_metadata(step.name, run_id, "failed")
+            self.metadata_manager.update_step_metadata(step, run, "failed")
             print(f"Error in step '{step.name}': {e}")
             raise
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def _resolve_step_function(self, step: ProcessingStep):
+        try:
+            # Dotted paths are imported on first use and memoized process-wide
+            if isinstance(step.function, (str, FunctionRef)):
+                return resolve_function(str(step.function))
+        except Exception:
+            log.error(f"Error importing function {step.function}")
+            raise
+        return step.function
+
+    def validate_functions(self, validate_only: bool = True):
+        """
+        Check every step's function reference. With `validate_only` the
+        modules are only located (`importlib.util.find_spec`), not executed;
+        otherwise every function is imported now rather than when its step
+        first runs.
+        """
+        errors = []
+        for step in self.processing_steps:
+            if not isinstance(step.function, FunctionRef):
+                continue
+            try:
+                step.function.validate(validate_only=validate_only)
+            except ValueError as e:
+                errors.append(f"Step {step.name}: {e}")
+        if errors:
+            raise ValueError("Function validation failed:\n" + "\n".join(errors))
+
+    def run_streaming(self, batch_size: int = 100, queue_size: int = 4) -> Run:
+        """
+        Run the pipeline with records streamed between nodes and return the run
+
+        Every node runs concurrently. Step functions receive one lazy record
+        iterator per input and may return a generator; their output is handed
+        downstream in batches of `batch_size` through queues holding at most
+        `queue_size` batches, so memory stays bounded however large the
+        source is. Each batch is buffered for the node's output table (and
+        committed in large batches) as it is produced. vector_index outputs
+        embed their records in their own thread, with one `VectorIndexWriter`
+        per output whose last window is written when the output completes.
+        """
+        run = self.metadata_manager.start_run()
+        run.profile = RunProfile(run.run_id)
+        self.events.publish("run_started", run.run_id)
+        self._begin_writes()
+        log.info("🏃 Starting streaming run")
+        get_console().log(run)
+        # Callbacks run in each node's own thread, so CPU time is per node
+        measurements: Dict[str, Measurement] = {}
+        bytes_out: Dict[str, int] = {}
+        profiles: Dict[str, NodeProfile] = {}
+        readers: List[SourceReader] = []
+
+        def process(node_name, inputs):
+            node = self.nodes[node_name]
+            if isinstance(node, DataSource):
+                # Handles are read downstream until the run ends
+                return self.read_data_source(node, self._open_reader(node, readers))
+            if isinstance(node, ProcessingStep):
+                return self._resolve_step_function(node)(*inputs)
+            # Outputs drain their inputs into their output table or index
+            records = chain.from_iterable(inputs)
+            if node.type == "vector_index":
+                return index(node, records)
+            return records
+
+        def index(output, records):
+            # Runs in the output's thread, so embedding requests are not made
+            # under the executor's callback lock
+            writer = VectorIndexWriter.from_output(output)
+            try:
+                for batch in iter_batches(records, batch_size):
+                    writer.append(batch)
+                    yield from batch
+                writer.finish()
+            finally:
+                writer.close()
+
+        def on_batch(node_name, batch):
+            size = estimate_size(batch)
+            bytes_out[node_name] = bytes_out.get(node_name, 0) + size
+            self.events.publish(
+                "records_emitted", run.run_id, node=node_name, records=len(batch)
+            )
+            node = self.nodes[node_name]
+            if isinstance(node, DataSource):
+                return
+            if not (isinstance(node, Output) and node.type == "vector_index"):
+                self.write_output(node.output_table, batch)
+            self.events.publish("bytes_written", run.run_id, node=node_name, bytes=size)
+
+        def on_node_start(node_name):
+            measurements[node_name] = Measurement()
+            self.metadata_manager.update_step_metadata(
+                self.nodes[node_name], run, "running"
+            )
+            # Streaming runs have no per-edge work, events are per node
+            self.events.publish("edge_started", run.run_id, node=node_name)
+
+        def on_node_complete(node_name, count):
+            log.info("Streamed %d records from %s", count, node_name)
+            profile = measurements.pop(node_name).stop(
+                NodeProfile(name=node_name, node=node_name, kind="node")
+            )
+            upstream = [
+                profiles[edge.source.name]
+                for edge in self.dag.incoming(node_name)
+                if edge.source.name in profiles
+            ]
+            if upstream:
+                profile.records_in = sum(p.records_out for p in upstream)
+                profile.bytes_in = sum(p.bytes_out for p in upstream)
+            profile.records_out = count
+            profile.bytes_out = bytes_out.get(node_name, 0)
+            profiles[node_name] = profile
+            run.profile.add(profile)
+            self.metadata_manager.update_step_metadata(
+                self.nodes[node_name], run, "completed", rows=count
+            )
+            self.events.publish(
+                "edge_completed",
+                run.run_id,
+                node=node_name,
+                status="completed",
+                records=count,
+            )
+
+        def on_node_failed(node_name, error):
+            log.error("Node %s failed: %s", node_name, error)
+            self.metadata_manager.update_step_metadata(
+                self.nodes[node_name], run, "failed"
+            )
+            self.events.publish(
+                "edge_failed",
+                run.run_id,
+                node=node_name,
+                status="failed",
+                error=repr(error),
+            )
+
+        status = "failed"
+        try:
+            run.record_counts = StreamingExecutor(
+                self.execution_order,
+                self.edges,
+                batch_size=batch_size,
+                queue_size=queue_size,
+            ).run(process, on_batch, on_node_start, on_node_complete, on_node_failed)
+            status = "completed"
+        finally:
+            for reader in readers:
+                reader.close()
+            self._finish_writes(status)
+            self.metadata_manager.finish_run(run, status)
+            self.events.publish("run_finished", run.run_id, status=status)
+
+        return run
 
     @classmethod
     def from_yaml(cls, yaml_path: str) -> "Pipeline":
         """Create a Pipeline instance from a YAML file."""
+        import yaml
+
         try:
             with open(yaml_path, "r") as f:
                 config = yaml.safe_load(f)
@@ -374,10 +1015,31 @@ class Pipeline(BaseModel):
                 output = Output(**output_config, inputs=input_objects)
                 outputs.append(output)
 
+            if config.get("logging_profile") or config.get("logging_level"):
+                configure_logging(
+                    config.get("logging_profile"), config.get("logging_level")
+                )
+
+            # Persist run metadata to SQLite when the config names a database
+            options = {}
+            if config.get("metadata_path"):
+                options["metadata_manager"] = MetadataManager.from_sqlite(
+                    config["metadata_path"]
+                )
+            # Write step output tables under output_dir
+            if config.get("output_dir"):
+                options["table_writer"] = TableWriter(config["output_dir"])
+            # Keep step outputs as Parquet files that later runs can re-read
+            if config.get("intermediate_dir"):
+                options["intermediate_store"] = IntermediateResultStore(
+                    config["intermediate_dir"]
+                )
+
             return cls(
                 data_sources=data_sources,
                 processing_steps=processing_steps,
                 outputs=outputs,
+                **options,
             )
         except FileNotFoundError:
             raise
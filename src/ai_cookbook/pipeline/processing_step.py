@@ -1,10 +1,15 @@
-import importlib
-
-from pydantic import ValidationError, BaseModel, field_validator, Field
+from pydantic import (
+    ValidationError,
+    BaseModel,
+    field_serializer,
+    field_validator,
+    model_validator,
+    Field,
+)
 from typing import List, Union, Optional, Callable
 
-from ai_cookbook.logging.logger import log
 from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.function_ref import FunctionRef, check_function_path
 
 
 class ProcessingStep(BaseModel):
@@ -15,38 +20,36 @@ class ProcessingStep(BaseModel):
     inputs: List[Union["ProcessingStep", DataSource]]
     output_table: str
     parameters: Optional[dict] = Field(default_factory=dict)
+    # How the output table is written, see pipeline.table_writer
+    write_mode: str = "append"
+    merge_keys: Optional[List[str]] = None
+    partition_by: Optional[List[str]] = None
 
     @field_validator("function")
     def validate_function_exists(cls, v):
         if isinstance(v, Callable):
             return v
 
-        try:
-            # Split the function path into module path and function name
-            module_path, function_name = v.rsplit(".", 1)
-
-            # Import the module
-            module = importlib.import_module(module_path)
+        # Only locate the module here; it is imported when the step first runs
+        check_function_path(v)
+        return FunctionRef(v)
 
-            # Check if the function exists in the module
-            if not hasattr(module, function_name):
-                raise ValueError(
-                    f"Function '{function_name}' not found in module '{module_path}'"
-                )
+    @field_serializer("function")
+    def serialize_function(self, v):
+        # Dotted paths dump as the path they were configured with
+        return str(v) if isinstance(v, FunctionRef) else v
 
-            # Optionally, verify it's callable
-            if not callable(getattr(module, function_name)):
-                raise ValueError(
-                    f"'{function_name}' in module '{module_path}' is not callable"
-                )
+    @field_validator("write_mode")
+    def validate_write_mode(cls, v):
+        if v not in {"append", "overwrite", "merge"}:
+            raise ValueError(f"Invalid write mode: {v}")
+        return v
 
-            return v
-        except ImportError:
-            raise ValueError(f"Could not import module '{module_path}'")
-        except ValueError as e:
-            raise e
-        except Exception as e:
-            raise ValueError(f"Invalid function path: {str(e)}")
+    @model_validator(mode="after")
+    def validate_merge_keys(self):
+        if self.write_mode == "merge" and not self.merge_keys:
+            raise ValueError("merge_keys are required for write_mode 'merge'")
+        return self
 
     # @field_validator("inputs")
     # @classmethod
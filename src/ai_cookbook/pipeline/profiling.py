@@ -0,0 +1,386 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ai_cookbook.logging.logger import log
+
+PROFILERS = ("cprofile", "sampling")
+# Held by the edge running under cProfile. From Python 3.12 on only one
+# profiler can be active per process, so concurrent edges are only timed.
+_cprofile_lock = threading.Lock()
+
+
+def peak_rss_kb() -> Optional[int]:
+    """
+    Peak resident set size of this process in KiB, None where unsupported
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def count_records(value) -> Optional[int]:
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    records = getattr(value, "records", None)
+    return records if isinstance(records, int) else None
+
+
+def estimate_size(value, sample: int = 1000) -> int:
+    """
+    Rough payload size in bytes. Large containers are sampled rather than
+    walked, so this stays cheap for big results.
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (int, float)):
+        return 8
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, dict):
+        return sum(
+            estimate_size(k, sample) + estimate_size(v, sample)
+            for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        if len(value) <= sample:
+            return sum(estimate_size(item, sample) for item in value)
+        head = sum(estimate_size(item, sample) for item in value[:sample])
+        return head * len(value) // sample
+    return sys.getsizeof(value)
+
+
+@dataclass
+class NodeProfile:
+    """
+    Resource usage of one edge (or, in streaming runs, one node)
+    """
+
+    name: str
+    node: str
+    kind: str = "edge"
+    status: str = "completed"
+    start: float = 0.0
+    wall: float = 0.0
+    cpu: Optional[float] = None
+    rss_delta_kb: Optional[int] = None
+    thread: Optional[str] = None
+    records_in: Optional[int] = None
+    records_out: Optional[int] = None
+    bytes_in: Optional[int] = None
+    bytes_out: Optional[int] = None
+
+
+class Measurement:
+    """
+    Start of a measurement in the thread doing the work; `stop` fills in a
+    `NodeProfile` with the elapsed wall and CPU time and the peak RSS growth
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.thread = threading.current_thread().name
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        self._rss = peak_rss_kb()
+
+    def stop(self, profile: NodeProfile) -> NodeProfile:
+        profile.start = self.start
+        profile.thread = self.thread
+        profile.wall = time.perf_counter() - self._wall
+        profile.cpu = time.thread_time() - self._cpu
+        rss = peak_rss_kb()
+        if rss is not None and self._rss is not None:
+            profile.rss_delta_kb = rss - self._rss
+        return profile
+
+
+class _StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval and counts the
+    collapsed stacks, the input format of flame graph tools
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_path(profile_dir: str, name: str, profiler: str) -> str:
+    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+    extension = "prof" if profiler == "cprofile" else "folded"
+    return os.path.join(profile_dir, f"{safe_name}.{extension}")
+
+
+def _call_with_cprofile(call: Callable, function: Callable, path: str):
+    import cProfile
+
+    if not _cprofile_lock.acquire(blocking=False):
+        log.warning("Another edge is under cProfile, only timing %s", path)
+        return call(function)
+    try:
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError as e:
+            # Another profiling tool is active, e.g. the whole process runs
+            # under one
+            log.warning("Cannot profile %s, only timing it: %s", path, e)
+            return call(function)
+        try:
+            result = call(function)
+        finally:
+            prof.disable()
+        prof.dump_stats(path)
+        return result
+    finally:
+        _cprofile_lock.release()
+
+
+def measure_call(
+    function: Callable,
+    name: str,
+    node: str,
+    profiler: Optional[str] = None,
+    profile_dir: Optional[str] = None,
+):
+    """
+    Call an edge function and return (result, NodeProfile). With `profiler`
+    the call also runs under cProfile ("cprofile", written as .prof) or a
+    stack sampler ("sampling", written as collapsed stacks) into
+    `profile_dir`. Only one edge per process runs under cProfile at a time;
+    edges overlapping it are only timed. Module-level so process pools can
+    run it.
+    """
+    from .scheduler import call_edge_function
+
+    measurement = Measurement()
+    if profiler is None:
+        result = call_edge_function(function)
+    else:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = profile_path(profile_dir, name, profiler)
+        if profiler == "cprofile":
+            result = _call_with_cprofile(call_edge_function, function, path)
+        else:
+            with _StackSampler(threading.get_ident()) as sampler:
+                result = call_edge_function(function)
+            sampler.write(path)
+    profile = measurement.stop(NodeProfile(name=name, node=node))
+    profile.records_out = count_records(result)
+    profile.bytes_out = estimate_size(result)
+    return result, profile
+
+
+@dataclass
+class RunProfile:
+    """
+    Per-edge profiles of a run, exportable as a Chrome trace or as
+    OpenTelemetry spans
+    """
+
+    run_id: str
+    # Node name -> (profiler, profile_dir) for nodes profiled in depth
+    options: Dict[str, tuple] = field(default_factory=dict)
+    nodes: List[NodeProfile] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, profile: NodeProfile):
+        with self._lock:
+            self.nodes.append(profile)
+
+    def by_node(self) -> Dict[str, List[NodeProfile]]:
+        grouped: Dict[str, List[NodeProfile]] = {}
+        for profile in self.nodes:
+            grouped.setdefault(profile.node, []).append(profile)
+        return grouped
+
+    def summary(self) -> List[dict]:
+        return [asdict(profile) for profile in self.nodes]
+
+    def chrome_trace(self) -> dict:
+        """
+        Trace-event JSON, viewable in chrome://tracing or Perfetto
+        """
+        origin = min((p.start for p in self.nodes), default=0.0)
+        threads: Dict[str, int] = {}
+        events = []
+        for profile in self.nodes:
+            tid = threads.setdefault(profile.thread or "main", len(threads) + 1)
+            events.append(
+                {
+                    "name": profile.name,
+                    "cat": profile.kind,
+                    "ph": "X",
+                    "ts": (profile.start - origin) * 1e6,
+                    "dur": profile.wall * 1e6,
+                    "pid": 1,
+                    "tid": tid,
+                    "args": _attributes(profile),
+                }
+            )
+        for thread, tid in threads.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": thread},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def otel_spans(self, service_name: str = "ai_cookbook") -> dict:
+        """
+        OTLP/JSON trace payload: one root span for the run and a child span
+        per edge
+        """
+        trace_id = uuid.UUID(self.run_id).hex if _is_uuid(self.run_id) else uuid.uuid4().hex
+        root_id = os.urandom(8).hex()
+        start = min((p.start for p in self.nodes), default=time.time())
+        end = max((p.start + p.wall for p in self.nodes), default=start)
+        spans = [
+            {
+                "traceId": trace_id,
+                "spanId": root_id,
+                "name": f"run {self.run_id}",
+                "kind": 1,
+                "startTimeUnixNano": str(int(start * 1e9)),
+                "endTimeUnixNano": str(int(end * 1e9)),
+                "attributes": [_otel_attribute("run_id", self.run_id)],
+                "status": {"code": 1},
+            }
+        ]
+        for profile in self.nodes:
+            spans.append(
+                {
+                    "traceId": trace_id,
+                    "spanId": os.urandom(8).hex(),
+                    "parentSpanId": root_id,
+                    "name": profile.name,
+                    "kind": 1,
+                    "startTimeUnixNano": str(int(profile.start * 1e9)),
+                    "endTimeUnixNano": str(int((profile.start + profile.wall) * 1e9)),
+                    "attributes": [
+                        _otel_attribute(key, value)
+                        for key, value in _attributes(profile).items()
+                    ],
+                    # 1 = OK, 2 = ERROR
+                    "status": {"code": 2 if profile.status == "failed" else 1},
+                }
+            )
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_otel_attribute("service.name", service_name)]
+                    },
+                    "scopeSpans": [{"scope": {"name": "ai_cookbook"}, "spans": spans}],
+                }
+            ]
+        }
+
+    def export_otel(self, target: str, service_name: str = "ai_cookbook"):
+        """
+        Send the spans to an OTLP/HTTP collector (`target` is its traces URL,
+        e.g. http://localhost:4318/v1/traces) or write them to a JSON file
+        """
+        payload = self.otel_spans(service_name)
+        if target.startswith(("http://", "https://")):
+            import requests
+
+            response = requests.post(target, json=payload, timeout=10)
+            response.raise_for_status()
+        else:
+            with open(target, "w") as f:
+                json.dump(payload, f)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _attributes(profile: NodeProfile) -> dict:
+    return {
+        key: value
+        for key, value in asdict(profile).items()
+        if key not in ("name", "start", "thread") and value is not None
+    }
+
+
+def _otel_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def profiler_options(
+    nodes: Iterable[str], profiler: str, profile_dir: Optional[str]
+) -> Dict[str, tuple]:
+    """
+    Validate per-node profiler settings and map node name -> (profiler, dir)
+    """
+    nodes = list(nodes or [])
+    if not nodes:
+        return {}
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+    profile_dir = profile_dir or "profiles"
+    return {node: (profiler, profile_dir) for node in nodes}
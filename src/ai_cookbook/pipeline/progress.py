@@ -0,0 +1,225 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from typing import Callable, List, Optional, Union
+
+from ai_cookbook.logging.logger import log
+
+
+@dataclass
+class ProgressSnapshot:
+    """
+    Edge counts of a run at one point in time
+    """
+
+    total: int
+    completed: int = 0
+    cached: int = 0
+    failed: int = 0
+    running: int = 0
+    elapsed: float = 0.0
+    # (edge name, status) transitions since the previous snapshot, only
+    # collected for reporters that ask for them
+    events: List[tuple] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.cached + self.failed
+
+
+class ProgressReporter(ABC):
+    """
+    Base class for run progress reporters. Edge transitions only update
+    counters; `render` sees a snapshot at most once per `interval` seconds
+    (and once at the end), so reporting costs the same per edge however many
+    edges the run has.
+    """
+
+    interval: float = 0.1
+    collect_events: bool = False
+
+    def __init__(self, interval: Optional[float] = None):
+        if interval is not None:
+            self.interval = interval
+        self._lock = threading.Lock()
+        self._state = ProgressSnapshot(total=0)
+        self._started = self._rendered = 0.0
+
+    def start(self, total: int):
+        self._state = ProgressSnapshot(total=total)
+        self._started = self._rendered = time.monotonic()
+        self.open(total)
+
+    def finish(self):
+        with self._lock:
+            self.render(self._snapshot(time.monotonic()))
+        self.close()
+
+    def edge_started(self, edge_name: str):
+        self._record(edge_name, "running", running=1)
+
+    def edge_completed(self, edge_name: str):
+        self._record(edge_name, "completed", running=-1, completed=1)
+
+    def edge_cached(self, edge_name: str):
+        self._record(edge_name, "cached", cached=1)
+
+    def edge_failed(self, edge_name: str):
+        self._record(edge_name, "failed", running=-1, failed=1)
+
+    def _record(
+        self,
+        edge_name: str,
+        status: str,
+        running: int = 0,
+        completed: int = 0,
+        cached: int = 0,
+        failed: int = 0,
+    ):
+        with self._lock:
+            state = self._state
+            state.running += running
+            state.completed += completed
+            state.cached += cached
+            state.failed += failed
+            if self.collect_events:
+                state.events.append((edge_name, status))
+            now = time.monotonic()
+            if now - self._rendered >= self.interval:
+                self.render(self._snapshot(now))
+
+    def _snapshot(self, now: float) -> ProgressSnapshot:
+        snapshot = replace(self._state, elapsed=now - self._started)
+        self._state.events = []
+        self._rendered = now
+        return snapshot
+
+    def open(self, total: int):
+        pass
+
+    @abstractmethod
+    def render(self, snapshot: ProgressSnapshot):
+        ...
+
+    def close(self):
+        pass
+
+
+class NullProgress(ProgressReporter):
+    """
+    Reports nothing
+    """
+
+    def start(self, total: int):
+        pass
+
+    def finish(self):
+        pass
+
+    def _record(self, *args, **kwargs):
+        pass
+
+    def render(self, snapshot: ProgressSnapshot):
+        pass
+
+
+class RichProgress(ProgressReporter):
+    """
+    A single Rich progress bar over all edges of the run
+    """
+
+    def open(self, total: int):
+        from rich.progress import Progress, SpinnerColumn
+
+        self._progress = Progress(
+            SpinnerColumn(), *Progress.get_default_columns(), auto_refresh=False
+        )
+        self._progress.start()
+        self._task = self._progress.add_task(
+            description="[cyan]Running pipeline...", total=total
+        )
+
+    def render(self, snapshot: ProgressSnapshot):
+        self._progress.update(
+            self._task,
+            completed=snapshot.done,
+            description=f"[cyan]Running pipeline... ({snapshot.running} running)",
+            # required for Jupyter notebook
+            refresh=True,
+        )
+
+    def close(self):
+        self._progress.stop()
+
+
+class LogProgress(ProgressReporter):
+    """
+    A periodic log line, for batch jobs without a terminal
+    """
+
+    interval = 10.0
+
+    def render(self, snapshot: ProgressSnapshot):
+        log.info(
+            "Progress: %d/%d edges (%d running, %d cached, %d failed) after %.1fs",
+            snapshot.done,
+            snapshot.total,
+            snapshot.running,
+            snapshot.cached,
+            snapshot.failed,
+            snapshot.elapsed,
+        )
+
+
+class CallbackProgress(ProgressReporter):
+    """
+    Hands each snapshot, with the edge transitions batched since the last
+    one, to `callback`
+    """
+
+    interval = 0.5
+    collect_events = True
+
+    def __init__(
+        self,
+        callback: Callable[[ProgressSnapshot], None],
+        interval: Optional[float] = None,
+    ):
+        super().__init__(interval)
+        self.callback = callback
+
+    def render(self, snapshot: ProgressSnapshot):
+        self.callback(snapshot)
+
+
+REPORTERS = {"rich": RichProgress, "log": LogProgress, "none": NullProgress}
+
+
+def get_progress_reporter(
+    progress: Union[str, ProgressReporter, Callable, None] = "auto",
+) -> ProgressReporter:
+    """
+    Reporter for a `progress` setting: "auto" (Rich on a terminal or in a
+    notebook, log lines otherwise), "rich", "log", "none", a callback taking
+    a `ProgressSnapshot`, or a `ProgressReporter`
+    """
+    if isinstance(progress, ProgressReporter):
+        return progress
+    if progress is None:
+        return NullProgress()
+    if progress == "auto":
+        from ai_cookbook.logging import get_console
+
+        console = get_console()
+        progress = "rich" if console.is_terminal or console.is_jupyter else "log"
+    if isinstance(progress, str):
+        if progress not in REPORTERS:
+            raise ValueError(
+                f"Invalid progress reporter: {progress}. "
+                f"Expected one of {['auto', *REPORTERS]}"
+            )
+        return REPORTERS[progress]()
+    if callable(progress):
+        return CallbackProgress(progress)
+    raise TypeError(f"Invalid progress reporter: {progress!r}")
@@ -0,0 +1,318 @@
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from ai_cookbook.logging.logger import log
+
+DEFAULT_BLOCK_SIZE = 8 << 20
+
+
+def _align(block_size: int) -> int:
+    # madvise needs page-aligned offsets, so blocks are whole pages
+    granularity = mmap.ALLOCATIONGRANULARITY
+    return max(granularity, block_size // granularity * granularity)
+
+
+class ByteBudget:
+    """
+    Bytes that may be fetched but not yet consumed, shared by every file a
+    reader is streaming
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int, block: bool = True) -> bool:
+        with self._condition:
+            if block:
+                self._condition.wait_for(lambda: self.used + size <= self.limit)
+            elif self.used + size > self.limit:
+                return False
+            self._take(size)
+            return True
+
+    def force(self, size: int):
+        """
+        Take `size` bytes even over the limit, for the one block a consumer
+        is waiting on, so every stream always makes progress
+        """
+        with self._condition:
+            self._take(size)
+
+    def _take(self, size: int):
+        self.used += size
+        self.peak = max(self.peak, self.used)
+
+    def release(self, size: int):
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+class SourceReader(ABC):
+    """
+    Reads the files of a data source as a stream of `memoryview` blocks of at
+    most `block_size` bytes
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+
+    @abstractmethod
+    def iter_blocks(self, path: str) -> Iterator[memoryview]:
+        ...
+
+    def read(self, path: str) -> bytes:
+        data = bytearray()
+        # Blocks may be released as soon as the next one is read
+        for block in self.iter_blocks(path):
+            data += block
+        return bytes(data)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MmapReader(SourceReader):
+    """
+    Memory-maps local files. Blocks are zero-copy slices of the mapping, and
+    the pages of a block are dropped from the process once the consumer moves
+    on, so RSS stays around one block per open file however large it is.
+    Each block is released when the next one is requested; copy it with
+    `bytes(block)` to keep it.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        super().__init__(_align(block_size))
+
+    @contextmanager
+    def open(self, path: str):
+        """
+        The whole file as one read-only `memoryview`, e.g. for parsers that
+        need random access. It is released when the block exits.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                yield memoryview(b"")
+                return
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        try:
+            yield view
+        finally:
+            view.release()
+            self._close(mapping)
+
+    def iter_blocks(self, path: str) -> Iterator[memoryview]:
+        with self.open(path) as view:
+            if not len(view):
+                return
+            mapping = view.obj
+            if hasattr(mapping, "madvise"):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, len(view), self.block_size):
+                length = min(self.block_size, len(view) - offset)
+                block = view[offset : offset + length]
+                try:
+                    yield block
+                finally:
+                    block.release()
+                    if hasattr(mmap, "MADV_DONTNEED"):
+                        # Clean file pages: dropping them only costs a re-read
+                        mapping.madvise(mmap.MADV_DONTNEED, offset, length)
+
+    @staticmethod
+    def _close(mapping: mmap.mmap):
+        try:
+            mapping.close()
+        except BufferError:
+            # A consumer still holds a view, the mapping goes with it
+            log.debug("Leaving mmap open, a view is still in use")
+
+
+def read_local_range(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        return os.pread(f.fileno(), length, offset)
+
+
+class RangedReader(SourceReader):
+    """
+    Reads files in fixed-size ranged requests, for volumes and remote storage
+    where mapping is unavailable or slow. Up to `read_ahead` blocks are
+    fetched ahead of the consumer on a thread pool, while the bytes fetched
+    but not yet consumed across all files stay within `max_bytes_in_flight`
+    (plus the block each consumer is waiting on).
+
+    `fetch(path, offset, length)` returns the bytes of one range and
+    `get_size(path)` the file size; both default to local files, e.g. a FUSE
+    mounted Unity Catalog volume.
+
+    The thread pool is started by the first read and stopped by `close`; a
+    read after `close` starts a new one.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, int, int], bytes] = read_local_range,
+        get_size: Callable[[str], int] = os.path.getsize,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        read_ahead: int = 4,
+        max_bytes_in_flight: int = 64 << 20,
+        max_workers: int = 4,
+    ):
+        super().__init__(block_size)
+        self.fetch = fetch
+        self.get_size = get_size
+        self.read_ahead = read_ahead
+        self.max_workers = max_workers
+        self.budget = ByteBudget(max_bytes_in_flight)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="source-reader"
+                )
+            return self._executor
+
+    def iter_blocks(self, path: str) -> Iterator[memoryview]:
+        executor = self._pool()
+        size = self.get_size(path)
+        ranges = deque(
+            (offset, min(self.block_size, size - offset))
+            for offset in range(0, size, self.block_size)
+        )
+        pending = deque()
+
+        def submit():
+            offset, length = ranges.popleft()
+            future = executor.submit(self.fetch, path, offset, length)
+            pending.append((length, future))
+
+        try:
+            while ranges or pending:
+                if not pending:
+                    self.budget.force(ranges[0][1])
+                    submit()
+                while (
+                    ranges
+                    and len(pending) <= self.read_ahead
+                    and self.budget.acquire(ranges[0][1], block=False)
+                ):
+                    submit()
+                length, future = pending.popleft()
+                try:
+                    yield memoryview(future.result())
+                finally:
+                    self.budget.release(length)
+        finally:
+            # Abandoned read-ahead gives its bytes back once it settles
+            for length, future in pending:
+                future.cancel()
+                future.add_done_callback(
+                    lambda _, length=length: self.budget.release(length)
+                )
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __reduce__(self):
+        # The pool and budget are per process, e.g. for handles in cached results
+        return (
+            type(self),
+            (
+                self.fetch,
+                self.get_size,
+                self.block_size,
+                self.read_ahead,
+                self.budget.limit,
+                self.max_workers,
+            ),
+        )
+
+
+def http_range_fetcher(session=None, headers: Optional[dict] = None):
+    """
+    `fetch` and `get_size` for files served over HTTP with Range support,
+    e.g. the Databricks Files API
+    """
+    import requests
+
+    session = session or requests.Session()
+    if headers:
+        session.headers.update(headers)
+
+    def fetch(url: str, offset: int, length: int) -> bytes:
+        response = session.get(
+            url, headers={"Range": f"bytes={offset}-{offset + length - 1}"}
+        )
+        response.raise_for_status()
+        return response.content
+
+    def get_size(url: str) -> int:
+        response = session.head(url)
+        response.raise_for_status()
+        return int(response.headers["Content-Length"])
+
+    return fetch, get_size
+
+
+class SourceFile:
+    """
+    Lazy handle on one file of a data source. Behaves as a path (`os.fspath`)
+    for functions that open files themselves.
+    """
+
+    def __init__(self, path: str, size: int, reader: SourceReader):
+        self.path = path
+        self.size = size
+        self.reader = reader
+
+    def blocks(self) -> Iterator[memoryview]:
+        return self.reader.iter_blocks(self.path)
+
+    def read(self) -> bytes:
+        return self.reader.read(self.path)
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f"SourceFile({self.path!r}, size={self.size})"
+
+
+def get_source_reader(source) -> SourceReader:
+    """
+    Reader for a `DataSource`: ranged HTTP reads for URLs, ranged local reads
+    under /Volumes (a FUSE mount, where mapping is slow) and memory mapping
+    for other local paths. `source.reader_options` overrides the reader's
+    keyword arguments, e.g. {"block_size": 4194304}.
+    """
+    options = dict(source.reader_options or {})
+    path = source.path
+    if path.startswith(("http://", "https://")):
+        fetch, get_size = http_range_fetcher(headers=options.pop("headers", None))
+        return RangedReader(fetch, get_size, **options)
+    if path.startswith("/Volumes/") or source.volume_name:
+        return RangedReader(**options)
+    return MmapReader(**options)
@@ -0,0 +1,303 @@
+import asyncio
+import inspect
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Callable, Dict, List, Optional
+
+from ai_cookbook.logging.logger import log
+from .dag import Edge, build_adjacency
+
+
+EXECUTOR_BACKENDS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+# Default number of edges allowed in flight per resource in the async engine
+DEFAULT_RESOURCE_LIMITS = {
+    "volume": 16,
+    "table": 8,
+    "vector_index": 8,
+    "intermediate": 16,
+}
+
+
+def call_edge_function(function: Callable):
+    """
+    Call an edge function from synchronous code, running it to completion
+    if it is (or returns) a coroutine. When the calling thread already runs
+    an event loop (e.g. in a notebook), the coroutine runs on a loop of its
+    own in a helper thread, as `asyncio.run` cannot nest; `arun()` awaits it
+    on the caller's loop instead.
+    """
+    result = function()
+    if not inspect.isawaitable(result):
+        return result
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(result))
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="edge-loop") as pool:
+        return pool.submit(asyncio.run, _await(result)).result()
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+class ReadyQueue:
+    """
+    In-degree bookkeeping for a DAG of edges. A node completes once all of its
+    incoming edges have completed, at which point its outgoing edges are ready.
+    `nodes` may be a `CompiledDag` to reuse its adjacency.
+    """
+
+    def __init__(self, nodes, edges: List[Edge]):
+        self.outgoing, self.in_degree = build_adjacency(nodes, edges)
+        self.completed_nodes: List[str] = []
+
+    def start(self) -> List[Edge]:
+        """
+        Complete every node without incoming edges and return the edges they unlock
+        """
+        ready = []
+        for node, degree in self.in_degree.items():
+            if degree == 0:
+                ready.extend(self._complete_node(node))
+        return ready
+
+    def complete_edge(self, edge: Edge) -> List[Edge]:
+        """
+        Mark an edge as completed and return any edges that became ready
+        """
+        node = edge.destination.name
+        self.in_degree[node] -= 1
+        if self.in_degree[node] == 0:
+            return self._complete_node(node)
+        return []
+
+    def _complete_node(self, node: str) -> List[Edge]:
+        self.completed_nodes.append(node)
+        return list(self.outgoing[node])
+
+
+class DagScheduler:
+    """
+    Dispatches edges to a thread or process pool as soon as their source node
+    has completed, so independent branches of the DAG run concurrently.
+
+    The callbacks are always invoked from the calling thread, which keeps
+    metadata and progress updates out of the worker pool.
+    """
+
+    def __init__(
+        self,
+        nodes,
+        edges: List[Edge],
+        backend: str = "thread",
+        max_workers: Optional[int] = None,
+    ):
+        if backend not in EXECUTOR_BACKENDS:
+            raise ValueError(
+                f"Invalid scheduler backend: {backend}. "
+                f"Expected one of {sorted(EXECUTOR_BACKENDS)}"
+            )
+        self.nodes = nodes
+        self.edges = edges
+        self.backend = backend
+        self.max_workers = max_workers
+
+    def run(
+        self,
+        on_edge_start: Callable[[Edge], None],
+        on_edge_complete: Callable[[Edge, object], None],
+        on_edge_failed: Callable[[Edge, Exception], None],
+        on_node_complete: Optional[Callable[[str], None]] = None,
+        try_cached: Optional[Callable[[Edge], bool]] = None,
+        prepare: Optional[Callable[[Edge], Callable]] = None,
+    ) -> List[str]:
+        """
+        Execute every edge and return the node names in completion order.
+        The first edge failure stops new dispatches; in-flight edges are
+        drained and the failure is re-raised. Edges for which `try_cached`
+        returns True are completed without being executed. `prepare` maps an
+        edge to the callable the pool runs in place of `edge.function`, e.g.
+        to measure it; for process pools it must be picklable.
+        """
+        queue = ReadyQueue(self.nodes, self.edges)
+        pending: Dict = {}
+        error = None
+        reported = 0
+
+        def report_nodes():
+            nonlocal reported
+            if on_node_complete is not None:
+                for node in queue.completed_nodes[reported:]:
+                    on_node_complete(node)
+            reported = len(queue.completed_nodes)
+
+        executor_cls = EXECUTOR_BACKENDS[self.backend]
+        with executor_cls(max_workers=self.max_workers) as executor:
+
+            def dispatch(edges: List[Edge]):
+                edges = list(edges)
+                while edges:
+                    edge = edges.pop(0)
+                    if try_cached is not None and try_cached(edge):
+                        edges.extend(queue.complete_edge(edge))
+                        continue
+                    on_edge_start(edge)
+                    function = prepare(edge) if prepare else edge.function
+                    future = executor.submit(call_edge_function, function)
+                    pending[future] = edge
+
+            dispatch(queue.start())
+            report_nodes()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    edge = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        on_edge_failed(edge, e)
+                        if error is None:
+                            log.error(
+                                f"Stopping scheduler after failure in {edge.source.name} → {edge.destination.name}"
+                            )
+                            error = e
+                        continue
+
+                    on_edge_complete(edge, result)
+                    ready = queue.complete_edge(edge)
+                    if error is None:
+                        dispatch(ready)
+                    report_nodes()
+
+        if error is not None:
+            raise error
+
+        return queue.completed_nodes
+
+
+class AsyncDagScheduler:
+    """
+    Asyncio counterpart of `DagScheduler` for I/O-bound edges. Coroutine edge
+    functions are awaited natively and plain callables are offloaded to a
+    thread pool. Each edge holds the semaphore of its `resource` while it
+    runs, so e.g. volume reads and index upserts are bounded independently.
+    """
+
+    def __init__(
+        self,
+        nodes,
+        edges: List[Edge],
+        max_concurrency: int = 32,
+        resource_limits: Optional[Dict[str, int]] = None,
+    ):
+        self.nodes = nodes
+        self.edges = edges
+        self.max_concurrency = max_concurrency
+        self.resource_limits = {**DEFAULT_RESOURCE_LIMITS, **(resource_limits or {})}
+
+    async def run(
+        self,
+        on_edge_start: Callable[[Edge], None],
+        on_edge_complete: Callable[[Edge, object], None],
+        on_edge_failed: Callable[[Edge, Exception], None],
+        on_node_complete: Optional[Callable[[str], None]] = None,
+        try_cached: Optional[Callable[[Edge], bool]] = None,
+        on_edge_call: Optional[Callable[[Edge], None]] = None,
+    ) -> List[str]:
+        """
+        Execute every edge and return the node names in completion order.
+        `on_edge_start` is called when an edge is dispatched, `on_edge_call`
+        once it holds its resource semaphore and is actually called.
+        """
+        queue = ReadyQueue(self.nodes, self.edges)
+        semaphores = {
+            resource: asyncio.Semaphore(limit)
+            for resource, limit in self.resource_limits.items()
+        }
+        default_semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending: Dict = {}
+        error = None
+        reported = 0
+
+        def report_nodes():
+            nonlocal reported
+            if on_node_complete is not None:
+                for node in queue.completed_nodes[reported:]:
+                    on_node_complete(node)
+            reported = len(queue.completed_nodes)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+
+            def dispatch(edges: List[Edge]):
+                edges = list(edges)
+                while edges:
+                    edge = edges.pop(0)
+                    if try_cached is not None and try_cached(edge):
+                        edges.extend(queue.complete_edge(edge))
+                        continue
+                    on_edge_start(edge)
+                    semaphore = semaphores.get(edge.resource, default_semaphore)
+                    task = asyncio.ensure_future(
+                        self._call(edge, semaphore, executor, on_edge_call)
+                    )
+                    pending[task] = edge
+
+            dispatch(queue.start())
+            report_nodes()
+
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    edge = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        on_edge_failed(edge, e)
+                        if error is None:
+                            log.error(
+                                f"Stopping scheduler after failure in {edge.source.name} → {edge.destination.name}"
+                            )
+                            error = e
+                        continue
+
+                    on_edge_complete(edge, result)
+                    ready = queue.complete_edge(edge)
+                    if error is None:
+                        dispatch(ready)
+                    report_nodes()
+
+        if error is not None:
+            raise error
+
+        return queue.completed_nodes
+
+    async def _call(
+        self,
+        edge: Edge,
+        semaphore: asyncio.Semaphore,
+        executor,
+        on_edge_call: Optional[Callable[[Edge], None]] = None,
+    ):
+        async with semaphore:
+            if on_edge_call is not None:
+                on_edge_call(edge)
+            if inspect.iscoroutinefunction(edge.function):
+                result = await edge.function()
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(executor, edge.function)
+            if inspect.isawaitable(result):
+                result = await result
+        return result
@@ -0,0 +1,193 @@
+import queue
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ai_cookbook.logging.logger import log
+from .dag import Edge, build_adjacency
+
+
+_END = object()
+
+
+def iter_records(value) -> Iterator:
+    """
+    Iterate over the records in a step result. Generators, iterators, lists
+    and tuples are streamed item by item, None yields nothing and any other
+    value is a single record.
+    """
+    if value is None:
+        return iter(())
+    if isinstance(value, (str, bytes, dict)):
+        return iter((value,))
+    if isinstance(value, (list, tuple)) or isinstance(value, Iterator):
+        return iter(value)
+    return iter((value,))
+
+
+def iter_batches(records: Iterable, batch_size: int) -> Iterator[list]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class BoundedStream:
+    """
+    Bounded queue of record batches between two nodes. Producers block once
+    `maxsize` batches are waiting, which is what keeps memory constant.
+    Iterating the stream yields individual records.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._cancelled = threading.Event()
+
+    def put(self, batch: list):
+        # Poll so a producer never stays blocked on a consumer that has gone away
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        self.put(_END)
+
+    def fail(self, error: BaseException):
+        self.put(_StreamError(error))
+
+    def cancel(self):
+        """
+        Called by the consumer once it stops reading; later puts are dropped
+        """
+        self._cancelled.set()
+
+    def __iter__(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _END:
+                return
+            if isinstance(batch, _StreamError):
+                raise UpstreamError(batch.error) from batch.error
+            yield from batch
+
+
+class _StreamError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class UpstreamError(RuntimeError):
+    """
+    Raised in a consumer when the node feeding one of its streams failed
+    """
+
+    def __init__(self, error: BaseException):
+        super().__init__(f"Upstream node failed: {error}")
+        self.error = error
+
+
+class StreamingExecutor:
+    """
+    Runs every node of the DAG concurrently in its own thread, connected by
+    one `BoundedStream` per edge. A node's inputs are lazy record iterators,
+    its output is split into batches of `batch_size` and fanned out to each
+    downstream stream.
+
+    A node with several inputs fed from a common upstream node should consume
+    them in lockstep (e.g. with `zip`), otherwise it can stall once one of
+    the queues is full.
+    """
+
+    def __init__(
+        self,
+        nodes,
+        edges: List[Edge],
+        batch_size: int = 100,
+        queue_size: int = 4,
+    ):
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError("batch_size and queue_size must be at least 1")
+        self.nodes = nodes
+        self.edges = edges
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        process: Callable[[str, List[Iterator]], Any],
+        on_batch: Optional[Callable[[str, list], None]] = None,
+        on_node_start: Optional[Callable[[str], None]] = None,
+        on_node_complete: Optional[Callable[[str, int], None]] = None,
+        on_node_failed: Optional[Callable[[str, BaseException], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Stream records through the DAG and return the record count per node.
+
+        `process(node, inputs)` returns the node's records, `on_batch` is
+        called for every batch a node emits. Callbacks are serialized with a
+        lock, so they do not need to be thread-safe themselves.
+        """
+        outgoing, _ = build_adjacency(self.nodes, self.edges)
+        streams = {edge: BoundedStream(self.queue_size) for edge in self.edges}
+        incoming = {node: [] for node in self.nodes}
+        for edge in self.edges:
+            incoming[edge.destination.name].append(streams[edge])
+
+        lock = threading.Lock()
+        counts: Dict[str, int] = {}
+        errors: List[BaseException] = []
+
+        def notify(callback, *args):
+            if callback is not None:
+                with lock:
+                    callback(*args)
+
+        def worker(node: str):
+            inputs = incoming[node]
+            outputs = [streams[edge] for edge in outgoing[node]]
+            count = 0
+            notify(on_node_start, node)
+            try:
+                records = iter_records(process(node, inputs))
+                for batch in iter_batches(records, self.batch_size):
+                    notify(on_batch, node, batch)
+                    for stream in outputs:
+                        stream.put(batch)
+                    count += len(batch)
+            except BaseException as e:
+                for stream in outputs:
+                    stream.fail(e)
+                with lock:
+                    # Keep the root cause rather than the errors it cascades into
+                    if not isinstance(e, UpstreamError):
+                        errors.append(e)
+                notify(on_node_failed, node, e)
+            else:
+                for stream in outputs:
+                    stream.close()
+                with lock:
+                    counts[node] = count
+                notify(on_node_complete, node, count)
+            finally:
+                for stream in inputs:
+                    stream.cancel()
+
+        threads = [
+            threading.Thread(target=worker, args=(node,), name=f"stream-{node}")
+            for node in self.nodes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            log.error(f"Streaming run failed: {errors[0]}")
+            raise errors[0]
+
+        return counts
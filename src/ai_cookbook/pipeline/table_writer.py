@@ -0,0 +1,503 @@
+import base64
+import json
+import os
+import threading
+import time
+import urllib.parse
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ai_cookbook.logging.logger import log
+from ai_cookbook.pipeline.intermediate_result import _pyarrow, to_arrow
+
+WRITE_MODES = ("append", "overwrite", "merge")
+LOG_DIR = "_delta_log"
+COMMIT_RETRIES = 10
+
+
+class CommitConflictError(RuntimeError):
+    """
+    Another writer removed files this commit was rewriting
+    """
+
+
+def _encode_schema(schema) -> str:
+    return base64.b64encode(schema.serialize().to_pybytes()).decode()
+
+
+def _decode_schema(encoded: str):
+    pa = _pyarrow()
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(encoded)))
+
+
+def _plain(table):
+    # Dictionary encoding is a storage detail, Parquet re-applies it per file
+    pa = _pyarrow()
+    fields = [
+        pa.field(f.name, f.type.value_type, f.nullable)
+        if pa.types.is_dictionary(f.type)
+        else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields))
+
+
+def conform(table, schema):
+    """
+    `table` with the columns of `schema`, in order: missing columns are null
+    and the others are cast to the (possibly widened) type
+    """
+    pa = _pyarrow()
+    columns = [
+        table.column(f.name).cast(f.type)
+        if f.name in table.column_names
+        else pa.nulls(table.num_rows, f.type)
+        for f in schema
+    ]
+    return pa.table(columns, schema=schema)
+
+
+@dataclass
+class Snapshot:
+    version: int = -1
+    schema: object = None
+    partition_by: List[str] = field(default_factory=list)
+    # Active data files by path, relative to the table directory
+    files: Dict[str, dict] = field(default_factory=dict)
+
+
+class LocalTable:
+    """
+    Delta-style table in a local directory: Parquet data files plus a log of
+    JSON commits in `_delta_log/`, one file per version. A commit adds and
+    removes whole files, so readers only ever see complete versions, and the
+    log is replayed incrementally from the last version this instance read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot = Snapshot()
+        self._lock = threading.Lock()
+
+    @property
+    def exists(self) -> bool:
+        return os.path.isdir(os.path.join(self.path, LOG_DIR))
+
+    def _log_file(self, version: int) -> str:
+        return os.path.join(self.path, LOG_DIR, f"{version:020d}.json")
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            snapshot = self._snapshot
+            version = snapshot.version + 1
+            while os.path.exists(self._log_file(version)):
+                with open(self._log_file(version)) as f:
+                    for line in f:
+                        self._replay(snapshot, json.loads(line))
+                snapshot.version = version
+                version += 1
+            return snapshot
+
+    @staticmethod
+    def _replay(snapshot: Snapshot, action: dict):
+        if "metaData" in action:
+            snapshot.schema = _decode_schema(action["metaData"]["schema"])
+            snapshot.partition_by = action["metaData"]["partitionColumns"]
+        elif "add" in action:
+            snapshot.files[action["add"]["path"]] = action["add"]
+        elif "remove" in action:
+            snapshot.files.pop(action["remove"]["path"], None)
+
+    def write_file(self, table, partition: Dict[str, str], compression: str) -> dict:
+        """
+        Write one data file and return its "add" action, not yet committed
+        """
+        pa = _pyarrow()
+        # Hive-style partition directories, e.g. source_file=%2Fdocs%2Fa.pdf
+        parts = [
+            f"{column}={urllib.parse.quote(value, safe='')}"
+            for column, value in partition.items()
+        ]
+        path = os.path.join(*parts, f"part-{uuid.uuid4().hex}.parquet")
+        full_path = os.path.join(self.path, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        pa.parquet.write_table(
+            table, full_path, compression=compression, use_dictionary=True
+        )
+        return {
+            "path": path,
+            "partitionValues": partition,
+            "size": os.path.getsize(full_path),
+            "numRecords": table.num_rows,
+            "modificationTime": int(time.time() * 1000),
+        }
+
+    def commit(
+        self,
+        operation: str,
+        adds: List[dict],
+        removes: List[str] = (),
+        schema=None,
+        partition_by: Optional[List[str]] = None,
+        retries: int = COMMIT_RETRIES,
+        read_version: Optional[int] = None,
+    ) -> int:
+        """
+        Atomically publish a new version and return it. Concurrent appends
+        are retried on the next version; a commit removing files another
+        writer already removed fails with `CommitConflictError`.
+
+        `read_version` is the version `adds` and `removes` were planned
+        against (e.g. by an overwrite or a merge). Such a commit is not
+        retried but fails with `CommitConflictError` once another writer has
+        committed after that version, so it can be planned again.
+        """
+        os.makedirs(os.path.join(self.path, LOG_DIR), exist_ok=True)
+        for _ in range(retries):
+            snapshot = self.snapshot()
+            if read_version is not None and snapshot.version != read_version:
+                raise CommitConflictError(
+                    f"{self.path} changed since version {read_version}"
+                )
+            missing = [path for path in removes if path not in snapshot.files]
+            if missing:
+                raise CommitConflictError(
+                    f"Files of {self.path} were removed concurrently: {missing}"
+                )
+            actions = [
+                {
+                    "commitInfo": {
+                        "operation": operation,
+                        "timestamp": int(time.time() * 1000),
+                    }
+                }
+            ]
+            if schema is not None:
+                actions.append(
+                    {
+                        "metaData": {
+                            "schema": _encode_schema(schema),
+                            "partitionColumns": list(partition_by or []),
+                        }
+                    }
+                )
+            actions += [{"remove": {"path": path}} for path in removes]
+            actions += [{"add": add} for add in adds]
+            version = snapshot.version + 1
+            try:
+                # Exclusive creation is the commit point
+                with open(self._log_file(version), "x") as f:
+                    f.write("\n".join(json.dumps(action) for action in actions))
+            except FileExistsError:
+                if read_version is not None:
+                    raise CommitConflictError(
+                        f"{self.path} changed since version {read_version}"
+                    )
+                continue
+            log.debug("Committed version %d of %s (%s)", version, self.path, operation)
+            return version
+        raise CommitConflictError(
+            f"Could not commit to {self.path} after {retries} tries"
+        )
+
+    def files(self) -> List[str]:
+        snapshot = self.snapshot()
+        return [os.path.join(self.path, path) for path in sorted(snapshot.files)]
+
+    def read(self, columns: Optional[List[str]] = None):
+        """
+        The current version as one Arrow table, older files conformed to the
+        latest schema
+        """
+        pa = _pyarrow()
+        snapshot = self.snapshot()
+        if snapshot.schema is None:
+            return pa.table({})
+        schema = snapshot.schema
+        if columns is not None:
+            schema = pa.schema([schema.field(name) for name in columns])
+        tables = []
+        for path in self.files():
+            # Files written before a column was added do not have it
+            stored = set(pa.parquet.read_schema(path).names)
+            selected = [name for name in schema.names if name in stored]
+            if selected:
+                table = _plain(
+                    pa.parquet.read_table(path, columns=selected, memory_map=True)
+                )
+                tables.append(conform(table, schema))
+            else:
+                rows = pa.parquet.ParquetFile(path).metadata.num_rows
+                tables.append(
+                    pa.table([pa.nulls(rows, f.type) for f in schema], schema=schema)
+                )
+        return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+@dataclass
+class WriteOptions:
+    mode: str = "append"
+    merge_keys: Optional[List[str]] = None
+    partition_by: Optional[List[str]] = None
+    schema_evolution: bool = True
+
+
+class TableWriter:
+    """
+    Writes step outputs to `LocalTable`s under `root`, one per output table.
+
+    Outputs are buffered per table and written by `flush` as a single commit
+    with one file per partition, so many small outputs (e.g. streamed
+    batches) end up as few large files. A table is flushed early once it
+    buffers `target_file_rows` rows. `abort` drops the buffered outputs
+    instead, e.g. of a failed run.
+
+    Modes, set per table with `configure`:
+      - "append" adds the rows
+      - "overwrite" replaces the table's contents on the first flush after
+        `begin`, later flushes of the same run append
+      - "merge" upserts on `merge_keys`: files holding any of the incoming
+        keys are rewritten without those rows, and the new rows are added
+
+    New columns and widened types are merged into the table schema unless
+    `schema_evolution` is off, in which case they raise ValueError.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        target_file_rows: int = 1_000_000,
+        compression: str = "zstd",
+    ):
+        self.root = root
+        self.target_file_rows = target_file_rows
+        self.compression = compression
+        self.options: Dict[str, WriteOptions] = {}
+        self._buffers: Dict[str, list] = {}
+        self._buffered_rows: Dict[str, int] = {}
+        self._overwritten = set()
+        self._tables: Dict[str, LocalTable] = {}
+        self._lock = threading.RLock()
+
+    def configure(self, table_name: str, **options):
+        options = WriteOptions(**options)
+        if options.mode not in WRITE_MODES:
+            raise ValueError(
+                f"Invalid write mode: {options.mode}. Expected one of {WRITE_MODES}"
+            )
+        if options.mode == "merge" and not options.merge_keys:
+            raise ValueError(f"Merge into table '{table_name}' needs merge_keys")
+        self.options[table_name] = options
+
+    def table(self, table_name: str) -> LocalTable:
+        if table_name not in self._tables:
+            self._tables[table_name] = LocalTable(os.path.join(self.root, table_name))
+        return self._tables[table_name]
+
+    def begin(self):
+        """
+        Start a new run: overwrite tables are replaced again on their next flush
+        """
+        with self._lock:
+            self._overwritten.clear()
+
+    def abort(self):
+        """
+        Drop everything buffered since the last flush, e.g. when a run failed
+        """
+        with self._lock:
+            self._buffers.clear()
+            self._buffered_rows.clear()
+
+    def mode(self, table_name: str) -> str:
+        return self.options.get(table_name, WriteOptions()).mode
+
+    def write(self, table_name: str, result) -> bool:
+        """
+        Buffer a step output for `table_name`. Returns False when the output
+        is not tabular (records or Arrow data) and was not buffered.
+        """
+        table = to_arrow(result, dictionary=False)
+        if table is None:
+            log.debug("Not writing non-tabular output to %s", table_name)
+            return False
+        with self._lock:
+            self._buffers.setdefault(table_name, []).append(_plain(table))
+            rows = self._buffered_rows.get(table_name, 0) + table.num_rows
+            self._buffered_rows[table_name] = rows
+            if rows >= self.target_file_rows:
+                self._flush_table(table_name)
+        return True
+
+    def flush(self, table_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Commit everything buffered (for one table, or all of them) and return
+        the committed version of each table
+        """
+        with self._lock:
+            names = [table_name] if table_name else list(self._buffers)
+            versions = {}
+            for name in names:
+                version = self._flush_table(name)
+                if version is not None:
+                    versions[name] = version
+            return versions
+
+    def _flush_table(self, table_name: str) -> Optional[int]:
+        batches = self._buffers.pop(table_name, [])
+        self._buffered_rows.pop(table_name, None)
+        if not batches:
+            return None
+        options = self.options.get(table_name, WriteOptions())
+        target = self.table(table_name)
+        overwrite = options.mode == "overwrite" and table_name not in self._overwritten
+        # Overwrites and merges depend on the files they replace, so when
+        # another writer commits first they are planned again on its version
+        planned = overwrite or options.mode == "merge"
+        for _ in range(COMMIT_RETRIES):
+            snapshot = target.snapshot()
+            data, schema, removes, adds = self._plan(
+                table_name, target, snapshot, batches, options, overwrite
+            )
+            schema_changed = snapshot.schema is None or not schema.equals(
+                snapshot.schema
+            )
+            try:
+                version = target.commit(
+                    "overwrite" if overwrite else options.mode,
+                    adds,
+                    removes,
+                    schema=schema if schema_changed or overwrite else None,
+                    partition_by=options.partition_by or [],
+                    read_version=snapshot.version if planned else None,
+                )
+                break
+            except CommitConflictError:
+                if not planned:
+                    raise
+                for add in adds:
+                    os.remove(os.path.join(target.path, add["path"]))
+                log.debug("Table '%s' changed concurrently, retrying", table_name)
+        else:
+            raise CommitConflictError(
+                f"Could not commit to table '{table_name}' after "
+                f"{COMMIT_RETRIES} tries"
+            )
+        if overwrite:
+            self._overwritten.add(table_name)
+        log.info(
+            "Wrote %d rows to table '%s' in %d files (version %d)",
+            data.num_rows,
+            table_name,
+            len(adds),
+            version,
+        )
+        return version
+
+    def _plan(self, table_name, target, snapshot, batches, options, overwrite):
+        # The rows, schema and files to remove and add for one commit
+        pa = _pyarrow()
+        schema = self._evolve(
+            table_name,
+            None if overwrite else snapshot.schema,
+            [batch.schema for batch in batches],
+            options.schema_evolution,
+        )
+        data = pa.concat_tables([conform(batch, schema) for batch in batches])
+        removes, adds = [], []
+        if overwrite:
+            removes = list(snapshot.files)
+        elif options.mode == "merge":
+            data = self._dedupe(data, options.merge_keys)
+            removes, adds = self._rewrite_matching(target, snapshot, data, options)
+        adds += [
+            target.write_file(part, partition, self.compression)
+            for partition, part in self._partitions(data, options.partition_by or [])
+        ]
+        return data, schema, removes, adds
+
+    @staticmethod
+    def _evolve(table_name: str, current, schemas: list, evolution: bool):
+        pa = _pyarrow()
+        if current is not None:
+            schemas = [current, *schemas]
+        try:
+            merged = pa.unify_schemas(schemas, promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Incompatible schema for table '{table_name}': {e}")
+        if not evolution and current is not None and not merged.equals(current):
+            raise ValueError(
+                f"Schema of table '{table_name}' would change from {current} "
+                f"to {merged} and schema evolution is off"
+            )
+        return merged
+
+    @staticmethod
+    def _keys(table, merge_keys: List[str]):
+        pa = _pyarrow()
+        if len(merge_keys) == 1:
+            return table.column(merge_keys[0])
+        # Composite keys compare as one joined string
+        columns = [table.column(key).cast(pa.string()) for key in merge_keys]
+        return pa.compute.binary_join_element_wise(*columns, "\x1f")
+
+    def _dedupe(self, data, merge_keys: List[str]):
+        # The last record for a key wins
+        pa = _pyarrow()
+        keys = self._keys(data, merge_keys).to_pylist()
+        last = {key: i for i, key in enumerate(keys)}
+        if len(last) == data.num_rows:
+            return data
+        return data.take(pa.array(sorted(last.values())))
+
+    def _rewrite_matching(self, target: LocalTable, snapshot: Snapshot, data, options):
+        pa = _pyarrow()
+        keys = self._keys(data, options.merge_keys)
+        partition_by = options.partition_by or []
+        partitions = None
+        if partition_by and set(partition_by) <= set(options.merge_keys):
+            # A key can only match rows in its own partition
+            partitions = {
+                tuple(sorted(partition.items()))
+                for partition, _ in self._partitions(data, partition_by)
+            }
+        removes, adds = [], []
+        for path, add in snapshot.files.items():
+            if (
+                partitions is not None
+                and tuple(sorted(add["partitionValues"].items())) not in partitions
+            ):
+                continue
+            existing = _plain(
+                pa.parquet.read_table(os.path.join(target.path, path), memory_map=True)
+            )
+            matched = pa.compute.is_in(
+                self._keys(existing, options.merge_keys), value_set=keys.unique()
+            )
+            if not pa.compute.any(matched).as_py():
+                continue
+            removes.append(path)
+            kept = existing.filter(pa.compute.invert(matched))
+            if kept.num_rows:
+                adds.append(
+                    target.write_file(kept, add["partitionValues"], self.compression)
+                )
+        return removes, adds
+
+    @staticmethod
+    def _partitions(data, partition_by: List[str]):
+        if not partition_by:
+            yield {}, data
+            return
+        pa = _pyarrow()
+        values = [data.column(column).to_pylist() for column in partition_by]
+        groups: Dict[tuple, list] = {}
+        for i, key in enumerate(zip(*values)):
+            groups.setdefault(key, []).append(i)
+        for key, rows in groups.items():
+            partition = {
+                column: "" if value is None else str(value)
+                for column, value in zip(partition_by, key)
+            }
+            yield partition, data.take(pa.array(rows))
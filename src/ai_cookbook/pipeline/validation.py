@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional
+
+from .dag import CompiledDag, Edge
 
 
 @dataclass
@@ -8,6 +10,59 @@ class ValidationResult:
     errors: List[str] = field(default_factory=list)
 
 
+@dataclass
+class DagValidationResult(ValidationResult):
+    nodes: Dict[str, Any] = field(default_factory=dict)
+    edges: List[Edge] = field(default_factory=list)
+    dag: Optional[CompiledDag] = None
+
+
+def validate_dag(groups: Dict[str, Iterable[Any]]) -> DagValidationResult:
+    """
+    Build and validate a DAG in one pass over its nodes and edges.
+
+    `groups` maps a node kind ("data source", "processing step", ...) to its
+    nodes; every node has a `name` and optionally `inputs`. All duplicate
+    names, dangling inputs and cycle paths are collected instead of stopping
+    at the first error. Every step is linear in the size of the DAG.
+    """
+    nodes: Dict[str, Any] = {}
+    kinds: Dict[str, str] = {}
+    errors = []
+
+    for kind, members in groups.items():
+        for node in members:
+            if node.name in nodes:
+                errors.append(f"Duplicate {kind} name: {node.name}")
+            else:
+                nodes[node.name] = node
+                kinds[node.name] = kind
+
+    edges = []
+    for name, node in nodes.items():
+        for input_node in getattr(node, "inputs", None) or []:
+            source = nodes.get(input_node.name)
+            if source is None:
+                errors.append(
+                    f"Input {input_node.name} of {kinds[name]} {name} "
+                    "not found in the pipeline"
+                )
+            else:
+                edges.append(Edge(source=source, destination=node))
+
+    dag = CompiledDag(nodes, edges)
+    for cycle in dag.find_cycles():
+        errors.append(f"Cycle detected in the pipeline DAG: {' -> '.join(cycle)}")
+
+    return DagValidationResult(
+        is_valid=not errors,
+        errors=errors,
+        nodes=nodes,
+        edges=edges,
+        dag=None if errors else dag,
+    )
+
+
 def validate_pipeline_config(config):
     errors = []
     # Validate data sources
@@ -1,2 +1,337 @@
-def get_or_create_vector_index(source, destination):
-    return True
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+from ai_cookbook.logging.logger import log
+
+
+class TransientEmbeddingError(Exception):
+    """
+    Embedding request failure that is worth retrying (rate limit, 5xx, network)
+    """
+
+
+class EmbeddingClient:
+    """
+    Client for an OpenAI-compatible embeddings endpoint, which is also what
+    Databricks model serving exposes for embedding models
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        model: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: float = 60,
+    ):
+        self.endpoint_url = endpoint_url
+        self.model = model
+        self.timeout = timeout
+        import requests
+
+        # Reuse connections across the concurrent embedding requests
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        import requests
+
+        payload = {"input": texts}
+        if self.model:
+            payload["model"] = self.model
+        try:
+            response = self.session.post(
+                self.endpoint_url, json=payload, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            raise TransientEmbeddingError(str(e)) from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientEmbeddingError(
+                f"Embedding endpoint returned {response.status_code}"
+            )
+        response.raise_for_status()
+
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+
+class InMemoryVectorIndex:
+    """
+    Local stand-in for a Databricks direct access vector index
+    """
+
+    def __init__(self, primary_key: str = "id"):
+        self.primary_key = primary_key
+        self.rows: Dict[str, dict] = {}
+        self.upsert_calls = 0
+
+    def upsert(self, rows: List[dict]):
+        self.upsert_calls += 1
+        for row in rows:
+            self.rows[row[self.primary_key]] = row
+
+
+class DatabricksVectorIndex:
+    """
+    Upserts rows into a Databricks direct access vector index
+    """
+
+    def __init__(self, index_name: str, client=None):
+        self.index_name = index_name
+        self.client = client
+
+    def upsert(self, rows: List[dict]):
+        if self.client is None:
+            from databricks.sdk import WorkspaceClient
+
+            self.client = WorkspaceClient()
+        self.client.vector_search_indexes.upsert_data_vector_index(
+            self.index_name, json.dumps(rows)
+        )
+
+
+@dataclass
+class IndexWriteResult:
+    records: int = 0
+    embedded: int = 0
+    deduplicated: int = 0
+    upserted: int = 0
+    embedding_requests: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+
+
+def _chunk_id(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class VectorIndexWriter:
+    """
+    Embeds chunks and upserts them into a vector index in bulk.
+
+    Chunks are read in windows of `upsert_batch_size` records. Within a
+    window, identical texts are embedded once, the unique texts are grouped
+    into requests of at most `max_batch_size` texts and `max_batch_tokens`
+    tokens, and up to `max_concurrency` requests run at once with exponential
+    backoff on transient failures. The whole window is then upserted in a
+    single call. Chunks are plain strings or records with a "text" field;
+    records without an "id" are keyed on a hash of their text.
+
+    With an `embedding_cache`, texts embedded by an earlier run with the same
+    model are served from the cache instead of the embedding endpoint.
+
+    Chunks produced piecemeal (e.g. a streamed output) are added with
+    `append` and the write completed with `finish`, so windows, the request
+    pool and cache flushes span the whole stream rather than each piece.
+    """
+
+    def __init__(
+        self,
+        embedding_client,
+        index,
+        max_batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        upsert_batch_size: int = 1000,
+        tokenizer: str = "regex",
+        embedding_cache=None,
+    ):
+        self.embedding_client = embedding_client
+        self.index = index
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.upsert_batch_size = upsert_batch_size
+        self.tokenizer = tokenizer
+        self.embedding_cache = embedding_cache
+        self._lock = threading.Lock()
+        self._pending: list = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._result: Optional[IndexWriteResult] = None
+
+    @classmethod
+    def from_output(cls, output) -> "VectorIndexWriter":
+        """
+        Build a writer from an `Output`'s parameters. `endpoint_url` defaults
+        to the workspace serving endpoint named after `embedding_model`, and
+        `embedding_cache_dir` enables the on-disk embedding cache.
+        """
+        parameters = dict(output.parameters or {})
+        endpoint_url = parameters.pop("endpoint_url", None)
+        token = parameters.pop("token", None)
+        cache_dir = parameters.pop("embedding_cache_dir", None)
+        cache_max_entries = parameters.pop(
+            "embedding_cache_max_entries", 1_000_000
+        )
+        if cache_dir is not None:
+            from ai_cookbook.pipeline.embedding_cache import EmbeddingCache
+
+            parameters["embedding_cache"] = EmbeddingCache(
+                cache_dir, output.embedding_model, max_entries=cache_max_entries
+            )
+        client = None
+        if endpoint_url is None:
+            from databricks.sdk import WorkspaceClient
+
+            client = WorkspaceClient()
+            endpoint_url = (
+                f"{client.config.host}/serving-endpoints/"
+                f"{output.embedding_model}/invocations"
+            )
+            token = token or client.config.token
+        return cls(
+            EmbeddingClient(endpoint_url, model=output.embedding_model, token=token),
+            DatabricksVectorIndex(output.output_table, client),
+            **parameters,
+        )
+
+    def write(self, chunks: Iterable) -> IndexWriteResult:
+        self.append(chunks)
+        return self.finish()
+
+    def append(self, chunks: Iterable):
+        """
+        Add chunks to the write in progress. Each window is embedded and
+        upserted once it is full, the last one by `finish`.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            self._result = IndexWriteResult()
+        iterator = iter(chunks)
+        while True:
+            free = self.upsert_batch_size - len(self._pending)
+            self._pending.extend(islice(iterator, free))
+            if len(self._pending) < self.upsert_batch_size:
+                return
+            window, self._pending = self._pending, []
+            self._write_window(window, self._executor, self._result)
+
+    def finish(self) -> IndexWriteResult:
+        """
+        Write the last window and return the totals of the write
+        """
+        result = self._result or IndexWriteResult()
+        try:
+            if self._pending:
+                self._write_window(self._pending, self._executor, result)
+        finally:
+            self.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+
+        log.info(
+            f"Upserted {result.upserted} chunks "
+            f"({result.deduplicated} duplicates, {result.cache_hits} cached, "
+            f"{result.embedding_requests} requests)"
+        )
+        return result
+
+    def close(self):
+        """
+        End the write in progress, dropping chunks that were not written yet
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._pending, self._executor, self._result = [], None, None
+
+    def _write_window(self, window: list, executor, result: IndexWriteResult):
+        records = [
+            {"text": chunk} if isinstance(chunk, str) else dict(chunk)
+            for chunk in window
+        ]
+        unique_texts = list(dict.fromkeys(record["text"] for record in records))
+        result.records += len(records)
+        result.deduplicated += len(records) - len(unique_texts)
+
+        vectors = {}
+        if self.embedding_cache is not None:
+            for text, vector in self.embedding_cache.get_many(unique_texts).items():
+                vectors[text] = vector.tolist()
+            unique_texts = [text for text in unique_texts if text not in vectors]
+            result.cache_hits += len(vectors)
+
+        batches = list(self._batches(unique_texts))
+        for batch, embeddings in zip(
+            batches, executor.map(lambda batch: self._embed(batch, result), batches)
+        ):
+            vectors.update(zip(batch, embeddings))
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(batch, embeddings)
+        result.embedded += len(unique_texts)
+        result.embedding_requests += len(batches)
+
+        rows = []
+        for record in records:
+            record.setdefault("id", _chunk_id(record["text"]))
+            record["embedding"] = vectors[record["text"]]
+            rows.append(record)
+        self.index.upsert(rows)
+        result.upserted += len(rows)
+
+    def _batches(self, texts: List[str]):
+        from ai_cookbook.functions.chunking import get_tokenizer
+
+        tokenizer = get_tokenizer(self.tokenizer)
+        batch, batch_tokens = [], 0
+        for text in texts:
+            tokens = len(tokenizer.token_offsets(text))
+            if batch and (
+                len(batch) >= self.max_batch_size
+                or batch_tokens + tokens > self.max_batch_tokens
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _embed(self, texts: List[str], result: IndexWriteResult):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embedding_client.embed(texts)
+            except TransientEmbeddingError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2**attempt * (1 + random.random())
+                log.warning(f"Embedding request failed ({e}), retrying in {delay:.2f}s")
+                with self._lock:
+                    result.retries += 1
+                time.sleep(delay)
+
+
+def _chunk_records(chunks) -> Iterable:
+    # Arrow tables are read a record batch at a time rather than all at once
+    if hasattr(chunks, "to_batches"):
+        return (
+            record for batch in chunks.to_batches() for record in batch.to_pylist()
+        )
+    return chunks
+
+
+def get_or_create_vector_index(
+    source, destination, chunks=None, writer=None, store=None
+):
+    """
+    Write `chunks` from `source` into the `destination` vector index. Without
+    chunks, the output of the `source` step is read from the intermediate
+    `store`; when there is none there is nothing to do.
+    """
+    if chunks is None and store is not None and store.has(source):
+        chunks = store.get(source)
+    if chunks is None:
+        return True
+    writer = writer or VectorIndexWriter.from_output(destination)
+    return writer.write(_chunk_records(chunks))
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def file_hash(path: str, algorithm: str = "sha256", block_size: int = 1 << 20) -> str:
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_files(
+    root: str,
+    suffix: Optional[str] = None,
+    max_workers: int = 8,
+    exclude: Iterable[str] = (),
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Map the path (relative to `root`) of every file below `root` to its
+    (size, mtime_ns). Directories are scanned concurrently, which matters
+    on network and FUSE mounts where each listing is a round trip.
+    """
+    suffix = suffix.lower() if suffix else None
+    exclude = {os.path.abspath(path) for path in exclude}
+
+    def scan(directory: str):
+        files, subdirectories = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file() and (
+                    suffix is None or entry.name.lower().endswith(suffix)
+                ):
+                    if os.path.abspath(entry.path) in exclude:
+                        continue
+                    stat = entry.stat()
+                    files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return files, subdirectories
+
+    listing = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(scan, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                for path, size, mtime_ns in files:
+                    listing[os.path.relpath(path, root)] = (size, mtime_ns)
+                pending.update(executor.submit(scan, d) for d in subdirectories)
+    return listing
+
+
+@dataclass
+class FileEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    hash: Optional[str] = None
+    deleted_at: Optional[float] = None
+
+
+@dataclass
+class ManifestDiff:
+    added: List[FileEntry] = field(default_factory=list)
+    changed: List[FileEntry] = field(default_factory=list)
+    deleted: List[FileEntry] = field(default_factory=list)
+    # Files whose mtime moved but whose content hash did not
+    touched: List[FileEntry] = field(default_factory=list)
+    unchanged: int = 0
+
+
+class VolumeManifest:
+    """
+    SQLite manifest of the files of a volume: relative path, size, mtime and
+    content hash, with deleted files kept as tombstones. Only the rows of
+    files that changed are written, so a large volume that grows a little
+    each day costs a listing and a handful of inserts per run. Without a path
+    the manifest only lives in memory.
+
+    Also used by `extract_text_from_pdf` to skip PDFs parsed by earlier runs.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        hash TEXT,
+        deleted_at REAL
+    );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(self.SCHEMA)
+
+    def entries(self) -> Dict[str, FileEntry]:
+        rows = self._connection.execute(
+            "SELECT path, size, mtime_ns, hash, deleted_at FROM files"
+        )
+        return {row[0]: FileEntry(*row) for row in rows}
+
+    def tombstones(self) -> List[FileEntry]:
+        rows = self._connection.execute(
+            "SELECT path, size, mtime_ns, hash, deleted_at FROM files "
+            "WHERE deleted_at IS NOT NULL ORDER BY path"
+        )
+        return [FileEntry(*row) for row in rows]
+
+    def diff(
+        self,
+        root: str,
+        listing: Dict[str, Tuple[int, int]],
+        max_workers: int = 8,
+        hash_files: bool = True,
+    ) -> ManifestDiff:
+        """
+        Compare a `list_files` listing of `root` with the manifest. Files whose
+        size and mtime match are unchanged without being read; the others are
+        hashed concurrently to tell real changes from touched files. Without
+        `hash_files` they are not read at all and count as changed.
+        """
+        known = self.entries()
+        diff = ManifestDiff()
+        candidates = []
+        for path, (size, mtime_ns) in listing.items():
+            entry = known.get(path)
+            if (
+                entry is not None
+                and entry.deleted_at is None
+                and (entry.size, entry.mtime_ns) == (size, mtime_ns)
+            ):
+                diff.unchanged += 1
+            else:
+                candidates.append(FileEntry(path, size, mtime_ns))
+
+        if hash_files:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                hashes = executor.map(
+                    lambda entry: file_hash(os.path.join(root, entry.path)),
+                    candidates,
+                )
+                for entry, content_hash in zip(candidates, hashes):
+                    entry.hash = content_hash
+        for entry in candidates:
+            previous = known.get(entry.path)
+            if previous is None or previous.deleted_at is not None:
+                diff.added.append(entry)
+            elif entry.hash is None or previous.hash != entry.hash:
+                diff.changed.append(entry)
+            else:
+                diff.touched.append(entry)
+                diff.unchanged += 1
+
+        now = time.time()
+        for path, entry in known.items():
+            if entry.deleted_at is None and path not in listing:
+                entry.deleted_at = now
+                diff.deleted.append(entry)
+        return diff
+
+    def apply(self, diff: ManifestDiff):
+        """
+        Record a diff once its files have been processed
+        """
+        upserts = [
+            (entry.path, entry.size, entry.mtime_ns, entry.hash)
+            for entry in chain(diff.added, diff.changed, diff.touched)
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash, deleted_at) "
+                "VALUES (?, ?, ?, ?, NULL)",
+                upserts,
+            )
+            self._connection.executemany(
+                "UPDATE files SET deleted_at = ? WHERE path = ?",
+                [(entry.deleted_at, entry.path) for entry in diff.deleted],
+            )
+
+    def close(self):
+        self._connection.close()
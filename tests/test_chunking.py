@@ -0,0 +1,155 @@
+import random
+
+import numpy as np
+import pytest
+
+from ai_cookbook.functions.chunking import (
+    chunk_offsets,
+    chunk_records,
+    chunk_text,
+    chunk_texts,
+    chunk_tokens,
+    get_tokenizer,
+)
+
+
+def reference_chunks(text, chunk_size, overlap):
+    """Character-scanning chunker the offset engine must agree with"""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            while end > start and text[end] != " ":
+                end -= 1
+            if end == start:
+                end = start + chunk_size
+        else:
+            end = len(text)
+        chunks.append(text[start:end])
+        if end == len(text):
+            break
+        next_start = max(end - overlap, 0)
+        start = next_start if next_start > start else end
+    return chunks
+
+
+def random_text(rng, length):
+    words = ["alpha", "beta", "γάμμα", "delta", "x" * 40, "épsilon", "z"]
+    text = " ".join(rng.choice(words) for _ in range(length))
+    return text[: rng.randint(0, len(text))]
+
+
+def test_chunk_text_short_text():
+    assert chunk_text("short text", chunk_size=100) == ["short text"]
+    assert chunk_text("", chunk_size=100) == [""]
+
+
+def test_chunk_text_matches_reference():
+    rng = random.Random(0)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(0, 400))
+        chunk_size = rng.randint(20, 300)
+        overlap = rng.randint(0, chunk_size - 1)
+        assert chunk_text(text, chunk_size, overlap) == reference_chunks(
+            text, chunk_size, overlap
+        )
+
+
+def test_chunk_text_breaks_on_spaces_without_them():
+    chunks = chunk_text("a" * 2500, chunk_size=1000, overlap=100)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 700]
+
+
+def test_chunk_offsets_are_lazy():
+    text = "lorem ipsum " * 500
+    chunks = chunk_offsets(text, chunk_size=100, overlap=10)
+
+    assert chunks.offsets.dtype == np.int64
+    assert chunks.offsets.shape == (len(chunks), 2)
+    start, end = chunks.offsets[3]
+    assert chunks[3] == text[start:end]
+    assert list(chunks[1:3]) == chunk_text(text, 100, 10)[1:3]
+
+
+def test_chunk_texts_matches_per_document_chunking():
+    rng = random.Random(1)
+    texts = [random_text(rng, rng.randint(0, 300)) for _ in range(50)]
+
+    batch = chunk_texts(texts, chunk_size=120, overlap=15)
+
+    expected = [chunk for text in texts for chunk in chunk_text(text, 120, 15)]
+    assert list(batch) == expected
+    assert [batch[i] for i in range(len(batch))] == expected
+    for doc_id, text in enumerate(texts):
+        assert list(batch.document(doc_id)) == chunk_text(text, 120, 15)
+
+
+def test_chunk_texts_empty_batch():
+    batch = chunk_texts([])
+    assert len(batch) == 0
+    assert batch.offsets.shape == (0, 2)
+
+
+def test_chunk_records_keeps_page_provenance():
+    pages = iter(
+        [
+            {"path": "/docs/a.pdf", "page": 1, "text": "lorem ipsum " * 50},
+            {"path": "/docs/a.pdf", "page": 2, "text": "  "},
+            {"path": "/docs/b.pdf", "page": 1, "text": "short"},
+        ]
+    )
+
+    chunks = list(chunk_records(pages, chunk_size=100, overlap=10))
+
+    first_page = chunk_text("lorem ipsum " * 50, 100, 10)
+    assert [c["text"] for c in chunks] == first_page + ["short"]
+    assert [c["chunk_index"] for c in chunks] == list(range(len(first_page))) + [0]
+    assert chunks[-1] == {
+        "path": "/docs/b.pdf",
+        "page": 1,
+        "chunk_index": 0,
+        "text": "short",
+    }
+
+
+def test_chunk_tokens_respects_token_budget():
+    text = "The quick brown fox, jumping over the lazy dog. " * 40
+    tokenizer = get_tokenizer("regex")
+
+    chunks = chunk_tokens(text, max_tokens=32, overlap_tokens=4)
+
+    token_counts = [len(tokenizer.token_offsets(chunk)) for chunk in chunks]
+    assert all(count <= 32 for count in token_counts)
+    # Every chunk but the last is packed up to the budget
+    assert token_counts[:-1] == [32] * (len(chunks) - 1)
+    assert chunks[0].startswith("The quick")
+    assert chunks[-1].endswith("dog.")
+
+
+def test_chunk_tokens_overlaps_windows():
+    text = " ".join(f"w{i}" for i in range(10))
+
+    chunks = chunk_tokens(text, max_tokens=4, overlap_tokens=1)
+
+    assert list(chunks) == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+
+
+def test_chunk_tokens_custom_tokenizer():
+    class CharTokenizer:
+        def token_offsets(self, text):
+            return np.array([(i, i + 1) for i in range(len(text))]).reshape(-1, 2)
+
+    chunks = chunk_tokens(
+        "abcdef", max_tokens=4, overlap_tokens=0, tokenizer=CharTokenizer()
+    )
+    assert list(chunks) == ["abcd", "ef"]
+    assert list(chunk_tokens("", tokenizer=CharTokenizer())) == [""]
+
+
+def test_get_tokenizer_is_cached():
+    assert get_tokenizer("regex") is get_tokenizer("regex")
+    with pytest.raises(ValueError):
+        get_tokenizer("unknown")
@@ -0,0 +1,152 @@
+import pytest
+from pydantic import ValidationError
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.delta_reader import DeltaSourceReader, filter_expression
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.table_writer import TableWriter
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.configure("chunks", partition_by=["source_file"])
+    for doc in ("a", "b", "c"):
+        writer.write(
+            "chunks",
+            [
+                {"source_file": f"{doc}.pdf", "chunk_id": i, "text": f"{doc} {i}"}
+                for i in range(100)
+            ],
+        )
+    writer.flush()
+    # A later commit adds a column
+    writer.write("chunks", [{"source_file": "d.pdf", "chunk_id": 0, "lang": "en"}])
+    writer.flush()
+    return str(tmp_path / "chunks")
+
+
+def _source(path, **fields):
+    return DataSource(
+        name="chunks",
+        catalog="c",
+        schema="s",
+        type="delta",
+        path=path,
+        format="delta",
+        table="chunks",
+        table_schema="s",
+        **fields,
+    )
+
+
+def test_reads_projected_columns(table_path):
+    reader = DeltaSourceReader(table_path, columns=["chunk_id", "lang"])
+    table = pa.Table.from_batches(list(reader.iter_batches()))
+
+    assert table.column_names == ["chunk_id", "lang"]
+    assert table.num_rows == 301
+    assert table.column("lang").null_count == 300
+
+
+def test_filters_prune_partitions_and_rows(table_path):
+    reader = DeltaSourceReader(
+        table_path,
+        filters=[["source_file", "in", ["a.pdf", "c.pdf"]], ["chunk_id", ">=", 98]],
+    )
+
+    assert len(reader.dataset().files) == 2
+    records = list(reader.iter_records())
+    assert sorted((r["source_file"], r["chunk_id"]) for r in records) == [
+        ("a.pdf", 98),
+        ("a.pdf", 99),
+        ("c.pdf", 98),
+        ("c.pdf", 99),
+    ]
+
+
+def test_streams_batches(table_path):
+    reader = DeltaSourceReader(table_path, batch_size=10)
+    batches = reader.iter_batches()
+
+    first = next(batches)
+    assert first.num_rows <= 10
+    assert first.num_rows + sum(batch.num_rows for batch in batches) == 301
+
+
+def test_reads_plain_parquet_directory(tmp_path):
+    for lang in ("en", "fr"):
+        directory = tmp_path / f"lang={lang}"
+        directory.mkdir()
+        pq.write_table(pa.table({"id": [1, 2, 3]}), directory / "part-0.parquet")
+
+    reader = DeltaSourceReader(str(tmp_path), filters=[["lang", "=", "fr"]])
+
+    assert [r["id"] for r in reader.iter_records()] == [1, 2, 3]
+    assert filter_expression(None) is None
+
+
+def test_filters_are_validated():
+    with pytest.raises(ValidationError):
+        _source("/tmp", filters=[["chunk_id", "~", 1]])
+    with pytest.raises(ValidationError):
+        _source("/tmp", filters=[["chunk_id", "in", 1]])
+
+
+def test_pipeline_passes_rows_to_steps(table_path):
+    received = []
+
+    def embed(records):
+        received.extend(records)
+        return len(received)
+
+    source = _source(
+        table_path, columns=["source_file", "text"], filters=[["chunk_id", "<", 2]]
+    )
+    step = ProcessingStep(
+        name="embed", function=embed, inputs=[source], output_table="embedded"
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[output])
+    pipeline.edges[-1].function = lambda: True
+
+    pipeline.run(progress="none")
+
+    assert sorted(r["text"] for r in received if r["text"]) == [
+        "a 0",
+        "a 1",
+        "b 0",
+        "b 1",
+        "c 0",
+        "c 1",
+    ]
+    assert set(received[0]) == {"source_file", "text"}
+    assert list(pipeline.read_data_source(source)) == received
+
+
+def test_reader_options_apply_to_delta_reader(table_path, monkeypatch):
+    source = _source(
+        table_path, columns=["chunk_id"], reader_options={"batch_size": 1}
+    )
+    step = ProcessingStep(
+        name="count", function=list, inputs=[source], output_table="counted"
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[])
+    monkeypatch.setattr(Pipeline, "write_output", lambda self, table, batch: None)
+
+    run = pipeline.run_streaming(batch_size=50)
+    assert run.record_counts["count"] == 301
+
+    pipeline.execute_step(step, pipeline.metadata_manager.start_run())
+    assert len(pipeline.data_store["count"]) == 301
@@ -0,0 +1,40 @@
+import numpy as np
+
+from ai_cookbook.pipeline.embedding_cache import EmbeddingCache
+
+
+def test_embedding_cache_round_trip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "databricks-bge-large-en")
+    cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    hits = cache.get_many(["a", "b", "c"])
+
+    assert set(hits) == {"a", "b"}
+    np.testing.assert_array_equal(hits["b"], [3.0, 4.0])
+    assert hits["a"].dtype == np.float32
+
+
+def test_embedding_cache_persists_between_instances(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model")
+    cache.put_many([f"text {i}" for i in range(2000)], np.ones((2000, 8)))
+    cache.flush()
+
+    reopened = EmbeddingCache(str(tmp_path), "model")
+
+    assert len(reopened) == 2000
+    assert reopened.capacity >= 2000
+    assert set(reopened.get_many(["text 0", "text 1999"])) == {"text 0", "text 1999"}
+    # A different model never shares vectors
+    assert EmbeddingCache(str(tmp_path), "other-model").get_many(["text 0"]) == {}
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "model", max_entries=10)
+    cache.put_many([f"t{i}" for i in range(10)], np.zeros((10, 2)))
+    # Touch t0 so that t1 is now the least recently used entry
+    cache.get_many(["t0"])
+
+    cache.put_many(["new"], [[1.0, 1.0]])
+
+    assert len(cache) == 10
+    assert set(cache.get_many(["t0", "t1", "new"])) == {"t0", "new"}
@@ -0,0 +1,218 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.events import EventBus, EventMetrics
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+
+
+def _noop(*args, **kwargs):
+    return [1, 2, 3]
+
+
+def _pipeline():
+    source = DataSource(
+        name="source1",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path="/path/to/data",
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="step1",
+        function="ai_cookbook.functions.chunking.chunk_text",
+        inputs=[source],
+        output_table="output_table1",
+    )
+    output = Output(
+        name="output1",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[output])
+    for edge in pipeline.edges:
+        edge.function = _noop
+    return pipeline
+
+
+@pytest.mark.parametrize("scheduler", ["serial", "thread"])
+def test_run_publishes_lifecycle_events(scheduler):
+    pipeline = _pipeline()
+    events = []
+    pipeline.events.subscribe(events.append)
+
+    run = pipeline.run(scheduler=scheduler, progress="none", use_cache=False)
+    pipeline.events.flush()
+
+    assert events[0].type == "run_started"
+    assert events[-1].type == "run_finished"
+    assert events[-1].status == "completed"
+    assert {event.run_id for event in events} == {run.run_id}
+    for edge in ("source1->step1", "step1->output1"):
+        types = [event.type for event in events if event.edge == edge]
+        assert types == ["edge_queued", "edge_started", "edge_completed"]
+    completed = [event for event in events if event.type == "edge_completed"]
+    assert all(event.records == 3 for event in completed)
+
+
+def test_run_publishes_cached_and_failed_edges():
+    pipeline = _pipeline()
+    pipeline.run(progress="none")
+    events = []
+    pipeline.events.subscribe(events.append, event_types=["edge_cached"])
+
+    pipeline.run(progress="none")
+    pipeline.events.flush()
+    assert {event.edge for event in events} == {"source1->step1", "step1->output1"}
+
+    def fail():
+        raise RuntimeError("boom")
+
+    pipeline.edges[-1].function = fail
+    failures = []
+    pipeline.events.subscribe(failures.append, event_types=["edge_failed"])
+    with pytest.raises(RuntimeError):
+        pipeline.run(progress="none", use_cache=False)
+    pipeline.events.flush()
+    (failure,) = failures
+    assert failure.edge == "step1->output1"
+    assert "boom" in failure.error
+
+
+@pytest.mark.parametrize("scheduler", ["serial", "thread", "async"])
+def test_failed_edges_are_reported_started(scheduler):
+    pipeline = _pipeline()
+    called = []
+
+    def fail():
+        called.append(time.time())
+        raise RuntimeError("boom")
+
+    pipeline.edges[-1].function = fail
+    events = []
+    pipeline.events.subscribe(events.append)
+    with pytest.raises(RuntimeError):
+        if scheduler == "async":
+            asyncio.run(pipeline.arun(progress="none", use_cache=False))
+        else:
+            pipeline.run(scheduler=scheduler, progress="none", use_cache=False)
+    pipeline.events.flush()
+
+    edge_events = [event for event in events if event.edge == "step1->output1"]
+    assert [event.type for event in edge_events] == [
+        "edge_queued",
+        "edge_started",
+        "edge_failed",
+    ]
+    # Published as the edge is called, not backdated after it returns
+    assert edge_events[1].timestamp <= called[0]
+
+
+def test_batch_run_publishes_record_and_byte_counts(tmp_path):
+    from ai_cookbook.pipeline.table_writer import TableWriter
+
+    pipeline = _pipeline()
+    pipeline.table_writer = TableWriter(str(tmp_path))
+    pipeline.edges[0].function = lambda: [{"chunk": i} for i in range(3)]
+    metrics = EventMetrics()
+    pipeline.events.subscribe(metrics)
+
+    pipeline.run(progress="none", use_cache=False)
+    pipeline.events.flush()
+
+    assert metrics.records["step1"] == 3
+    assert metrics.bytes_written["step1"] > 0
+
+    # Generator outputs are counted as they are consumed
+    pipeline.edges[0].function = lambda: ({"chunk": i} for i in range(5))
+    pipeline.run(progress="none", use_cache=False)
+    pipeline.events.flush()
+
+    assert metrics.records["step1"] == 8
+    assert pipeline.table_writer.table("output_table1").read().num_rows == 8
+
+
+def test_slow_subscriber_does_not_stall_publisher():
+    """
+    A blocked subscriber's queue overflows and drops events, but publishing
+    returns immediately
+    """
+    bus = EventBus()
+    release = threading.Event()
+    subscription = bus.subscribe(lambda event: release.wait(), max_queue_size=10)
+
+    def publish():
+        for _ in range(1_000):
+            bus.publish("records_emitted", "run", node="step1", records=1)
+
+    # The subscriber stays blocked until every event is published, so a
+    # publisher waiting on it would never finish
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    publisher.join(timeout=10)
+    assert not publisher.is_alive()
+    assert subscription.dropped > 0
+    release.set()
+    assert bus.flush(timeout=5)
+    bus.close()
+
+
+def test_async_subscriber():
+    bus = EventBus()
+    received = []
+
+    async def subscriber(event):
+        await asyncio.sleep(0)
+        received.append(event.type)
+
+    bus.subscribe(subscriber)
+    bus.publish("run_started", "run")
+    bus.publish("run_finished", "run", status="completed")
+
+    assert bus.flush(timeout=5)
+    assert received == ["run_started", "run_finished"]
+    bus.close()
+
+
+def test_failing_subscriber_keeps_receiving():
+    bus = EventBus()
+    received = []
+
+    def subscriber(event):
+        received.append(event)
+        raise ValueError("bad subscriber")
+
+    subscription = bus.subscribe(subscriber)
+    bus.publish("run_started", "run")
+    bus.publish("run_finished", "run")
+
+    assert bus.flush(timeout=5)
+    assert len(received) == 2
+    assert subscription.failed == 2
+    bus.close()
+
+
+def test_subscribe_rejects_unknown_event_types():
+    with pytest.raises(ValueError):
+        EventBus().subscribe(print, event_types=["edge_exploded"])
+
+
+def test_event_metrics():
+    pipeline = _pipeline()
+    metrics = EventMetrics()
+    pipeline.events.subscribe(metrics)
+
+    pipeline.run(progress="none", use_cache=False)
+    pipeline.events.flush()
+
+    assert metrics.events["edge_completed"] == 2
+    assert set(metrics.edge_seconds) == {"source1->step1", "step1->output1"}
+    assert all(seconds >= 0 for seconds in metrics.edge_seconds.values())
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative `python -X importtime` budget for `import ai_cookbook.pipeline`
+IMPORT_BUDGET_MS = float(os.environ.get("AI_COOKBOOK_IMPORT_BUDGET_MS", 500))
+
+HEAVY_MODULES = [
+    "databricks.sdk",
+    "pkg_resources",
+    "rich",
+    "requests",
+    "numpy",
+    "logging.config",
+    "yaml",
+]
+
+
+def _import_time_ms(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+def test_import_does_not_load_heavy_dependencies():
+    """Test that heavy dependencies are only imported on first use"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, ai_cookbook.pipeline; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.skipif(IMPORT_BUDGET_MS <= 0, reason="import time budget disabled")
+def test_import_time_budget():
+    """Test that importing the pipeline package stays within its budget"""
+    best = min(_import_time_ms("ai_cookbook.pipeline") for _ in range(3))
+    assert best < IMPORT_BUDGET_MS, (
+        f"import ai_cookbook.pipeline took {best:.0f}ms, "
+        f"budget is {IMPORT_BUDGET_MS:.0f}ms"
+    )
+
+
+def test_logging_configured_on_first_record():
+    """Test that logging.conf is still applied once the package logs"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import logging, sys; from ai_cookbook.logging.logger import log; "
+            "log.debug('first record'); "
+            "print(type(logging.getLogger().handlers[0]).__name__, "
+            "logging.getLogger().level)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split()[-2:] == ["RichHandler", str(10)]
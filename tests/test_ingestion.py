@@ -0,0 +1,195 @@
+import os
+
+import pytest
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.ingestion import VolumeIngestion, ingest_volume
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.readers import SourceFile
+from ai_cookbook.utils.file_manifest import VolumeManifest, list_files
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def volume(tmp_path):
+    root = tmp_path / "volume"
+    for i in range(3):
+        _write(root / f"dir{i}" / f"doc{i}.pdf", f"doc {i}")
+    _write(root / "dir0" / "nested" / "deep.pdf", "deep")
+    _write(root / "notes.txt", "not a pdf")
+    return root
+
+
+def _source(root, manifest_path=None):
+    return DataSource(
+        name="docs",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path=str(root),
+        format="pdf",
+        manifest_path=manifest_path,
+    )
+
+
+def _step(function):
+    return ProcessingStep(
+        name="parse", function=function, inputs=[], output_table="parsed"
+    )
+
+
+def test_list_files_walks_directories_concurrently(volume):
+    listing = list_files(str(volume), suffix=".pdf", max_workers=4)
+
+    assert set(listing) == {
+        os.path.join("dir0", "doc0.pdf"),
+        os.path.join("dir1", "doc1.pdf"),
+        os.path.join("dir2", "doc2.pdf"),
+        os.path.join("dir0", "nested", "deep.pdf"),
+    }
+    size, mtime_ns = listing[os.path.join("dir0", "nested", "deep.pdf")]
+    assert size == 4 and mtime_ns > 0
+
+
+def test_manifest_diff_detects_changes(volume):
+    manifest = VolumeManifest()
+    diff = manifest.diff(str(volume), list_files(str(volume), suffix=".pdf"))
+    assert len(diff.added) == 4
+    manifest.apply(diff)
+
+    # Same content with a new mtime, new content, a deletion and a new file
+    os.utime(volume / "dir0" / "doc0.pdf", ns=(1, 1))
+    _write(volume / "dir1" / "doc1.pdf", "doc 1, edited")
+    (volume / "dir2" / "doc2.pdf").unlink()
+    _write(volume / "dir3" / "doc3.pdf", "doc 3")
+
+    diff = manifest.diff(str(volume), list_files(str(volume), suffix=".pdf"))
+    assert [e.path for e in diff.added] == [os.path.join("dir3", "doc3.pdf")]
+    assert [e.path for e in diff.changed] == [os.path.join("dir1", "doc1.pdf")]
+    assert [e.path for e in diff.touched] == [os.path.join("dir0", "doc0.pdf")]
+    assert [e.path for e in diff.deleted] == [os.path.join("dir2", "doc2.pdf")]
+    assert diff.unchanged == 2
+    manifest.apply(diff)
+
+    (tombstone,) = manifest.tombstones()
+    assert tombstone.path == os.path.join("dir2", "doc2.pdf")
+    assert tombstone.deleted_at is not None
+
+    # A file coming back after deletion is new again
+    _write(volume / "dir2" / "doc2.pdf", "doc 2")
+    diff = manifest.diff(str(volume), list_files(str(volume), suffix=".pdf"))
+    assert [e.path for e in diff.added] == [os.path.join("dir2", "doc2.pdf")]
+    manifest.apply(diff)
+    assert manifest.tombstones() == []
+
+
+def test_ingest_volume_passes_only_new_files(volume, tmp_path):
+    manifest_path = str(tmp_path / "state" / "manifest.sqlite")
+    calls = []
+
+    def parse(files):
+        calls.append(sorted(f["relative_path"] for f in files))
+        return len(files)
+
+    source, step = _source(volume, manifest_path), _step(parse)
+
+    first = ingest_volume(source, step)
+    assert isinstance(first, VolumeIngestion)
+    assert first.records == 4 and first.output == 4
+    # Files are handed over as handles on the source's reader
+    record = next(f for f in first.files if f["relative_path"].endswith("deep.pdf"))
+    assert isinstance(record["file"], SourceFile)
+    assert record["file"].read() == b"deep"
+
+    # Nothing changed: the step is not called at all
+    second = ingest_volume(source, step)
+    assert second.records == 0 and second.unchanged == 4
+    assert len(calls) == 1
+
+    _write(volume / "dir4" / "doc4.pdf", "doc 4")
+    (volume / "dir1" / "doc1.pdf").unlink()
+    third = ingest_volume(source, step)
+    assert calls[-1] == [os.path.join("dir4", "doc4.pdf")]
+    assert [t["relative_path"] for t in third.tombstones] == [
+        os.path.join("dir1", "doc1.pdf")
+    ]
+    assert third.tombstones[0]["change"] == "deleted"
+
+
+def test_ingest_volume_without_manifest_does_not_hash(volume, monkeypatch):
+    def file_hash(path):
+        raise AssertionError(f"hashed {path}")
+
+    monkeypatch.setattr("ai_cookbook.utils.file_manifest.file_hash", file_hash)
+    ingestion = ingest_volume(_source(volume), _step(len))
+
+    assert ingestion.output == 4
+    assert all(f["hash"] is None for f in ingestion.files)
+
+
+def test_ingest_volume_keeps_manifest_on_failure(volume, tmp_path):
+    manifest_path = str(tmp_path / "manifest.sqlite")
+
+    def fail(files):
+        raise RuntimeError("parser crashed")
+
+    with pytest.raises(RuntimeError):
+        ingest_volume(_source(volume, manifest_path), _step(fail))
+
+    retried = ingest_volume(_source(volume, manifest_path), _step(lambda files: None))
+    assert retried.records == 4
+
+
+def test_ingest_volume_commits_generators_once_consumed(volume, tmp_path):
+    manifest_path = str(tmp_path / "manifest.sqlite")
+
+    def parse(files):
+        for record in files:
+            yield record["path"]
+
+    source = _source(volume, manifest_path)
+    abandoned = ingest_volume(source, _step(parse))
+    # Never consumed, so the same files are pending on the next run
+    consumed = ingest_volume(source, _step(parse))
+    assert consumed.records == abandoned.records == 4
+    assert len(list(consumed.output)) == 4
+
+    assert ingest_volume(source, _step(parse)).records == 0
+
+
+def test_pipeline_run_ingests_incrementally(volume, tmp_path):
+    seen = []
+
+    def parse(files):
+        seen.append(len(files))
+        return [f["path"] for f in files]
+
+    source = _source(volume, str(tmp_path / "manifest.sqlite"))
+    step = ProcessingStep(
+        name="parse", function=parse, inputs=[source], output_table="parsed"
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[output])
+    for edge in pipeline.edges:
+        if edge.destination is output:
+            edge.function = lambda: True
+
+    pipeline.run(progress="none")
+    _write(volume / "dir5" / "doc5.pdf", "doc 5")
+    run = pipeline.run(progress="none")
+
+    # The source edge is never served from the step cache
+    assert seen == [4, 1]
+    assert run.cache_report["parse"] == "miss"
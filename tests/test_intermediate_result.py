@@ -0,0 +1,208 @@
+import os
+import pickle
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.intermediate_result import (
+    IntermediateResultStore,
+    to_arrow,
+    write_intermediate_result,
+)
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+
+
+def _records(n=1000):
+    return [
+        {"path": f"/docs/doc{i % 10}.pdf", "chunk_id": i, "text": f"chunk {i}"}
+        for i in range(n)
+    ]
+
+
+def _step(name="chunk", function=len, output_table="chunks"):
+    return ProcessingStep(
+        name=name, function=function, inputs=[], output_table=output_table
+    )
+
+
+def test_to_arrow_converts_records_and_encodes_repeated_strings():
+    table = to_arrow(_records())
+
+    assert table.num_rows == 1000
+    assert pa.types.is_dictionary(table.schema.field("path").type)
+    # Mostly distinct values are left as plain strings
+    assert pa.types.is_string(table.schema.field("text").type)
+    assert table.column("path")[3].as_py() == "/docs/doc3.pdf"
+
+    batch = pa.record_batch({"x": [1, 2]})
+    assert to_arrow(batch).num_rows == 2
+    assert to_arrow([batch, batch]).num_rows == 4
+
+
+@pytest.mark.parametrize(
+    "result",
+    [None, True, "text", [1, 2, 3], [], iter([{"a": 1}]), [{"a": 1}, {"a": "b"}]],
+)
+def test_to_arrow_leaves_other_outputs_alone(result):
+    assert to_arrow(result) is None
+
+
+def test_store_hands_over_outputs_as_they_are():
+    store = IntermediateResultStore()
+    step = _step()
+    records = _records()
+
+    # Without a directory nothing is converted or written
+    assert store.put(step, records) is None
+    assert store.has(step)
+    assert store.get(step) is records
+
+    store.put(step, ["not", "columnar"])
+    assert store.get(step) == ["not", "columnar"]
+
+    store.discard(step)
+    assert not store.has(step)
+
+
+def test_store_spills_compressed_parquet_read_back_memory_mapped(tmp_path):
+    step = _step()
+    store = IntermediateResultStore(str(tmp_path))
+    records = _records()
+    assert store.put(step, records).num_rows == 1000
+    assert store.get(step) is records
+
+    path = tmp_path / "chunks.parquet"
+    column = pq.ParquetFile(path).metadata.row_group(0).column(0)
+    assert column.compression == "ZSTD"
+    assert "RLE_DICTIONARY" in column.encodings
+
+    # A store in another process only knows the directory, and reads records
+    # back as records
+    reader = pickle.loads(pickle.dumps(store))
+    assert reader._objects == {}
+    assert reader.has(step)
+    assert reader.get(step) == records
+
+    table = pa.table({"x": [1, 2]})
+    store.put(step, table)
+    assert pickle.loads(pickle.dumps(store)).get(step).equals(table)
+
+
+def test_write_intermediate_result_passes_output_to_destination():
+    store = IntermediateResultStore()
+    source, destination = _step(), _step("count", len, "n")
+
+    assert write_intermediate_result(source, destination, store=store) is True
+    store.put(source, _records(5))
+    assert write_intermediate_result(source, destination, store=store) == 5
+
+
+def test_pipeline_hands_records_between_steps(tmp_path):
+    volume = tmp_path / "volume"
+    volume.mkdir()
+    (volume / "doc.pdf").write_bytes(b"%PDF")
+    received = []
+
+    def chunk(files):
+        return _records(10)
+
+    def embed(records):
+        received.append(records)
+        return [{"chunk_id": r["chunk_id"], "dims": 3} for r in records]
+
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+    )
+    chunk_step = ProcessingStep(
+        name="chunk", function=chunk, inputs=[source], output_table="chunks"
+    )
+    embed_step = ProcessingStep(
+        name="embed", function=embed, inputs=[chunk_step], output_table="embeddings"
+    )
+    output = Output(
+        name="index",
+        inputs=[embed_step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    store = IntermediateResultStore(str(tmp_path / "intermediate"))
+    pipeline = Pipeline(
+        data_sources=[source],
+        processing_steps=[chunk_step, embed_step],
+        outputs=[output],
+        intermediate_store=store,
+    )
+    pipeline.edges[-1].function = lambda: True
+
+    pipeline.run(progress="none", use_cache=False)
+
+    (records,) = received
+    assert records is store.get(chunk_step)
+    assert records == _records(10)
+    assert pipeline.data_store["embed"][0] == {"chunk_id": 0, "dims": 3}
+    artifact = tmp_path / "intermediate" / "embeddings.parquet"
+    assert pq.read_table(artifact).num_rows == 10
+
+
+def test_pipeline_hands_generators_between_steps(tmp_path):
+    volume = tmp_path / "volume"
+    volume.mkdir()
+    for name in ("a", "b"):
+        (volume / f"{name}.pdf").write_bytes(b"%PDF")
+    received = []
+
+    def parse(files):
+        for f in files:
+            yield f"text of {os.path.basename(f['path'])}"
+
+    def count(pages):
+        received.extend(pages)
+        return len(received)
+
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+        manifest_path=str(tmp_path / "manifest.db"),
+    )
+    parse_step = ProcessingStep(
+        name="parse", function=parse, inputs=[source], output_table="pages"
+    )
+    count_step = ProcessingStep(
+        name="count", function=count, inputs=[parse_step], output_table="counts"
+    )
+    output = Output(
+        name="index",
+        inputs=[count_step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(
+        data_sources=[source],
+        processing_steps=[parse_step, count_step],
+        outputs=[output],
+    )
+    pipeline.edges[-1].function = lambda: True
+
+    pipeline.run(progress="none", use_cache=False)
+
+    assert sorted(received) == ["text of a.pdf", "text of b.pdf"]
+    assert pipeline.data_store["count"] == 2
+    # Consuming the generator committed the manifest
+    pipeline.run(progress="none", use_cache=False)
+    assert pipeline.data_store["parse"].files == []
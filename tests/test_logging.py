@@ -0,0 +1,75 @@
+import json
+import logging
+import subprocess
+import sys
+import threading
+
+from ai_cookbook.logging.structured import (
+    JsonLinesFormatter,
+    NonBlockingQueueHandler,
+    summarize,
+)
+
+
+def test_json_lines_formatter_interpolates_lazily():
+    """Test that records are rendered as JSON with %-style arguments applied"""
+    record = logging.LogRecord(
+        "root", logging.INFO, __file__, 1, "Streamed %d records from %s", (3, "a"), None
+    )
+    entry = json.loads(JsonLinesFormatter().format(record))
+    assert entry["message"] == "Streamed 3 records from a"
+    assert entry["level"] == "INFO"
+
+
+def test_summarize_truncates_large_values():
+    """Test that large results are truncated in log messages"""
+    summary = str(summarize(list(range(10_000)), limit=20))
+    assert summary.startswith("[0, 1, 2, 3, 4, 5, 6")
+    assert summary.endswith("... (list, len=10000)")
+    assert str(summarize({"a": 1})) == "{'a': 1}"
+
+
+def test_queue_handler_does_not_format_or_block():
+    """Test that the queue handler neither formats records nor blocks when full"""
+    import queue
+
+    formatted = threading.Event()
+
+    class Expensive:
+        def __str__(self):
+            formatted.set()
+            return "expensive"
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("test_queue_handler")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("first %s", Expensive())
+        logger.warning("second %s", Expensive())
+    finally:
+        logger.removeHandler(handler)
+
+    assert not formatted.is_set()
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "first expensive"
+
+
+def test_production_profile_from_env():
+    """Test that the env var selects JSON lines output through a queue"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import logging; from ai_cookbook.logging.logger import log; "
+            "log.info('edge %s done', 'a'); log.debug('hidden'); "
+            "print(type(logging.getLogger().handlers[0]).__name__)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**__import__("os").environ, "AI_COOKBOOK_LOG_PROFILE": "production"},
+    )
+    assert result.stdout.strip() == "NonBlockingQueueHandler"
+    lines = [json.loads(line) for line in result.stderr.splitlines()]
+    assert [line["message"] for line in lines] == ["edge a done"]
@@ -140,3 +140,89 @@ def test_record_failed_step():
     step_statuses = run_metadata["step1"]
     assert len(step_statuses) == 2
     assert step_statuses[1] == "failed"
+
+
+class _Step:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_sqlite_backend_persists_runs_events_and_results(tmp_path):
+    """Test that a SQLite-backed manager can be reopened by a later process"""
+    path = str(tmp_path / "metadata.db")
+    manager = MetadataManager.from_sqlite(path)
+    run = manager.start_run()
+    manager.update_step_metadata(_Step("step1"), run, "running", edge="a->step1")
+    manager.update_step_metadata(
+        _Step("step1"), run, "completed", edge="a->step1", rows=3, fingerprint="f"
+    )
+    manager.write_step_result([1, 2, 3], key="k", fingerprint="f")
+    manager.finish_run(run, "completed")
+    manager.backend.close()
+
+    reopened = MetadataManager.from_sqlite(path)
+    assert reopened.get_step_result("k") == ([1, 2, 3], "f")
+    assert reopened.get_node_statuses(run.run_id) == {"step1": "completed"}
+
+    events = reopened.backend.get_events(run.run_id)
+    assert [event["status"] for event in events] == ["running", "completed"]
+    assert events[1]["rows"] == 3
+    assert reopened.backend.list_runs()[0]["status"] == "completed"
+
+
+def test_sqlite_backend_batches_writes(tmp_path):
+    """Test that events are buffered until the batch fills or a flush"""
+    from ai_cookbook.metadata.backend import SQLiteMetadataBackend
+
+    backend = SQLiteMetadataBackend(str(tmp_path / "metadata.db"), batch_size=3)
+    for i in range(2):
+        backend.record_event("run", f"node{i}", "completed", float(i))
+    count = "SELECT COUNT(*) FROM node_events"
+    assert backend._connection.execute(count).fetchone()[0] == 0
+
+    backend.record_event("run", "node2", "completed", 2.0)
+    assert backend._connection.execute(count).fetchone()[0] == 3
+    backend.close()
+
+
+def test_metadata_backend_is_abstract():
+    """Test that backends must implement the whole interface"""
+    from ai_cookbook.metadata.backend import MetadataBackend
+
+    with pytest.raises(TypeError):
+        MetadataBackend()
+
+
+def test_node_timings():
+    """Test per-node durations derived from the event log"""
+    from ai_cookbook.metadata.backend import node_timings
+
+    events = [
+        {"node": "a", "status": "running", "timestamp": 1.0},
+        {"node": "a", "status": "completed", "timestamp": 3.5},
+        {"node": "b", "status": "cached", "timestamp": 4.0},
+    ]
+    assert node_timings(events) == {"a": 2.5}
+
+
+def test_step_results_are_kept_pickled_and_bounded(tmp_path):
+    """Test that only the most recently used results stay in memory"""
+    from ai_cookbook.metadata.backend import SQLiteMetadataBackend
+
+    backend = SQLiteMetadataBackend(str(tmp_path / "metadata.db"))
+    manager = MetadataManager(backend=backend, max_results=2)
+    results = {key: [key] * 3 for key in ("a", "b", "c")}
+    for key, result in results.items():
+        manager.write_step_result(result, key=key, fingerprint=f"f{key}")
+
+    assert list(manager.step_results) == ["b", "c"]
+    assert all(
+        isinstance(payload, bytes) for payload, _ in manager.step_results.values()
+    )
+    # Evicted results are read back from the backend, as a fresh copy
+    result, fingerprint = manager.get_step_result("a")
+    assert (result, fingerprint) == (results["a"], "fa")
+    assert result is not results["a"]
+    assert list(manager.step_results) == ["c", "a"]
+
+    assert MetadataManager(max_results=0).get_step_result("a") is None
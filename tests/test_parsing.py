@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from ai_cookbook.functions.parsing import extract_text_from_pdf, read_pdf_pages
+
+
+def read_text_pages(path):
+    """Stand-in page reader: form feeds separate the pages of a text file"""
+    with open(path) as f:
+        content = f.read()
+    if content.startswith("corrupt"):
+        raise ValueError("not a pdf")
+    yield from content.split("\f")
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    for i in range(4):
+        pages = [f"doc{i} page{p}" for p in range(3)]
+        _write(tmp_path / f"doc{i}.pdf", "\f".join(pages))
+    _write(tmp_path / "notes.txt", "not a pdf")
+    return tmp_path
+
+
+def test_extract_text_from_pdf_streams_pages(pdf_dir):
+    records = list(
+        extract_text_from_pdf(
+            str(pdf_dir), max_workers=2, page_reader=read_text_pages
+        )
+    )
+
+    assert len(records) == 12
+    assert {record["path"] for record in records} == {
+        str(pdf_dir / f"doc{i}.pdf") for i in range(4)
+    }
+    doc0 = sorted(
+        (r["page"], r["text"]) for r in records if r["path"].endswith("doc0.pdf")
+    )
+    assert doc0 == [(1, "doc0 page0"), (2, "doc0 page1"), (3, "doc0 page2")]
+
+
+def test_extract_text_from_pdf_skips_unchanged_files(pdf_dir, tmp_path_factory):
+    manifest = str(tmp_path_factory.mktemp("state") / "manifest.sqlite")
+
+    def extract():
+        return list(
+            extract_text_from_pdf(
+                str(pdf_dir),
+                max_workers=2,
+                manifest_path=manifest,
+                page_reader=read_text_pages,
+            )
+        )
+
+    assert len(extract()) == 12
+    assert extract() == []
+
+    changed = pdf_dir / "doc2.pdf"
+    _write(changed, "rewritten")
+    os.utime(changed, (1, 1))
+    assert [r["text"] for r in extract()] == ["rewritten"]
+
+
+def test_extract_text_from_pdf_retries_failed_files(pdf_dir, tmp_path_factory):
+    manifest = str(tmp_path_factory.mktemp("state") / "manifest.sqlite")
+    _write(pdf_dir / "doc9.pdf", "corrupt")
+
+    def extracted_paths():
+        records = extract_text_from_pdf(
+            str(pdf_dir), manifest_path=manifest, page_reader=read_text_pages
+        )
+        return {os.path.basename(r["path"]) for r in records}
+
+    assert "doc9.pdf" not in extracted_paths()
+    _write(pdf_dir / "doc9.pdf", "fixed")
+    assert extracted_paths() == {"doc9.pdf"}
+
+
+def test_extract_text_from_pdf_stops_early(pdf_dir):
+    records = extract_text_from_pdf(
+        str(pdf_dir), max_workers=2, page_reader=read_text_pages, queue_size=1
+    )
+    assert next(records)["page"] >= 1
+    records.close()
+
+
+def test_extract_text_from_pdf_saves_manifest_once_consumed(
+    pdf_dir, tmp_path_factory
+):
+    manifest = str(tmp_path_factory.mktemp("state") / "manifest.sqlite")
+
+    def extract():
+        return extract_text_from_pdf(
+            str(pdf_dir), manifest_path=manifest, page_reader=read_text_pages
+        )
+
+    records = extract()
+    next(records)
+    records.close()
+
+    assert len(list(extract())) == 12
+    assert list(extract()) == []
+
+
+def test_read_pdf_pages(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    writer.add_blank_page(width=200, height=200)
+    path = tmp_path / "blank.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    assert list(read_pdf_pages(str(path))) == ["", ""]
@@ -3,8 +3,12 @@ from ai_cookbook.pipeline.pipeline import Pipeline
 from ai_cookbook.pipeline.data_source import DataSource
 from ai_cookbook.pipeline.processing_step import ProcessingStep
 from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.scheduler import ReadyQueue
+from ai_cookbook.metadata.manager import MetadataManager
 from pydantic import ValidationError
+import asyncio
 import tempfile
+import time
 import yaml
 import os
 
@@ -252,3 +256,352 @@ def test_pipeline_from_yaml_invalid_content():
     finally:
         # Cleanup
         os.unlink(yaml_path)
+
+
+def _sleep_briefly():
+    time.sleep(0.3)
+
+
+def _branching_pipeline(function):
+    branch_sources = [
+        DataSource(
+            name=f"branch_source{i}",
+            catalog="test_catalog",
+            schema="test_schema",
+            type="volume",
+            path="/path/to/data",
+            format="pdf",
+        )
+        for i in range(2)
+    ]
+    branch_steps = [
+        ProcessingStep(
+            name=f"branch_step{i}",
+            function=function,
+            inputs=[source],
+            output_table=f"output_table{i}",
+        )
+        for i, source in enumerate(branch_sources)
+    ]
+    branch_output = Output(
+        name="branch_output",
+        inputs=branch_steps,
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    return Pipeline(
+        data_sources=branch_sources,
+        processing_steps=branch_steps,
+        outputs=[branch_output],
+    )
+
+
+def _branches_overlap(run) -> bool:
+    # Whether the recorded spans of the two branch edges intersect
+    nodes = run.profile.by_node()
+    (first,), (second,) = nodes["branch_step0"], nodes["branch_step1"]
+    return max(first.start, second.start) < min(
+        first.start + first.wall, second.start + second.wall
+    )
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_pipeline_run_parallel_branches(backend):
+    pipeline = _branching_pipeline(_sleep_briefly)
+
+    run = pipeline.run(scheduler=backend, max_workers=2)
+
+    # Both branches run side by side
+    assert _branches_overlap(run)
+    metadata = pipeline.metadata_manager.get_metadata(run)
+    assert metadata["branch_step0"] == ["running", "completed"]
+    assert metadata["branch_step1"] == ["running", "completed"]
+    assert metadata["branch_output"][-1] == "completed"
+
+
+def test_pipeline_run_invalid_scheduler(sample_valid_pipeline):
+    with pytest.raises(ValueError) as exc_info:
+        sample_valid_pipeline.run(scheduler="gpu")
+    assert "Invalid scheduler backend" in str(exc_info.value)
+
+
+def test_ready_queue_unlocks_edges_after_all_inputs():
+    pipeline = _branching_pipeline(_sleep_briefly)
+    queue = ReadyQueue(pipeline.nodes, pipeline.edges)
+
+    ready = queue.start()
+    assert {edge.destination.name for edge in ready} == {
+        "branch_step0",
+        "branch_step1",
+    }
+
+    first, second = ready
+    (first_output_edge,) = queue.complete_edge(first)
+    (second_output_edge,) = queue.complete_edge(second)
+    assert first_output_edge.destination.name == "branch_output"
+
+    # The output only completes once both of its incoming edges have
+    assert queue.complete_edge(first_output_edge) == []
+    assert "branch_output" not in queue.completed_nodes
+    assert queue.complete_edge(second_output_edge) == []
+    assert queue.completed_nodes[-1] == "branch_output"
+
+
+async def _async_sleep_briefly():
+    await asyncio.sleep(0.3)
+
+
+@pytest.mark.parametrize("function", [_async_sleep_briefly, _sleep_briefly])
+def test_pipeline_arun_overlaps_io_bound_edges(function):
+    pipeline = _branching_pipeline(function)
+
+    run = asyncio.run(pipeline.arun())
+
+    assert _branches_overlap(run)
+    metadata = pipeline.metadata_manager.get_metadata(run)
+    assert metadata["branch_step0"] == ["running", "completed"]
+    assert metadata["branch_output"][-1] == "completed"
+
+
+def test_pipeline_arun_resource_limits():
+    pipeline = _branching_pipeline(_async_sleep_briefly)
+
+    run = asyncio.run(pipeline.arun(resource_limits={"volume": 1}))
+
+    # A single volume slot forces the two ingestion edges to run one after the
+    # other, so the second only starts once the first has slept
+    nodes = run.profile.by_node()
+    (first,), (second,) = nodes["branch_step0"], nodes["branch_step1"]
+    assert abs(second.start - first.start) >= 0.29
+
+
+def test_pipeline_run_coroutine_edges_inside_running_loop():
+    """run() works from code already on an event loop, e.g. a notebook cell"""
+    pipeline = _branching_pipeline(_async_sleep_briefly)
+
+    async def main():
+        return pipeline.run(progress="none", use_cache=False)
+
+    run = asyncio.run(main())
+    metadata = pipeline.metadata_manager.get_metadata(run)
+    assert metadata["branch_output"][-1] == "completed"
+
+
+_step_calls = []
+
+
+def _count_call():
+    _step_calls.append(1)
+
+
+def test_pipeline_run_reuses_cached_results():
+    _step_calls.clear()
+    pipeline = _branching_pipeline(_count_call)
+
+    first = pipeline.run()
+    assert len(_step_calls) == 2
+    assert set(first.cache_report.values()) == {"miss"}
+
+    second = pipeline.run()
+    assert len(_step_calls) == 2
+    assert second.cache_report == {
+        "branch_step0": "hit",
+        "branch_step1": "hit",
+        "branch_output": "hit",
+    }
+    assert pipeline.metadata_manager.get_metadata(second)["branch_step0"] == [
+        "cached"
+    ]
+
+    # Changing one step's parameters only invalidates that branch downstream
+    pipeline.processing_steps[0].parameters = {"chunk_size": 500}
+    third = pipeline.run(scheduler="thread")
+    assert len(_step_calls) == 3
+    assert third.cache_report == {
+        "branch_step0": "miss",
+        "branch_step1": "hit",
+        "branch_output": "miss",
+    }
+
+    pipeline.run(use_cache=False)
+    assert len(_step_calls) == 5
+
+
+def _volume_pipeline(root, function):
+    source = DataSource(
+        name="docs",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path=str(root),
+        format="txt",
+    )
+    step = ProcessingStep(
+        name="read", function=function, inputs=[source], output_table="read"
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[output])
+    pipeline.edges[-1].function = lambda: True
+    return pipeline
+
+
+def test_pipeline_cache_keys_cover_volume_contents(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    pipeline = _volume_pipeline(
+        tmp_path, lambda files: sorted(os.path.basename(f["path"]) for f in files)
+    )
+
+    pipeline.run(progress="none")
+    assert pipeline.run(progress="none").cache_report["read"] == "hit"
+
+    (tmp_path / "b.txt").write_text("b")
+    run = pipeline.run(progress="none")
+    assert run.cache_report["read"] == "miss"
+    assert pipeline.data_store["read"].output == ["a.txt", "b.txt"]
+
+
+def test_pipeline_cache_does_not_reuse_generators(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    read_paths = []
+
+    def read(files):
+        for f in files:
+            read_paths.append(f["path"])
+            yield f["path"]
+
+    pipeline = _volume_pipeline(tmp_path, read)
+    pipeline.run(progress="none")
+    run = pipeline.run(progress="none")
+
+    assert run.cache_report["read"] == "miss"
+    assert len(read_paths) == 2
+
+
+def test_pipeline_run_drains_generator_leaf_steps(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.txt").write_text(name)
+    read_paths = []
+
+    def read(files):
+        for f in files:
+            read_paths.append(os.path.basename(f["path"]))
+            yield f["path"]
+
+    source = DataSource(
+        name="docs",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path=str(tmp_path),
+        format="txt",
+        manifest_path=str(tmp_path / "manifest.sqlite"),
+    )
+    step = ProcessingStep(
+        name="read", function=read, inputs=[source], output_table="read"
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[])
+
+    pipeline.run(progress="none")
+    assert sorted(read_paths) == ["a.txt", "b.txt"]
+
+    # The manifest was committed, so no file is pending on the next run
+    pipeline.run(progress="none")
+    assert len(read_paths) == 2
+
+
+def _fail_edge(*args, **kwargs):
+    raise RuntimeError("embedding endpoint unavailable")
+
+
+def test_pipeline_run_resumes_from_failed_run(tmp_path):
+    _step_calls.clear()
+    path = str(tmp_path / "metadata.db")
+    pipeline = _branching_pipeline(_count_call)
+    pipeline.metadata_manager = MetadataManager.from_sqlite(path)
+    output_edges = [
+        edge for edge in pipeline.edges if edge.destination.name == "branch_output"
+    ]
+    for edge in output_edges:
+        edge.function = _fail_edge
+
+    # Results are only persisted, and so resumable, with the cache on
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert len(_step_calls) == 2
+    failed_run_id = pipeline.metadata_manager.backend.list_runs()[0]["run_id"]
+
+    # Resume from a fresh process: only the persisted metadata is shared
+    pipeline = _branching_pipeline(_count_call)
+    pipeline.metadata_manager = MetadataManager.from_sqlite(path)
+    resumed = pipeline.run(use_cache=False, resume_from=failed_run_id)
+
+    assert len(_step_calls) == 2
+    assert resumed.resumed_from == failed_run_id
+    metadata = pipeline.metadata_manager.get_metadata(resumed)
+    assert metadata["branch_step0"] == ["resumed"]
+    assert metadata["branch_step1"] == ["resumed"]
+    assert metadata["branch_output"][-1] == "completed"
+
+
+def test_pipeline_run_resume_reruns_downstream_of_failure():
+    _step_calls.clear()
+    pipeline = _branching_pipeline(_count_call)
+    step_edge = next(
+        edge for edge in pipeline.edges if edge.destination.name == "branch_step0"
+    )
+    function = step_edge.function
+    step_edge.function = _fail_edge
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(scheduler="thread")
+    failed_run_id = next(iter(pipeline.metadata_manager.step_metadata))
+
+    step_edge.function = function
+    resumed = pipeline.run(use_cache=False, resume_from=failed_run_id)
+    metadata = pipeline.metadata_manager.get_metadata(resumed)
+    assert metadata["branch_step0"] == ["running", "completed"]
+    assert metadata["branch_step1"] == ["resumed"]
+    # The edge out of the failed branch runs again
+    assert "running" in metadata["branch_output"]
+    assert "failed" not in metadata["branch_output"]
+
+
+def test_pipeline_run_resume_unknown_run(sample_valid_pipeline):
+    with pytest.raises(ValueError, match="not found"):
+        sample_valid_pipeline.run(resume_from="missing-run")
+
+
+def test_compiled_dag_adjacency(sample_valid_pipeline):
+    dag = sample_valid_pipeline.dag
+    assert [edge.source.name for edge in dag.incoming("step2")] == ["step1"]
+    assert [edge.destination.name for edge in dag.outgoing("step1")] == ["step2"]
+    assert dag.incoming("source1") == []
+    assert dag.topological_order is dag.topological_order
+    assert sample_valid_pipeline.get_step_by_name("step1") is step_1
+    with pytest.raises(ValueError):
+        sample_valid_pipeline.get_step_by_name("output1")
+
+
+def test_compiled_dag_large_fan_in():
+    from ai_cookbook.pipeline.dag import CompiledDag, Edge
+
+    class Node:
+        def __init__(self, name):
+            self.name = name
+
+    sink = Node("sink")
+    sources = [Node(f"file{i}") for i in range(5000)]
+    edges = [Edge(source, sink) for source in sources]
+    dag = CompiledDag([node.name for node in sources] + ["sink"], edges)
+
+    assert len(dag.incoming("sink")) == 5000
+    assert dag.topological_order[-1] == "sink"
+    assert dag.in_degrees()[-1] == 5000
+    assert not dag.has_cycle()
@@ -30,3 +30,89 @@ step_2 = ProcessingStep(
 
 def test_processing_step():
     pass
+
+
+def test_function_path_is_lazy_reference():
+    """Test that dotted paths become lazy references equal to the path"""
+    from ai_cookbook.pipeline.function_ref import FunctionRef
+
+    assert isinstance(step_1.function, FunctionRef)
+    assert step_1.function == "ai_cookbook.functions.parsing.extract_text_from_pdf"
+
+
+def test_function_module_is_not_imported_at_validation(tmp_path, monkeypatch):
+    """Test that validating a step locates its module without executing it"""
+    import sys
+
+    (tmp_path / "heavy_step_module.py").write_text(
+        "raise RuntimeError('imported too early')\n"
+        "def run(*args):\n"
+        "    return args\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    step = ProcessingStep(
+        name="heavy",
+        function="heavy_step_module.run",
+        inputs=[source_1],
+        output_table="heavy_output",
+    )
+    step.function.validate(validate_only=True)
+    assert "heavy_step_module" not in sys.modules
+
+    with pytest.raises(RuntimeError):
+        step.function.resolve()
+
+
+def test_missing_function_module():
+    """Test that unknown modules are rejected when the step is built"""
+    with pytest.raises(ValueError, match="Could not import module"):
+        ProcessingStep(
+            name="missing",
+            function="ai_cookbook.functions.does_not_exist.run",
+            inputs=[source_1],
+            output_table="missing_output",
+        )
+
+
+def test_resolve_function_is_memoized():
+    """Test that a dotted path is resolved once per process"""
+    from ai_cookbook.functions.chunking import chunk_text
+    from ai_cookbook.pipeline.function_ref import FunctionRef, resolve_function
+
+    path = "ai_cookbook.functions.chunking.chunk_text"
+    assert FunctionRef(path).resolve() is chunk_text
+    hits = resolve_function.cache_info().hits
+    FunctionRef(path).resolve()
+    assert resolve_function.cache_info().hits == hits + 1
+
+    with pytest.raises(ValueError, match="not found in module"):
+        FunctionRef("ai_cookbook.functions.chunking.missing").validate(
+            validate_only=False
+        )
+
+
+def test_processing_step_serialization_round_trip():
+    """Test that steps with dotted function paths dump to JSON and back"""
+    restored = ProcessingStep.model_validate_json(step_2.model_dump_json())
+
+    assert restored.function == step_2.function
+    assert restored.inputs[0].function == step_1.function
+    assert restored.model_dump() == step_2.model_dump()
+
+
+def test_pipeline_serializes_function_paths():
+    """Test that pipelines dump their configuration, not their runtime state"""
+    import json
+
+    from ai_cookbook.pipeline.pipeline import Pipeline
+
+    pipeline = Pipeline(
+        data_sources=[source_1], processing_steps=[step_1, step_2], outputs=[]
+    )
+    dumped = json.loads(pipeline.model_dump_json())
+
+    assert [step["function"] for step in dumped["processing_steps"]] == [
+        "ai_cookbook.functions.parsing.extract_text_from_pdf"
+    ] * 2
+    assert "edges" not in dumped and "data_store" not in dumped
@@ -0,0 +1,227 @@
+import json
+import os
+import pstats
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.profiling import (
+    NodeProfile,
+    RunProfile,
+    estimate_size,
+    measure_call,
+)
+
+
+def _busy():
+    deadline = time.perf_counter() + 0.05
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return [total] * 10
+
+
+def _profiled_pipeline():
+    source = DataSource(
+        name="source1",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path="/path/to/data",
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="step1",
+        function="tests.test_profiling._busy",
+        inputs=[source],
+        output_table="output_table1",
+    )
+    output = Output(
+        name="output1",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    return Pipeline(data_sources=[source], processing_steps=[step], outputs=[output])
+
+
+@pytest.fixture
+def busy_pipeline(monkeypatch):
+    pipeline = _profiled_pipeline()
+    for edge in pipeline.edges:
+        if edge.destination.name == "step1":
+            monkeypatch.setattr(edge, "function", _busy)
+        else:
+            monkeypatch.setattr(edge, "function", lambda: True)
+    return pipeline
+
+
+@pytest.mark.parametrize("scheduler", ["serial", "thread"])
+def test_run_collects_edge_profiles(busy_pipeline, scheduler):
+    """
+    Every executed edge gets wall/CPU time and record counts
+    """
+    run = busy_pipeline.run(scheduler=scheduler, use_cache=False)
+
+    profiles = run.profile.by_node()
+    assert set(profiles) == {"step1", "output1"}
+    (step,) = profiles["step1"]
+    assert step.status == "completed"
+    assert step.wall >= 0.05
+    assert step.cpu > 0
+    assert step.records_out == 10
+    assert step.bytes_out > 0
+    # The output edge reads step1's result
+    assert profiles["output1"][0].records_in == 10
+
+
+def test_chrome_trace_format(busy_pipeline, tmp_path):
+    """
+    The trace holds one complete event per edge plus thread names
+    """
+    run = busy_pipeline.run(use_cache=False)
+    path = tmp_path / "trace.json"
+    run.profile.write_chrome_trace(str(path))
+
+    trace = json.loads(path.read_text())
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert len(spans) == len(run.profile.nodes)
+    assert all(event["dur"] >= 0 and event["ts"] >= 0 for event in spans)
+    assert {event["args"]["node"] for event in spans} == {"step1", "output1"}
+    assert any(event["ph"] == "M" for event in trace["traceEvents"])
+
+
+def test_otel_export_to_file(busy_pipeline, tmp_path):
+    """
+    Spans share the run's trace id and hang off a root span
+    """
+    run = busy_pipeline.run(use_cache=False)
+    path = tmp_path / "spans.json"
+    run.profile.export_otel(str(path))
+
+    payload = json.loads(path.read_text())
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, *children = spans
+    assert len(children) == len(run.profile.nodes)
+    assert {span["traceId"] for span in spans} == {root["traceId"]}
+    assert all(span["parentSpanId"] == root["spanId"] for span in children)
+    assert all(
+        int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+        for span in children
+    )
+
+
+def test_otel_export_to_collector():
+    """
+    Spans are POSTed as OTLP/JSON to an HTTP collector
+    """
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        profile = RunProfile("run-1")
+        profile.add(NodeProfile(name="a->b", node="b", start=time.time(), wall=0.1))
+        profile.export_otel(f"http://127.0.0.1:{server.server_port}/v1/traces")
+    finally:
+        server.shutdown()
+
+    ((path, payload),) = received
+    assert path == "/v1/traces"
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["run run-1", "a->b"]
+
+
+def test_run_profiles_named_node_with_cprofile(busy_pipeline, tmp_path):
+    """
+    Only edges into the named nodes get a cProfile dump
+    """
+    busy_pipeline.run(
+        use_cache=False, profile_nodes=["step1"], profile_dir=str(tmp_path)
+    )
+
+    (name,) = os.listdir(tmp_path)
+    assert name.endswith(".prof")
+    stats = pstats.Stats(str(tmp_path / name))
+    assert any(function[2] == "_busy" for function in stats.stats)
+
+
+def test_overlapping_cprofile_edges_fall_back_to_timing(tmp_path):
+    both_running = threading.Barrier(2, timeout=5)
+
+    def busy():
+        both_running.wait()
+        return _busy()
+
+    results = {}
+
+    def measure(name):
+        results[name] = measure_call(
+            busy, name, "node", profiler="cprofile", profile_dir=str(tmp_path)
+        )
+
+    threads = [threading.Thread(target=measure, args=(f"edge{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Only one of the two edges was profiled, both were timed
+    assert len(os.listdir(tmp_path)) == 1
+    assert all(profile.wall > 0 for _, profile in results.values())
+
+
+def test_cprofile_falls_back_to_timing_under_another_profiler(tmp_path, monkeypatch):
+    import cProfile
+
+    def enable(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", enable)
+    result, profile = measure_call(
+        _busy, "edge", "node", profiler="cprofile", profile_dir=str(tmp_path)
+    )
+
+    assert len(result) == 10
+    assert profile.wall > 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampling_profiler_writes_folded_stacks(tmp_path):
+    result, profile = measure_call(
+        _busy, "edge", "node", profiler="sampling", profile_dir=str(tmp_path)
+    )
+
+    assert len(result) == 10
+    folded = (tmp_path / "edge.folded").read_text().splitlines()
+    assert folded
+    assert any("_busy" in line for line in folded)
+    assert profile.records_out == 10
+
+
+def test_run_rejects_unknown_profiler(busy_pipeline):
+    with pytest.raises(ValueError):
+        busy_pipeline.run(profile_nodes=["step1"], profiler="perf")
+
+
+def test_estimate_size_samples_large_lists():
+    assert estimate_size(b"abcd") == 4
+    assert estimate_size(["ab"] * 100_000) == 200_000
@@ -0,0 +1,172 @@
+import logging
+
+import pytest
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.progress import (
+    CallbackProgress,
+    LogProgress,
+    NullProgress,
+    ProgressReporter,
+    get_progress_reporter,
+)
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def _wide_pipeline(width):
+    source = DataSource(
+        name="source1",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path="/path/to/data",
+        format="pdf",
+    )
+    steps = [
+        ProcessingStep(
+            name=f"step{i}",
+            function="ai_cookbook.functions.chunking.chunk_text",
+            inputs=[source],
+            output_table=f"output_table{i}",
+        )
+        for i in range(width)
+    ]
+    output = Output(
+        name="output1",
+        inputs=steps,
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=steps, outputs=[output])
+    for edge in pipeline.edges:
+        edge.function = _noop
+    return pipeline
+
+
+class RecordingProgress(ProgressReporter):
+    def __init__(self, interval=0.0):
+        super().__init__(interval)
+        self.snapshots = []
+        self.closed = False
+
+    def render(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def close(self):
+        self.closed = True
+
+
+def test_progress_reporter_is_abstract():
+    with pytest.raises(TypeError):
+        ProgressReporter()
+
+
+@pytest.mark.parametrize("scheduler", ["serial", "thread"])
+def test_run_reports_every_edge(scheduler):
+    """
+    With no rate limit every transition renders, and the final snapshot
+    counts all edges
+    """
+    pipeline = _wide_pipeline(5)
+    reporter = RecordingProgress()
+
+    pipeline.run(scheduler=scheduler, progress=reporter)
+
+    final = reporter.snapshots[-1]
+    assert final.total == len(pipeline.edges)
+    assert final.completed == len(pipeline.edges)
+    assert final.running == 0
+    assert reporter.closed
+
+
+def test_run_reports_cached_edges():
+    pipeline = _wide_pipeline(3)
+    pipeline.run(progress="none")
+    reporter = RecordingProgress()
+
+    pipeline.run(progress=reporter)
+
+    final = reporter.snapshots[-1]
+    assert final.cached == len(pipeline.edges)
+    assert final.completed == 0
+
+
+def test_rendering_is_rate_limited():
+    """
+    A long interval leaves only the final render, however many edges ran
+    """
+    pipeline = _wide_pipeline(200)
+    reporter = RecordingProgress(interval=3600)
+
+    pipeline.run(progress=reporter, use_cache=False)
+
+    assert len(reporter.snapshots) == 1
+    assert reporter.snapshots[0].done == len(pipeline.edges)
+
+
+def test_callback_progress_batches_events():
+    pipeline = _wide_pipeline(10)
+    snapshots = []
+
+    pipeline.run(progress=CallbackProgress(snapshots.append, interval=3600))
+
+    (snapshot,) = snapshots
+    statuses = [status for _, status in snapshot.events]
+    assert statuses.count("running") == len(pipeline.edges)
+    assert statuses.count("completed") == len(pipeline.edges)
+    assert ("source1->step0", "completed") in snapshot.events
+
+
+def test_run_accepts_plain_callback():
+    pipeline = _wide_pipeline(2)
+    snapshots = []
+
+    pipeline.run(progress=snapshots.append)
+
+    assert snapshots[-1].done == len(pipeline.edges)
+
+
+def test_run_reports_failed_edges():
+    pipeline = _wide_pipeline(2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    pipeline.edges[-1].function = fail
+    reporter = RecordingProgress()
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(progress=reporter, use_cache=False)
+
+    assert reporter.snapshots[-1].failed == 1
+    assert reporter.closed
+
+
+def test_log_progress_writes_summary_line(caplog):
+    pipeline = _wide_pipeline(2)
+
+    with caplog.at_level(logging.INFO):
+        pipeline.run(progress="log", use_cache=False)
+
+    total = len(pipeline.edges)
+    lines = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("Progress:")
+    ]
+    assert lines[-1].startswith(f"Progress: {total}/{total} edges")
+
+
+def test_get_progress_reporter():
+    assert isinstance(get_progress_reporter("none"), NullProgress)
+    assert isinstance(get_progress_reporter(None), NullProgress)
+    assert isinstance(get_progress_reporter("log"), LogProgress)
+    with pytest.raises(ValueError):
+        get_progress_reporter("fancy")
@@ -0,0 +1,215 @@
+import os
+import pickle
+import threading
+import time
+
+import pytest
+
+from ai_cookbook.functions.parsing import iter_pdf_paths
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.readers import (
+    MmapReader,
+    RangedReader,
+    SourceFile,
+    SourceReader,
+    get_source_reader,
+    read_local_range,
+)
+
+
+def _resident_mib():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") >> 20
+
+
+@pytest.fixture
+def large_file(tmp_path):
+    path = tmp_path / "large.bin"
+    block = bytes(range(256)) * 4096
+    with open(path, "wb") as f:
+        for _ in range(64):
+            f.write(block)
+    return str(path)
+
+
+def test_mmap_reader_yields_zero_copy_blocks(large_file):
+    reader = MmapReader(block_size=1 << 20)
+    blocks = reader.iter_blocks(large_file)
+
+    first = next(blocks)
+    assert isinstance(first, memoryview)
+    assert first.readonly and len(first) == 1 << 20
+    assert first[:4].tobytes() == bytes([0, 1, 2, 3])
+
+    # The previous block is released once the next one is requested
+    next(blocks)
+    with pytest.raises(ValueError):
+        first.tobytes()
+    blocks.close()
+
+    assert reader.read(large_file) == open(large_file, "rb").read()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs procfs")
+def test_mmap_reader_keeps_rss_bounded(large_file):
+    reader = MmapReader(block_size=1 << 20)
+    start = peak = _resident_mib()
+    total = 0
+    for block in reader.iter_blocks(large_file):
+        total += len(block)
+        # Touch every page of the block
+        block.tobytes()
+        peak = max(peak, _resident_mib())
+
+    assert total == 64 << 20
+    assert peak - start < 16
+
+
+def test_mmap_reader_empty_file(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    assert list(MmapReader().iter_blocks(str(path))) == []
+
+
+def test_ranged_reader_caps_bytes_in_flight(large_file):
+    """
+    A slow consumer leaves read-ahead waiting on the byte budget instead of
+    buffering the whole file
+    """
+    in_flight = []
+    lock = threading.Lock()
+
+    def fetch(path, offset, length):
+        with lock:
+            in_flight.append(reader.budget.used)
+        return read_local_range(path, offset, length)
+
+    reader = RangedReader(
+        fetch,
+        block_size=1 << 20,
+        read_ahead=8,
+        max_bytes_in_flight=4 << 20,
+    )
+    data = bytearray()
+    for block in reader.iter_blocks(large_file):
+        time.sleep(0.001)
+        data += block
+    reader.close()
+
+    assert bytes(data) == open(large_file, "rb").read()
+    assert reader.budget.peak <= 5 << 20
+    assert reader.budget.used == 0
+
+
+def test_ranged_reader_releases_budget_when_abandoned(large_file):
+    reader = RangedReader(block_size=1 << 20, read_ahead=4, max_bytes_in_flight=8 << 20)
+    blocks = reader.iter_blocks(large_file)
+    next(blocks)
+    blocks.close()
+
+    deadline = time.monotonic() + 5
+    while reader.budget.used and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reader.budget.used == 0
+    reader.close()
+
+
+def test_ranged_reader_restarts_pool_after_close(large_file):
+    expected = open(large_file, "rb").read()
+    reader = RangedReader(block_size=1 << 20)
+    assert reader.read(large_file) == expected
+
+    reader.close()
+    assert reader._executor is None
+    assert reader.read(large_file) == expected
+    # Only the settings are pickled, e.g. with handles in cached results
+    assert pickle.loads(pickle.dumps(reader)).read(large_file) == expected
+    reader.close()
+
+
+def test_source_reader_is_abstract():
+    with pytest.raises(TypeError):
+        SourceReader()
+
+
+def test_get_source_reader_picks_reader(tmp_path):
+    def source(path, **fields):
+        return DataSource(
+            name="docs",
+            catalog="c",
+            schema="s",
+            type="volume",
+            path=path,
+            format="pdf",
+            **fields,
+        )
+
+    local = get_source_reader(source(str(tmp_path), reader_options={"block_size": 1}))
+    assert isinstance(local, MmapReader)
+    # Rounded up to whole pages
+    assert local.block_size >= 4096
+    assert isinstance(get_source_reader(source("/Volumes/c/s/v/docs")), RangedReader)
+    assert isinstance(get_source_reader(source("docs", volume_name="v")), RangedReader)
+
+
+def test_read_data_source_streams_source_files(tmp_path):
+    for i in range(3):
+        (tmp_path / f"doc{i}.pdf").write_bytes(b"%PDF" + bytes([i]) * 10)
+    (tmp_path / "skip.txt").write_text("not a pdf")
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(tmp_path),
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="parse",
+        function="ai_cookbook.functions.parsing.extract_text_from_pdf",
+        inputs=[source],
+        output_table="parsed",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[step], outputs=[])
+
+    files = list(pipeline.read_data_source(source))
+
+    assert all(isinstance(f, SourceFile) for f in files)
+    assert [os.path.basename(f) for f in files] == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+    assert files[1].read() == b"%PDF" + bytes([1]) * 10
+    # Parsing functions accept them as paths
+    assert list(iter_pdf_paths(files)) == [f.path for f in files]
+
+
+def test_read_data_source_closes_its_own_reader(tmp_path, monkeypatch):
+    (tmp_path / "doc.pdf").write_bytes(b"%PDF")
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(tmp_path),
+        format="pdf",
+    )
+    pipeline = Pipeline(data_sources=[source], processing_steps=[], outputs=[])
+    closed = []
+
+    class Reader(RangedReader):
+        def close(self):
+            closed.append(self)
+            super().close()
+
+    monkeypatch.setattr(
+        "ai_cookbook.pipeline.pipeline.get_source_reader", lambda source: Reader()
+    )
+
+    (handle,) = pipeline.read_data_source(source)
+    assert len(closed) == 1
+
+    mine = Reader()
+    (handle,) = pipeline.read_data_source(source, mine)
+    assert handle.reader is mine and len(closed) == 1
+    assert handle.read() == b"%PDF"
+    mine.close()
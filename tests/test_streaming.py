@@ -0,0 +1,277 @@
+import os
+
+import pytest
+
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.events import EventMetrics
+from ai_cookbook.pipeline.streaming import iter_records
+from ai_cookbook.pipeline.vectorsearch import VectorIndexWriter
+
+source_1 = DataSource(
+    name="source1",
+    catalog="test_catalog",
+    schema="test_schema",
+    type="volume",
+    path="/path/to/data",
+    format="pdf",
+)
+
+
+def _streaming_pipeline(parse, chunk):
+    parsing = ProcessingStep(
+        name="parsing",
+        function=parse,
+        inputs=[source_1],
+        output_table="extracted_texts",
+    )
+    chunking = ProcessingStep(
+        name="chunking",
+        function=chunk,
+        inputs=[parsing],
+        output_table="chunks",
+    )
+    index = Output(
+        name="index",
+        type="vector_index",
+        inputs=[chunking],
+        embedding_model="openai-embedding-model",
+        output_table="chunk_index",
+    )
+    return Pipeline(
+        data_sources=[source_1],
+        processing_steps=[parsing, chunking],
+        outputs=[index],
+    )
+
+
+class _IndexWriter:
+    """Stands in for the vector index writer of a streamed output"""
+
+    def __init__(self):
+        self.batches = []
+        self.finished = False
+
+    def append(self, chunks):
+        self.batches.append(list(chunks))
+
+    def finish(self):
+        self.finished = True
+
+    def close(self):
+        pass
+
+
+def test_iter_records():
+    assert list(iter_records(None)) == []
+    assert list(iter_records("text")) == ["text"]
+    assert list(iter_records([1, 2])) == [1, 2]
+    assert list(iter_records(x for x in range(3))) == [0, 1, 2]
+
+
+def test_run_streaming_batches_records(monkeypatch):
+    def parse(files):
+        for name in files:
+            for page in range(1000):
+                yield f"{name}-{page}"
+
+    def chunk(pages):
+        for page in pages:
+            yield page.upper()
+
+    pipeline = _streaming_pipeline(parse, chunk)
+    written = []
+    writers = []
+    monkeypatch.setattr(
+        Pipeline,
+        "write_output",
+        lambda self, table, batch: written.append((table, batch)),
+    )
+    monkeypatch.setattr(
+        VectorIndexWriter,
+        "from_output",
+        lambda output: writers.append(_IndexWriter()) or writers[-1],
+    )
+
+    metrics = EventMetrics()
+    pipeline.events.subscribe(metrics)
+    run = pipeline.run_streaming(batch_size=64, queue_size=2)
+
+    chunk_batches = [batch for table, batch in written if table == "chunks"]
+    assert sum(len(batch) for batch in chunk_batches) == 1000
+    # One writer for the whole stream, finished once the output completes
+    (writer,) = writers
+    assert writer.finished
+    indexed = writer.batches
+    assert sum(len(batch) for batch in indexed) == 1000
+    assert all(len(batch) <= 64 for batch in indexed)
+    assert indexed[0][0] == "DATA_FROM_SOURCE1-0"
+    assert run.record_counts == {
+        "source1": 1,
+        "parsing": 1000,
+        "chunking": 1000,
+        "index": 1000,
+    }
+    pipeline.events.flush()
+    assert metrics.records["chunking"] == 1000
+    assert metrics.bytes_written["chunking"] > 0
+    chunking = run.profile.by_node()["chunking"][0]
+    assert chunking.kind == "node"
+    assert (chunking.records_in, chunking.records_out) == (1000, 1000)
+    assert chunking.bytes_out > 0
+    metadata = pipeline.metadata_manager.get_metadata(run)
+    assert metadata["chunking"] == ["running", "completed"]
+
+
+def test_run_streaming_applies_backpressure(monkeypatch):
+    produced = []
+    consumed = []
+    lead = []
+
+    def parse(files):
+        for i in range(5000):
+            produced.append(i)
+            lead.append(len(produced) - len(consumed))
+            yield i
+
+    def chunk(pages):
+        for page in pages:
+            consumed.append(page)
+            yield page
+
+    pipeline = _streaming_pipeline(parse, chunk)
+    monkeypatch.setattr(Pipeline, "write_output", lambda self, table, batch: None)
+    monkeypatch.setattr(VectorIndexWriter, "from_output", lambda output: _IndexWriter())
+
+    pipeline.run_streaming(batch_size=10, queue_size=2)
+
+    assert len(consumed) == 5000
+    # The producer can only run a few batches ahead of its consumer
+    assert max(lead) <= 10 * (2 + 3)
+
+
+def test_run_streaming_propagates_failures(monkeypatch):
+    def parse(files):
+        yield "page"
+        raise RuntimeError("corrupt pdf")
+
+    def chunk(pages):
+        for page in pages:
+            yield page
+
+    pipeline = _streaming_pipeline(parse, chunk)
+    monkeypatch.setattr(Pipeline, "write_output", lambda self, table, batch: None)
+    monkeypatch.setattr(VectorIndexWriter, "from_output", lambda output: _IndexWriter())
+
+    with pytest.raises(RuntimeError, match="corrupt pdf"):
+        pipeline.run_streaming(batch_size=1)
+
+    statuses = {
+        name: statuses[-1]
+        for run_metadata in pipeline.metadata_manager.step_metadata.values()
+        for name, statuses in run_metadata.items()
+    }
+    assert statuses["parsing"] == "failed"
+    assert statuses["chunking"] == "failed"
+
+
+def _write_pdf(path, pages):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET".encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        content = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 600 200] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 "
+            b"/BaseFont /Helvetica >> >> >> >>" % content
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(kids),
+        len(kids),
+    )
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(data)
+
+
+class _Embeddings:
+    def embed(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+def test_run_streaming_parses_chunks_and_indexes_pdfs(tmp_path, monkeypatch):
+    pytest.importorskip("pypdf")
+    from ai_cookbook.pipeline.vectorsearch import InMemoryVectorIndex
+
+    for doc in ("a", "b"):
+        _write_pdf(tmp_path / f"{doc}.pdf", [f"{doc} page one", f"{doc} page two"])
+    source = DataSource(
+        name="docs",
+        catalog="test_catalog",
+        schema="test_schema",
+        type="volume",
+        path=str(tmp_path),
+        format="pdf",
+    )
+    parsing = ProcessingStep(
+        name="parsing",
+        function="ai_cookbook.functions.parsing.extract_text_from_pdf",
+        inputs=[source],
+        output_table="pages",
+    )
+    chunking = ProcessingStep(
+        name="chunking",
+        function="ai_cookbook.functions.chunking.chunk_records",
+        inputs=[parsing],
+        output_table="chunks",
+    )
+    output = Output(
+        name="index",
+        type="vector_index",
+        inputs=[chunking],
+        embedding_model="openai-embedding-model",
+        output_table="chunk_index",
+    )
+    pipeline = Pipeline(
+        data_sources=[source], processing_steps=[parsing, chunking], outputs=[output]
+    )
+    index = InMemoryVectorIndex()
+    monkeypatch.setattr(Pipeline, "write_output", lambda self, table, batch: None)
+    monkeypatch.setattr(
+        VectorIndexWriter,
+        "from_output",
+        lambda output: VectorIndexWriter(_Embeddings(), index),
+    )
+
+    run = pipeline.run_streaming(batch_size=2)
+
+    assert run.record_counts["chunking"] == 4
+    rows = sorted(
+        (os.path.basename(row["path"]), row["page"], row["chunk_index"], row["text"])
+        for row in index.rows.values()
+    )
+    assert rows == [
+        ("a.pdf", 1, 0, "a page one"),
+        ("a.pdf", 2, 0, "a page two"),
+        ("b.pdf", 1, 0, "b page one"),
+        ("b.pdf", 2, 0, "b page two"),
+    ]
+    assert all(row["embedding"] == [10.0] for row in index.rows.values())
@@ -0,0 +1,381 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+pa = pytest.importorskip("pyarrow")
+
+from ai_cookbook.metadata.manager import MetadataManager
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.table_writer import (
+    CommitConflictError,
+    LocalTable,
+    TableWriter,
+)
+
+
+def _chunks(doc, ids, text="chunk"):
+    return [
+        {"source_file": f"/docs/{doc}.pdf", "chunk_id": i, "text": f"{text} {i}"}
+        for i in ids
+    ]
+
+
+def _rows(table, *columns):
+    return sorted(zip(*(table.column(c).to_pylist() for c in columns)))
+
+
+def test_small_writes_are_batched_into_one_commit(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    for i in range(100):
+        assert writer.write("chunks", _chunks("a", [i]))
+    assert not writer.write("chunks", "not tabular")
+
+    assert writer.flush() == {"chunks": 0}
+    table = writer.table("chunks")
+    assert len(table.files()) == 1
+    assert table.read().num_rows == 100
+    # Nothing left to commit
+    assert writer.flush() == {}
+
+
+def test_large_buffers_are_flushed_early(tmp_path):
+    writer = TableWriter(str(tmp_path), target_file_rows=50)
+    for i in range(4):
+        writer.write("chunks", _chunks("a", range(i * 20, i * 20 + 20)))
+
+    assert len(writer.table("chunks").files()) == 1
+    writer.flush()
+    assert writer.table("chunks").read().num_rows == 80
+
+
+def test_overwrite_replaces_table_once_per_run(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.configure("chunks", mode="overwrite")
+    writer.write("chunks", _chunks("a", range(10)))
+    writer.flush()
+
+    writer.begin()
+    writer.write("chunks", _chunks("b", range(3)))
+    writer.flush()
+    writer.write("chunks", _chunks("c", range(2)))
+    writer.flush()
+
+    table = writer.table("chunks").read()
+    assert set(table.column("source_file").to_pylist()) == {
+        "/docs/b.pdf",
+        "/docs/c.pdf",
+    }
+    assert table.num_rows == 5
+
+
+def test_merge_upserts_on_keys(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.configure(
+        "chunks",
+        mode="merge",
+        merge_keys=["source_file", "chunk_id"],
+        partition_by=["source_file"],
+    )
+    writer.write("chunks", _chunks("a", range(3)) + _chunks("b", range(3)))
+    writer.flush()
+    files = writer.table("chunks").files()
+    (file_b,) = [path for path in files if "b.pdf" in path]
+
+    # An edited document, with a duplicate key in the same commit
+    writer.write("chunks", _chunks("a", [1, 3], text="old"))
+    writer.write("chunks", _chunks("a", [1], text="new"))
+    writer.flush()
+
+    table = writer.table("chunks").read()
+    assert _rows(table, "source_file", "chunk_id", "text") == [
+        ("/docs/a.pdf", 0, "chunk 0"),
+        ("/docs/a.pdf", 1, "new 1"),
+        ("/docs/a.pdf", 2, "chunk 2"),
+        ("/docs/a.pdf", 3, "old 3"),
+        ("/docs/b.pdf", 0, "chunk 0"),
+        ("/docs/b.pdf", 1, "chunk 1"),
+        ("/docs/b.pdf", 2, "chunk 2"),
+    ]
+    # Other partitions are not rewritten
+    assert file_b in writer.table("chunks").files()
+
+
+def test_partitions_by_source_file(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.configure("chunks", partition_by=["source_file"])
+    writer.write("chunks", _chunks("a", range(2)) + _chunks("b", range(2)))
+    writer.flush()
+
+    partitions = sorted(os.listdir(tmp_path / "chunks"))
+    assert partitions == [
+        "_delta_log",
+        "source_file=%2Fdocs%2Fa.pdf",
+        "source_file=%2Fdocs%2Fb.pdf",
+    ]
+
+
+def test_schema_evolution(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.write("chunks", [{"chunk_id": 1, "score": 1}])
+    writer.flush()
+    writer.write("chunks", [{"chunk_id": 2, "score": 0.5, "lang": "en"}])
+    writer.flush()
+
+    table = writer.table("chunks").read()
+    assert pa.types.is_floating(table.schema.field("score").type)
+    assert _rows(table, "chunk_id", "score", "lang") == [
+        (1, 1.0, None),
+        (2, 0.5, "en"),
+    ]
+    assert writer.table("chunks").read(columns=["lang"]).num_rows == 2
+
+    strict = TableWriter(str(tmp_path))
+    strict.configure("chunks", schema_evolution=False)
+    strict.write("chunks", [{"chunk_id": 3, "extra": True}])
+    with pytest.raises(ValueError):
+        strict.flush()
+
+
+def test_commit_conflicts_on_removed_files(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.write("chunks", _chunks("a", range(2)))
+    writer.flush()
+    first = LocalTable(str(tmp_path / "chunks"))
+    second = LocalTable(str(tmp_path / "chunks"))
+    (path,) = first.snapshot().files
+    second.snapshot()
+
+    first.commit("delete", [], [path])
+    # Appends after a concurrent commit simply land on the next version
+    assert second.commit("append", []) == 2
+    with pytest.raises(CommitConflictError):
+        second.commit("delete", [], [path])
+
+
+def test_merge_requires_keys():
+    with pytest.raises(ValidationError):
+        ProcessingStep(
+            name="chunk",
+            function=len,
+            inputs=[],
+            output_table="chunks",
+            write_mode="merge",
+        )
+
+
+def test_pipeline_run_writes_output_tables(tmp_path):
+    volume = tmp_path / "volume"
+    volume.mkdir()
+    (volume / "a.pdf").write_bytes(b"%PDF")
+
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="chunk",
+        function=lambda files: _chunks("a", range(5)),
+        inputs=[source],
+        output_table="chunks",
+        write_mode="overwrite",
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(
+        data_sources=[source],
+        processing_steps=[step],
+        outputs=[output],
+        table_writer=TableWriter(str(tmp_path / "tables")),
+    )
+    pipeline.edges[-1].function = lambda: True
+
+    pipeline.run(progress="none", use_cache=False)
+    pipeline.run(progress="none", use_cache=False)
+
+    table = pipeline.table_writer.table("chunks")
+    assert table.snapshot().version == 1
+    assert table.read().num_rows == 5
+
+
+def test_streaming_batches_are_committed_once(tmp_path, monkeypatch):
+    volume = tmp_path / "volume"
+    volume.mkdir()
+    for name in ("a", "b"):
+        (volume / f"{name}.pdf").write_bytes(b"%PDF")
+
+    def chunk(files):
+        for f in files:
+            yield from _chunks(os.path.basename(f), range(100))
+
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="chunk",
+        function=chunk,
+        inputs=[source],
+        output_table="chunks",
+        partition_by=["source_file"],
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(
+        data_sources=[source],
+        processing_steps=[step],
+        outputs=[output],
+        table_writer=TableWriter(str(tmp_path / "tables")),
+    )
+    monkeypatch.setattr(
+        "ai_cookbook.pipeline.pipeline.VectorIndexWriter.from_output",
+        lambda output: SimpleNamespace(
+            append=lambda chunks: None, finish=lambda: None, close=lambda: None
+        ),
+    )
+
+    pipeline.run_streaming(batch_size=10)
+
+    table = pipeline.table_writer.table("chunks")
+    assert table.snapshot().version == 0
+    # One file per source file, not one per batch
+    assert len(table.files()) == 2
+    assert table.read().num_rows == 200
+
+
+def test_merge_is_planned_again_after_concurrent_commit(tmp_path):
+    writer = TableWriter(str(tmp_path))
+    writer.configure("chunks", mode="merge", merge_keys=["chunk_id"])
+    writer.write("chunks", _chunks("a", range(2)))
+    writer.flush()
+    target = writer.table("chunks")
+    commit = target.commit
+    raced = []
+
+    def racing_commit(*args, **kwargs):
+        # Another writer commits between planning and committing the merge
+        if not raced:
+            raced.append(True)
+            other = TableWriter(str(tmp_path))
+            other.write("chunks", _chunks("a", [5], "concurrent"))
+            other.flush()
+        return commit(*args, **kwargs)
+
+    target.commit = racing_commit
+    writer.write("chunks", _chunks("a", [1, 5], "updated"))
+    assert writer.flush() == {"chunks": 2}
+
+    assert _rows(target.read(), "chunk_id", "text") == [
+        (0, "chunk 0"),
+        (1, "updated 1"),
+        (5, "updated 5"),
+    ]
+    # Files written for the stale plan were removed: left are the two
+    # original files, the rewrite of the first one and the merged rows
+    on_disk = [
+        name
+        for _, _, names in os.walk(target.path)
+        for name in names
+        if name.endswith(".parquet")
+    ]
+    assert len(on_disk) == 4
+    assert len(target.files()) == 2
+
+
+def _writing_pipeline(tmp_path, function, write_mode="append"):
+    volume = tmp_path / "volume"
+    volume.mkdir(exist_ok=True)
+    (volume / "a.pdf").write_bytes(b"%PDF")
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+    )
+    step = ProcessingStep(
+        name="chunk",
+        function=function,
+        inputs=[source],
+        output_table="chunks",
+        write_mode=write_mode,
+    )
+    output = Output(
+        name="index",
+        inputs=[step],
+        type="vector_index",
+        embedding_model="openai-embedding-model",
+        output_table="output_index",
+    )
+    pipeline = Pipeline(
+        data_sources=[source],
+        processing_steps=[step],
+        outputs=[output],
+        table_writer=TableWriter(str(tmp_path / "tables")),
+    )
+    pipeline.edges[-1].function = lambda: True
+    return pipeline
+
+
+def test_pipeline_run_writes_generator_outputs(tmp_path):
+    def chunk(files):
+        for f in files:
+            yield from _chunks(os.path.basename(f["path"]), range(3))
+
+    # Nothing but the run itself consumes the generator
+    pipeline = _writing_pipeline(tmp_path, chunk)
+    pipeline.run(progress="none", use_cache=False)
+
+    assert pipeline.table_writer.table("chunks").read().num_rows == 3
+
+
+def test_failed_run_commits_nothing_and_resume_writes_reused_results(tmp_path):
+    pipeline = _writing_pipeline(
+        tmp_path, lambda files: _chunks("a", range(5)), write_mode="overwrite"
+    )
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("embedding endpoint unavailable")
+
+    pipeline.metadata_manager = MetadataManager.from_sqlite(
+        str(tmp_path / "metadata.db")
+    )
+    pipeline.edges[-1].function = fail
+    with pytest.raises(RuntimeError):
+        pipeline.run(progress="none")
+    failed = pipeline.metadata_manager.backend.list_runs()[0]["run_id"]
+    table = pipeline.table_writer.table("chunks")
+    assert not table.exists
+
+    pipeline.edges[-1].function = lambda: True
+    pipeline.run(progress="none", resume_from=failed)
+    assert table.read().num_rows == 5
+
+    # Cached results are written again into overwrite tables
+    run = pipeline.run(progress="none")
+    assert run.cache_report["chunk"] == "hit"
+    assert table.snapshot().version == 1
+    assert table.read().num_rows == 5
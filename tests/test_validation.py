@@ -0,0 +1,68 @@
+from ai_cookbook.pipeline.dag import CompiledDag, Edge
+from ai_cookbook.pipeline.validation import validate_dag
+
+
+class Node:
+    def __init__(self, name, inputs=None):
+        self.name = name
+        self.inputs = inputs or []
+
+
+def test_validate_dag_builds_edges_and_order():
+    """Test that a valid DAG yields its edges and compiled structure"""
+    source = Node("source")
+    step = Node("step", [source])
+    output = Node("output", [step])
+
+    result = validate_dag(
+        {"data source": [source], "processing step": [step], "output": [output]}
+    )
+
+    assert result.is_valid
+    assert [(e.source.name, e.destination.name) for e in result.edges] == [
+        ("source", "step"),
+        ("step", "output"),
+    ]
+    assert result.dag.topological_order == ["source", "step", "output"]
+
+
+def test_validate_dag_reports_every_error():
+    """Test that duplicates, dangling inputs and all cycles are reported together"""
+    a, b, c, d = Node("a"), Node("b"), Node("c"), Node("d")
+    a.inputs, b.inputs = [b], [a]
+    c.inputs, d.inputs = [d], [c, Node("missing")]
+
+    result = validate_dag({"processing step": [a, b, c, d, Node("a")]})
+
+    assert not result.is_valid
+    assert result.dag is None
+    assert "Duplicate processing step name: a" in result.errors
+    assert (
+        "Input missing of processing step d not found in the pipeline" in result.errors
+    )
+    cycles = [error for error in result.errors if error.startswith("Cycle")]
+    assert cycles == [
+        "Cycle detected in the pipeline DAG: a -> b -> a",
+        "Cycle detected in the pipeline DAG: c -> d -> c",
+    ]
+
+
+def test_find_cycles_on_long_chain():
+    """Test that cycle detection does not recurse on a 100k node chain"""
+    nodes = [Node("node0")]
+    for i in range(1, 100_000):
+        nodes.append(Node(f"node{i}", [nodes[-1]]))
+    nodes[0].inputs = [nodes[-1]]
+
+    result = validate_dag({"node": nodes})
+
+    assert len(result.errors) == 1
+    assert result.errors[0].endswith("node99999 -> node0")
+
+
+def test_find_cycles_self_loop():
+    """Test that a node reading its own output is a cycle"""
+    node = Node("a")
+    dag = CompiledDag(["a"], [Edge(node, node)])
+    assert dag.find_cycles() == [["a", "a"]]
+    assert dag.has_cycle()
@@ -0,0 +1,267 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_cookbook.pipeline.data_source import DataSource
+from ai_cookbook.pipeline.output import Output
+from ai_cookbook.pipeline.pipeline import Pipeline
+from ai_cookbook.pipeline.processing_step import ProcessingStep
+from ai_cookbook.pipeline.vectorsearch import (
+    EmbeddingClient,
+    InMemoryVectorIndex,
+    VectorIndexWriter,
+    get_or_create_vector_index,
+)
+
+
+class EmbeddingServer(ThreadingHTTPServer):
+    """Local stand-in for an embedding serving endpoint"""
+
+    def __init__(self, failures=0):
+        super().__init__(("127.0.0.1", 0), EmbeddingHandler)
+        self.failures = failures
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/invocations"
+
+
+class EmbeddingHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            failing = self.server.failures > 0
+            if failing:
+                self.server.failures -= 1
+            else:
+                self.server.requests.append(body["input"])
+
+        if failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        data = [
+            {"index": i, "embedding": [float(len(text)), float(i)]}
+            for i, text in enumerate(body["input"])
+        ]
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def embedding_server():
+    servers = []
+
+    def start(failures=0):
+        server = EmbeddingServer(failures)
+        threading.Thread(
+            target=server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_writer_batches_and_deduplicates(embedding_server):
+    server = embedding_server()
+    index = InMemoryVectorIndex()
+    writer = VectorIndexWriter(
+        EmbeddingClient(server.url, model="test-model"),
+        index,
+        max_batch_size=8,
+        max_batch_tokens=40,
+        max_concurrency=4,
+        upsert_batch_size=50,
+    )
+    chunks = [f"chunk number {i % 30}" for i in range(120)]
+
+    result = writer.write(chunks)
+
+    assert result.records == 120
+    # Duplicates are embedded once per upsert window of 50 records
+    assert result.embedded == 30 + 30 + 20
+    assert result.deduplicated == 120 - 80
+    assert len(index.rows) == 30
+    assert index.upsert_calls == 3
+    embedded_texts = [text for request in server.requests for text in request]
+    assert len(embedded_texts) == 80
+    for request in server.requests:
+        assert len(request) <= 8
+        # "chunk number N" is three tokens
+        assert len(request) * 3 <= 40
+    row = next(iter(index.rows.values()))
+    assert row["embedding"][0] == float(len(row["text"]))
+
+
+def test_writer_windows_span_appended_pieces(embedding_server):
+    server = embedding_server()
+    index = InMemoryVectorIndex()
+    writer = VectorIndexWriter(EmbeddingClient(server.url), index, upsert_batch_size=50)
+    chunks = [f"chunk number {i}" for i in range(120)]
+
+    for start in range(0, 120, 7):
+        writer.append(chunks[start : start + 7])
+    assert index.upsert_calls == 2
+    result = writer.finish()
+
+    assert result.upserted == 120
+    assert index.upsert_calls == 3
+    assert writer.finish().upserted == 0
+
+
+def test_writer_keeps_record_fields(embedding_server):
+    server = embedding_server()
+    index = InMemoryVectorIndex()
+    writer = VectorIndexWriter(EmbeddingClient(server.url), index)
+
+    writer.write(
+        [
+            {"id": "a", "text": "same", "path": "x.pdf"},
+            {"id": "b", "text": "same", "path": "y.pdf"},
+        ]
+    )
+
+    assert len(server.requests) == 1
+    assert index.rows["a"]["path"] == "x.pdf"
+    assert index.rows["b"]["embedding"] == index.rows["a"]["embedding"]
+
+
+def test_writer_retries_transient_failures(embedding_server):
+    server = embedding_server(failures=2)
+    index = InMemoryVectorIndex()
+    writer = VectorIndexWriter(
+        EmbeddingClient(server.url), index, max_concurrency=1, backoff=0.01
+    )
+
+    result = writer.write(["one", "two"])
+
+    assert result.retries == 2
+    assert len(index.rows) == 2
+
+
+def test_writer_gives_up_after_max_retries(embedding_server):
+    server = embedding_server(failures=10)
+    writer = VectorIndexWriter(
+        EmbeddingClient(server.url),
+        InMemoryVectorIndex(),
+        max_retries=1,
+        backoff=0.01,
+    )
+
+    with pytest.raises(Exception, match="503"):
+        writer.write(["one"])
+
+
+def test_get_or_create_vector_index_from_output_parameters(embedding_server):
+    server = embedding_server()
+    output = Output(
+        name="index",
+        type="vector_index",
+        inputs=[],
+        embedding_model="test-model",
+        output_table="main.default.index",
+        parameters={"endpoint_url": server.url, "max_batch_size": 2},
+    )
+    index = InMemoryVectorIndex()
+    writer = VectorIndexWriter.from_output(output)
+    writer.index = index
+
+    assert get_or_create_vector_index(None, output) is True
+    result = get_or_create_vector_index(None, output, ["a", "b", "c"], writer=writer)
+
+    assert result.embedding_requests == 2
+    assert writer.max_batch_size == 2
+    assert len(index.rows) == 3
+
+
+def test_writer_uses_embedding_cache(embedding_server, tmp_path):
+    server = embedding_server()
+    output = Output(
+        name="index",
+        type="vector_index",
+        inputs=[],
+        embedding_model="test-model",
+        output_table="main.default.index",
+        parameters={
+            "endpoint_url": server.url,
+            "embedding_cache_dir": str(tmp_path),
+        },
+    )
+
+    def write(chunks):
+        writer = VectorIndexWriter.from_output(output)
+        writer.index = InMemoryVectorIndex()
+        return writer.write(chunks), writer.index
+
+    first, _ = write(["stable one", "stable two"])
+    second, index = write(["stable one", "stable two", "changed"])
+
+    assert first.cache_hits == 0
+    assert second.cache_hits == 2
+    assert server.requests[-1] == ["changed"]
+    assert index.rows[next(iter(index.rows))]["embedding"] == [10.0, 0.0]
+
+
+def test_pipeline_run_embeds_upstream_step_output(
+    embedding_server, tmp_path, monkeypatch
+):
+    server = embedding_server()
+    volume = tmp_path / "volume"
+    volume.mkdir()
+    (volume / "a.pdf").write_bytes(b"%PDF")
+    source = DataSource(
+        name="docs",
+        catalog="c",
+        schema="s",
+        type="volume",
+        path=str(volume),
+        format="pdf",
+    )
+
+    def chunk(files):
+        return [{"id": str(i), "text": f"chunk {i}"} for i in range(3)]
+
+    step = ProcessingStep(
+        name="chunk",
+        function=chunk,
+        inputs=[source],
+        output_table="chunks",
+    )
+    output = Output(
+        name="index",
+        type="vector_index",
+        inputs=[step],
+        embedding_model="test-model",
+        output_table="main.default.index",
+        parameters={"endpoint_url": server.url},
+    )
+    index = InMemoryVectorIndex()
+    monkeypatch.setattr(
+        "ai_cookbook.pipeline.vectorsearch.DatabricksVectorIndex",
+        lambda name, client: index,
+    )
+    pipeline = Pipeline(
+        data_sources=[source], processing_steps=[step], outputs=[output]
+    )
+
+    pipeline.run(progress="none", use_cache=False)
+
+    assert sorted(index.rows) == ["0", "1", "2"]
+    assert index.rows["1"]["text"] == "chunk 1"
+    assert pipeline.data_store["index"].upserted == 3